@@ -1,12 +1,12 @@
-import itertools
 
 from sage.graphs.graph import Graph
-from sage.data_structures.bitset import Bitset
 from sage.data_structures.binary_matrix cimport *
 from sage.graphs.base.static_dense_graph cimport dense_graph_init
-from sage.numerical.mip cimport MixedIntegerLinearProgram
 from cysignals.memory cimport check_malloc, sig_malloc, sig_free
 from cysignals.signals cimport sig_on, sig_off 
+from thinness.search_statistics cimport search_statistics_t, record_search_statistics
+
+from thinness.search_statistics import SearchStatistics
 
 DEFAULT_MAX_PREFIX_LENGTH = 15
 DEFAULT_MAX_SEEN_ENTRIES = 1_000_000
@@ -17,8 +17,10 @@ def lmimwidth(
     upper_bound: int = None,
     certificate: bool = False, 
     max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH, 
-    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    statistics: SearchStatistics = None
 ) -> (int, list) | int:
+    """The counters of the search are added to `statistics`, if given."""
     components = [graph.subgraph(component, immutable=False) for component in graph.connected_components()]
     relabellings = [component.relabel(return_map=True) for component in components]
     solutions = [
@@ -28,7 +30,8 @@ def lmimwidth(
             upper_bound,
             certificate, 
             max_prefix_length, 
-            max_seen_entries
+            max_seen_entries,
+            statistics
         ) for component in components
     ]
 
@@ -40,16 +43,19 @@ def lmimwidth(
 
 def _join_solutions(solutions: list[tuple(int, list[int])], relabellings: list[dict]) -> tuple[int, list]:
     width = max(solution[0] for solution in solutions)
-    orders = [
-        [_original_label(vertex, relabellings[i]) for vertex in solution[1]]
-        for i, solution in enumerate(solutions)
-    ]
-    order = list(itertools.chain.from_iterable(orders))
+    order = []
+    for solution, relabelling in zip(solutions, relabellings):
+        labels = _original_labels(relabelling)
+        order.extend(labels[vertex] for vertex in solution[1])
     return width, order
 
 
-def _original_label(vertex: int, relabelling: dict):
-    return next(key for key, value in relabelling.items() if value == vertex)
+def _original_labels(relabelling: dict) -> list:
+    """Invert `relabelling`, which maps the vertices of a graph to 0, ..., n - 1."""
+    labels = [None] * len(relabelling)
+    for label, vertex in relabelling.items():
+        labels[vertex] = label
+    return labels
 
 
 def lmimwidth_of_connected_graph(
@@ -58,7 +64,8 @@ def lmimwidth_of_connected_graph(
     upper_bound: int = None,
     certificate: bool = False,
     max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH, 
-    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    statistics: SearchStatistics = None
 ) -> (int, list[int]) | int:
     """upper_bound is exclusive."""
 
@@ -89,7 +96,7 @@ def lmimwidth_of_connected_graph(
     
     cdef dict seen_states = dict() 
 
-    cdef int seen_entries = 0
+    cdef search_statistics_t search_statistics = search_statistics_t(0, 0, 0, 0, 0)
 
     cdef int* best_order = <int*>sig_malloc(sizeof(int) * n)
 
@@ -109,7 +116,7 @@ def lmimwidth_of_connected_graph(
             prefix_neighbors_of_vertex=prefix_neighbors_of_vertex,
             suffix_neighbors_of_vertex=suffix_neighbors_of_vertex,
             seen_states=seen_states,
-            seen_entries=&seen_entries,
+            statistics=&search_statistics,
             canonical_vertices=canonical_vertices,
             lower_bound=lower_bound,
             upper_bound=max_branch_and_bound_lmimw,
@@ -125,6 +132,7 @@ def lmimwidth_of_connected_graph(
         sig_free(prefix)
         bitset_free(suffix_neighbors_of_vertex)
         bitset_free(canonical_vertices)
+    record_search_statistics(statistics, &search_statistics)
 
     cdef int lmimw = branch_and_bound_lmimw if branch_and_bound_lmimw != -1 else upper_bound
     cdef list order
@@ -158,7 +166,7 @@ cdef int _branch_and_bound(
     bitset_t prefix_neighbors_of_vertex,
     bitset_t suffix_neighbors_of_vertex,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -169,6 +177,7 @@ cdef int _branch_and_bound(
     """
     upper_bound is inclusive.
     """
+    statistics.nodes += 1
     if current_mim > upper_bound:
         return -1
     
@@ -190,7 +199,7 @@ cdef int _branch_and_bound(
     # If we already saw this prefix with same or better current_mim, skip this state.
     if _check_state_seen(
         seen_states,
-        seen_entries,
+        statistics,
         prefix_vertices,
         new_suffix,
         current_mim,
@@ -232,7 +241,7 @@ cdef int _branch_and_bound(
             prefix_neighbors_of_vertex,
             suffix_neighbors_of_vertex,
             seen_states,
-            seen_entries,
+            statistics,
             canonical_vertices,
             lower_bound,
             upper_bound,
@@ -277,6 +286,8 @@ cdef int _get_mim_for_cut(
     cdef int suffix_vertex
     cdef int neighbor_of_suffix_vertex
     
+    # Imported here, as the MILP backends are slow to import and only this bound needs them.
+    from sage.numerical.mip import MixedIntegerLinearProgram
     mip = MixedIntegerLinearProgram()
     edge_variables = mip.new_variable(binary=True)
 
@@ -352,7 +363,7 @@ cdef inline void _increment_prefix_greedily(
 
 cdef inline bint _check_state_seen(
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t prefix_vertices,
     bitset_t suffix_vertices,
     int current_mim,
@@ -368,13 +379,14 @@ cdef inline bint _check_state_seen(
     if frozen_prefix_vertices in seen_states:
         previous_mim = seen_states[frozen_prefix_vertices]
         if previous_mim <= current_mim:
+            statistics.memo_hits += 1
             return True
         else:
             seen_states[frozen_prefix_vertices] = current_mim
             return False
-    elif seen_entries[0] < max_seen_entries:
+    elif statistics.memo_entries < max_seen_entries:
         seen_states[frozen_prefix_vertices] = current_mim
-        seen_entries[0] += 1
+        statistics.memo_entries += 1
         return False
 
 
@@ -1,26 +1,117 @@
 from sage import all
+import argparse
+import functools
 import sys
 from tqdm import tqdm
 from datetime import datetime
 import multiprocessing as mp
+import time
+from collections.abc import Iterable
 from sage.graphs.graph import Graph
 
 from thinness.helpers import *
-from thinness.data import load_graphs_by_thinness, save_graph_with_thinness, get_last_processed_index, save_last_processed_index
+from thinness.data import load_graphs_by_thinness, save_graph_with_thinness, get_last_processed_index, save_last_processed_index, \
+    export_results_to_csvs, THINNESS
+from thinness.store import ResultStore
+from thinness.table import TABLES_DIR, ThinnessTables, ThinnessTableWriter, encode_record, table_filename, THINNESS_COLUMN
 from thinness.compatibility import build_compatibility_graph
 from thinness.itertools_utils import skip_first
-from thinness.branch_and_bound import calculate_thinness
+from thinness.branch_and_bound import calculate_thinness, DEFAULT_MAX_SEEN_ENTRIES
+from thinness.search_statistics import SearchBudgetExceeded
+from thinness.scheduler import schedule
+from thinness.spool import Coordinator, files_directory, run_worker, stop_workers
+from thinness.telemetry import PipelineMetrics, WorkerMetrics, export_metrics
 
 
 GRAPHS_PER_ORDER = [1,1,1,2,6,21,112,853,11117,261080,11716571,1006700565,164059830476,50335907869219,29003487462848061,31397381142761241960,63969560113225176176277,245871831682084026519528568,1787331725248899088890200576580,24636021429399867655322650759681644]
-CHUNK_SIZE = 2000
+SHARDS = 1024
+# Graphs whose search needs more nodes are left for the hard-instance queue at the end of the run.
+NODE_BUDGET = 50_000
+HARD_GRAPH_MAX_SEEN_ENTRIES = 16 * DEFAULT_MAX_SEEN_ENTRIES
 
+# Thinness of every connected graph of smaller order, opened once per worker by `init_process`.
+_tables = None
 
-def process_graph(params):
-    G, graphs_dict = params
-    thinness = calculate_thinness(G)
-    is_minimal = thinness > 1 and not has_induced_subgraph(G, graphs_dict[thinness])
-    return G.graph6_string(), thinness, is_minimal
+
+def init_process(n, tables_directory: str = TABLES_DIR):
+    global _tables
+    _tables = ThinnessTables(n - 1, tables_directory)
+
+
+def process_graph(graph6: bytes, metrics: WorkerMetrics, max_nodes: int = None, max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES):
+    """Return the thinness of the graph, whether it is minimal, and its record for the table of its order.
+
+    The thinness of the graphs obtained by deleting one vertex brackets the thinness of the graph
+    between their maximum and that plus one, and the graph is minimal if it reaches the upper end.
+    Raises SearchBudgetExceeded if the search needs more than `max_nodes` nodes.
+    """
+    with metrics.time('serialization'):
+        G = Graph(graph6.decode(), immutable=True)
+    with metrics.time('lower_bound'):
+        lower_bound = _tables.max_after_vertex_deletion(G, THINNESS_COLUMN)
+    start = time.perf_counter()
+    thinness = calculate_thinness(
+        G, lower_bound=lower_bound, upper_bound=lower_bound + 2, max_seen_entries=max_seen_entries, max_nodes=max_nodes
+    )
+    metrics.record_graph(graph6, G.order(), thinness, time.perf_counter() - start)
+    is_minimal = thinness > lower_bound
+    with metrics.time('serialization'):
+        record = encode_record(canonical_graph6(G).encode(), thinness=thinness)
+    return thinness, is_minimal, record
+
+
+def process_graphs(
+    batch: Iterable[bytes],
+    metrics: WorkerMetrics = None,
+    max_nodes: int = None,
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+) -> tuple[int, list[tuple[bytes, int]], bytes, WorkerMetrics, list[bytes]]:
+    """Return the number of graphs processed, the minimal ones found with their thinness, the table records of all of them and the metrics of the batch.
+
+    The graphs whose search needs more than `max_nodes` nodes are not processed, and are returned last.
+    """
+    metrics = metrics or WorkerMetrics()
+    processed = 0
+    minimal_graphs = []
+    records = []
+    hard_graphs = []
+    for graph6 in batch:
+        try:
+            thinness, is_minimal, record = process_graph(graph6, metrics, max_nodes, max_seen_entries)
+        except SearchBudgetExceeded:
+            metrics.hard_graphs += 1
+            hard_graphs.append(graph6)
+            continue
+        if is_minimal:
+            minimal_graphs.append((graph6, thinness))
+        records.append(record)
+        processed += 1
+    return processed, minimal_graphs, b''.join(records), metrics, hard_graphs
+
+
+def process_chunk(chunk: list[bytes]) -> tuple[tuple[int, list[tuple[bytes, int]], bytes, WorkerMetrics], list[bytes]]:
+    """Process a chunk of `schedule`, leaving the graphs that exceed `NODE_BUDGET` for the hard-instance queue."""
+    *result, hard_graphs = process_graphs(chunk, max_nodes=NODE_BUDGET)
+    return tuple(result), hard_graphs
+
+
+def process_hard_graph(graph6: bytes) -> tuple[int, list[tuple[bytes, int]], bytes, WorkerMetrics]:
+    *result, _ = process_graphs([graph6], max_seen_entries=HARD_GRAPH_MAX_SEEN_ENTRIES)
+    return tuple(result)
+
+
+def process_shard(shard: tuple[int, int, int]) -> tuple[int, int, list[tuple[bytes, int]], bytes, WorkerMetrics, list[bytes]]:
+    """Process a geng shard, leaving the graphs that exceed `NODE_BUDGET` for the hard-instance queue, last in the result."""
+    n, res, mod = shard
+    metrics = WorkerMetrics()
+    graph6_strings = metrics.timed(connected_graph6_shard(n, res, mod))
+    processed, minimal_graphs, records, metrics, hard_graphs = process_graphs(graph6_strings, metrics, max_nodes=NODE_BUDGET)
+    return res, processed, minimal_graphs, records, metrics, hard_graphs
+
+
+def process_hard_graph_of_shard(task: tuple[int, bytes]) -> tuple[int, int, list[tuple[bytes, int]], bytes, WorkerMetrics]:
+    res, graph6 = task
+    return res, *process_hard_graph(graph6)
 
 
 # def estimate_time_remaining(start_time, graphs_processed, graphs_remaining):
@@ -51,19 +142,149 @@ def skip_processed_graphs(graphs):
     return last_processed
 
 
-def fill_csvs_paralelly(n=10):
-    graphs_dict = load_graphs_by_thinness(n-1)
-    graphs_dict.setdefault(int(n/2), [])
+def fill_csvs_paralelly(n=10, metrics: PipelineMetrics = None, processes: int = None):
+    """Process the graphs of order `n` generated here, in chunks sized by `schedule` and with a hard-instance queue at the end."""
     graphs = connected_graphs_upto(n, start=n)
     # last_skipped_graph = skip_processed_graphs(graphs)
+    metrics = metrics or PipelineMetrics()
+    processes = processes or mp.cpu_count()
     
-    with mp.Pool() as pool:
-        params = ((G, graphs_dict) for G in graphs)
-        process_map = pool.imap(process_graph, params, chunksize=CHUNK_SIZE)
-        for graph6, thinness, is_minimal in tqdm(process_map):
-            if is_minimal:
-                save_graph_with_thinness(graph6, thinness)
-                print_found_graph(graph6, thinness)
+    with mp.Pool(processes, initializer=init_process, initargs=(n,)) as pool:
+        graph6_strings = metrics.timed(G.graph6_string().encode() for G in graphs)
+        results = schedule(pool, processes, graph6_strings, process_chunk, process_hard_graph, metrics=metrics)
+        with tqdm(total=GRAPHS_PER_ORDER[n]) as progress:
+            for processed, minimal_graphs, _, batch_metrics in results:
+                metrics.add(batch_metrics)
+                for graph6, thinness in minimal_graphs:
+                    save_graph_with_thinness(graph6.decode(), thinness)
+                    print_found_graph(graph6.decode(), thinness)
+                progress.update(processed)
+
+
+def fill_csvs_by_shards(n=10, mod=SHARDS, metrics: PipelineMetrics = None):
+    """Like `fill_csvs_paralelly`, but each worker generates its own geng shards.
+
+    Results go through a `ResultStore`, which records finished shards, so resuming only skips them.
+    The thinness of every graph goes to the table of order `n`, used by the run of order `n + 1`.
+    The graphs that exceed the node budget of their shard are processed once every shard is done.
+    """
+    table_writer = ThinnessTableWriter(n)
+    metrics = metrics or PipelineMetrics()
+    deferred = {}
+    with ResultStore() as store, mp.Pool(initializer=init_process, initargs=(n,)) as pool:
+        processed_shards = store.processed_shards(THINNESS, n, mod)
+        shards = metrics.counted((n, res, mod) for res in range(mod) if res not in processed_shards)
+        process_map = pool.imap_unordered(process_shard, shards)
+        with tqdm(total=mod, initial=len(processed_shards), unit='shard') as progress:
+            for result in metrics.timed(process_map, 'waiting'):
+                merge_shard(table_writer, store, n, mod, result, metrics, deferred)
+                progress.update()
+        merge_hard_graphs(pool, table_writer, store, n, mod, deferred, metrics)
+        table_writer.finalize()
+        export_results_to_csvs(store)
+
+
+def fill_csvs_with_workers(spool_directory: str, n=10, mod=SHARDS, metrics: PipelineMetrics = None):
+    """Like `fill_csvs_by_shards`, but the shards are processed by `run_spool_workers`, on any machine sharing `spool_directory`.
+
+    The tables of smaller order are published in the spool with the job, and the workers read them from there.
+    The graphs that exceed the node budget of their shard are processed on this machine once every shard is done.
+    """
+    table_writer = ThinnessTableWriter(n)
+    metrics = metrics or PipelineMetrics()
+    deferred = {}
+    with ResultStore() as store:
+        processed_shards = store.processed_shards(THINNESS, n, mod)
+        coordinator = Coordinator(
+            spool_directory,
+            n,
+            mod,
+            [res for res in range(mod) if res not in processed_shards],
+            files=[table_filename(order) for order in range(2, n)]
+        )
+        metrics.expect(len(coordinator.pending))
+        with tqdm(total=mod, initial=len(processed_shards), unit='shard') as progress:
+            coordinator.run(lambda result: merge_shard(table_writer, store, n, mod, result, metrics, deferred), progress.update)
+        if deferred:
+            with mp.Pool(initializer=init_process, initargs=(n,)) as pool:
+                merge_hard_graphs(pool, table_writer, store, n, mod, deferred, metrics)
+        table_writer.finalize()
+        export_results_to_csvs(store)
+
+
+def run_spool_workers(spool_directory: str, processes: int = None):
+    """Run a worker per process on the shards handed out in `spool_directory`, until the coordinator stops them."""
+    initializer = functools.partial(init_process, tables_directory=files_directory(spool_directory))
+    workers = [
+        mp.Process(target=run_worker, args=(spool_directory, process_shard, initializer))
+        for _ in range(processes or mp.cpu_count())
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def merge_shard(
+    table_writer: ThinnessTableWriter,
+    store: ResultStore,
+    n: int,
+    mod: int,
+    result: tuple[int, int, list[tuple[bytes, int]], bytes, WorkerMetrics, list[bytes]],
+    metrics: PipelineMetrics = None,
+    deferred: dict = None
+):
+    """Record the result of a shard, or keep it in `deferred` until `merge_hard_graphs` if some of its graphs exceeded the node budget."""
+    res, processed, minimal_graphs, records, shard_metrics, hard_graphs = result
+    if metrics is not None:
+        metrics.add(shard_metrics)
+    if hard_graphs:
+        deferred[res] = (list(minimal_graphs), [records], hard_graphs)
+        return
+    _record_shard(table_writer, store, n, res, mod, minimal_graphs, records)
+
+
+def merge_hard_graphs(
+    pool,
+    table_writer: ThinnessTableWriter,
+    store: ResultStore,
+    n: int,
+    mod: int,
+    deferred: dict,
+    metrics: PipelineMetrics = None
+):
+    """Process the graphs of the `deferred` shards without a node budget, one per task, and record each shard once all of its graphs are done."""
+    tasks = [(res, graph6) for res, (_, _, hard_graphs) in deferred.items() for graph6 in hard_graphs]
+    waiting = {res: len(hard_graphs) for res, (_, _, hard_graphs) in deferred.items()}
+    results = pool.imap_unordered(process_hard_graph_of_shard, tasks)
+    if metrics is not None:
+        metrics.expect(len(tasks))
+        results = metrics.timed(results, 'waiting')
+    for res, _, minimal_graphs, records, hard_metrics in results:
+        if metrics is not None:
+            metrics.add(hard_metrics)
+        shard_minimal_graphs, shard_records, _ = deferred[res]
+        shard_minimal_graphs.extend(minimal_graphs)
+        shard_records.append(records)
+        waiting[res] -= 1
+        if waiting[res] == 0:
+            _record_shard(table_writer, store, n, res, mod, shard_minimal_graphs, b''.join(shard_records))
+            del deferred[res]
+
+
+def _record_shard(
+    table_writer: ThinnessTableWriter,
+    store: ResultStore,
+    n: int,
+    res: int,
+    mod: int,
+    minimal_graphs: list[tuple[bytes, int]],
+    records: bytes
+):
+    table_writer.add_shard(res, mod, records)
+    store.add_shard(THINNESS, n, res, mod, ((graph6.decode(), thinness) for graph6, thinness in minimal_graphs))
+    for graph6, thinness in minimal_graphs:
+        print_found_graph(graph6.decode(), thinness)
 
 
 def minimum_partition_for_vertex_order(graph: Graph, vertex_order: list[int]):
@@ -72,6 +293,28 @@ def minimum_partition_for_vertex_order(graph: Graph, vertex_order: list[int]):
 
 
 if __name__ == '__main__':
-    for i in range(4, 12):
-        print(f'Processing graphs of order {i}...')
-        fill_csvs_paralelly(i)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Find the minimal graphs of each thinness.')
+    parser.add_argument('--spool', help='directory shared with the workers; without it, all shards run on this machine')
+    parser.add_argument('--worker', action='store_true', help='process the shards handed out in the spool')
+    parser.add_argument('--processes', type=int, help='worker processes on this machine')
+    parser.add_argument('--metrics-file', help='write throughput metrics to this file periodically, in the Prometheus text format')
+    parser.add_argument('--metrics-port', type=int, help='serve the throughput metrics at http://localhost:PORT/metrics')
+    args = parser.parse_args()
+    if args.worker and args.spool is None:
+        parser.error('--worker needs --spool')
+
+    if args.worker:
+        run_spool_workers(args.spool, args.processes)
+    else:
+        metrics = PipelineMetrics()
+        try:
+            with export_metrics(metrics, args.metrics_file, args.metrics_port):
+                for i in range(2, 12):
+                    print(f'Processing graphs of order {i}...')
+                    if args.spool is None:
+                        fill_csvs_by_shards(i, metrics=metrics)
+                    else:
+                        fill_csvs_with_workers(args.spool, i, metrics=metrics)
+        finally:
+            if args.spool is not None:
+                stop_workers(args.spool)
\ No newline at end of file
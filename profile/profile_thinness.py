@@ -10,8 +10,6 @@ def take(n, iterable):
 
 def profile():
     n = 10
-    graphs_dict = data.load_graphs_by_thinness(n-1)
-    graphs_dict.setdefault(int(n/2), [])
     graphs = helpers.connected_graphs_upto(n, start=n)
 
     print("Skipping graphs...")
@@ -20,7 +18,7 @@ def profile():
     print("Processing graphs...")
     minimal.init_process(n)
     for graph in take(100, graphs):
-        minimal.process_graph((graph, graphs_dict))
+        minimal.process_graph(graph.graph6_string().encode())
 
 
 profile()
@@ -1,14 +1,17 @@
-import itertools
 from multiset import Multiset, FrozenMultiset
 
+from collections.abc import Iterable
+
 from sage.graphs.graph import Graph
-from sage.data_structures.bitset import Bitset
 from sage.data_structures.binary_matrix cimport *
 from sage.graphs.base.static_dense_graph cimport dense_graph_init
 from cysignals.memory cimport check_malloc, sig_malloc, sig_free
 from cysignals.signals cimport sig_on, sig_off 
+from thinness.search_statistics cimport search_statistics_t, record_search_statistics
 
 from thinness.consistent_solution import ConsistentSolution
+from thinness.search_statistics import SearchStatistics
+from thinness.small_graphs import lookup_thinness
 
 DEFAULT_MAX_PREFIX_LENGTH = 15
 DEFAULT_MAX_SEEN_ENTRIES = 1_000_000
@@ -20,8 +23,15 @@ def calculate_proper_thinness(
     upper_bound: int = None,
     certificate: bool = False, 
     max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH, 
-    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    statistics: SearchStatistics = None,
+    use_small_graphs_table: bool = True
 ) -> ConsistentSolution | int:
+    """upper_bound is exclusive. With `certificate`, None is returned if some component has no
+    solution below it; otherwise `upper_bound` is returned for such a component.
+    The counters of the search are added to `statistics`, if given.
+    Components in the table of `thinness.small_graphs` are answered without searching unless
+    `use_small_graphs_table` is False."""
     components = [graph.subgraph(component, immutable=False) for component in graph.connected_components(sort=False)]
     relabellings = [component.relabel(return_map=True) for component in components]
     solutions = [
@@ -31,43 +41,37 @@ def calculate_proper_thinness(
             upper_bound,
             certificate, 
             max_prefix_length, 
-            max_seen_entries
+            max_seen_entries,
+            statistics,
+            use_small_graphs_table
         ) for component in components
     ]
 
     if certificate:
+        if any(solution is None for solution in solutions):
+            return None
         return _join_solutions(solutions, relabellings)
     else:
-        return max(solutions)
+        return max(solutions, default=0)
 
 
 def _join_solutions(solutions: list[ConsistentSolution], relabellings: list[dict]) -> ConsistentSolution:
-    order = _join_orders([solution.order for solution in solutions], relabellings)
-    partition = _join_partitions([solution.partition for solution in solutions], relabellings)
-    return ConsistentSolution(order, partition)
-
-
-def _join_orders(orders: list[list[int]], relabellings: list[dict]) -> list[int]:
-    orders = [
-        [_original_label(vertex, relabellings[i]) for vertex in order]
-        for i, order in enumerate(orders)
-    ]
-    return list(itertools.chain.from_iterable(orders))
+    """Part `i` of the joined solution is the union of the parts `i` of the solutions of the components."""
+    order = []
+    parts = []
+    for solution, relabelling in zip(solutions, relabellings):
+        labels = _original_labels(relabelling)
+        order.extend(labels[vertex] for vertex in solution.order)
+        parts.extend(solution.parts)
+    return ConsistentSolution.from_parts(order, parts, max((solution.thinness for solution in solutions), default=0))
 
 
-def _join_partitions(partitions: list[list[set]], relabellings: list[dict]) -> list[set]:
-    partitions = [
-        [set(_original_label(vertex, relabellings[i]) for vertex in part) for part in partition]
-        for i, partition in enumerate(partitions)
-    ]
-    return [
-        set(itertools.chain.from_iterable(parts))
-        for parts in itertools.zip_longest(*partitions, fillvalue=set())
-    ]
-
-
-def _original_label(vertex: int, relabelling: dict):
-    return next(key for key, value in relabelling.items() if value == vertex)
+def _original_labels(relabelling: dict) -> list:
+    """Invert `relabelling`, which maps the vertices of a graph to 0, ..., n - 1."""
+    labels = [None] * len(relabelling)
+    for label, vertex in relabelling.items():
+        labels[vertex] = label
+    return labels
 
 
 
@@ -77,9 +81,20 @@ def calculate_proper_thinness_of_connected_graph(
     upper_bound: int = None,
     certificate: bool = False,
     max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH, 
-    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    statistics: SearchStatistics = None,
+    use_small_graphs_table: bool = True,
+    orbits: Iterable[Iterable[int]] = None
 ) -> ConsistentSolution | int:
-    """upper_bound is exclusive."""
+    """upper_bound is exclusive, and with `certificate` None is returned if there is no solution below it.
+    `orbits` are the orbits of the automorphism group of `graph`, as lists, which are computed here
+    if not given."""
+    if use_small_graphs_table:
+        known = lookup_thinness(graph, certificate, proper=True)
+        if known is not None:
+            if certificate or upper_bound is None:
+                return known
+            return min(known, upper_bound)
     if upper_bound is None:
         upper_bound = graph.order() + 1
 
@@ -131,14 +146,14 @@ def calculate_proper_thinness_of_connected_graph(
     
     cdef dict seen_states = dict() 
 
-    cdef int seen_entries = 0
+    cdef search_statistics_t search_statistics = search_statistics_t(0, 0, 0, 0, 0)
 
     cdef int* best_order = <int*>sig_malloc(sizeof(int) * n)
     cdef int* best_partition = <int*>sig_malloc(sizeof(int) * n)
 
     cdef bitset_t canonical_vertices
     bitset_init(canonical_vertices, n)
-    _build_canonical_vertices(graph, canonical_vertices)
+    _build_canonical_vertices(graph, canonical_vertices, orbits)
 
     try:
         sig_on()
@@ -160,7 +175,7 @@ def calculate_proper_thinness_of_connected_graph(
             part_suffix_neighbors=part_suffix_neighbors,
             prefix_non_neighbors_of_vertex=prefix_non_neighbors_of_vertex,
             seen_states=seen_states,
-            seen_entries=&seen_entries,
+            statistics=&search_statistics,
             canonical_vertices=canonical_vertices,
             lower_bound=lower_bound,
             upper_bound=max_branch_and_bound_proper_thinness,
@@ -188,16 +203,15 @@ def calculate_proper_thinness_of_connected_graph(
         bitset_free(suffix_neighbors_of_vertex)
         binary_matrix_free(part_suffix_neighbors)
         bitset_free(canonical_vertices)
+    record_search_statistics(statistics, &search_statistics)
 
     cdef int proper_thinness = branch_and_bound_proper_thinness if branch_and_bound_proper_thinness != -1 else upper_bound
     cdef list order
-    cdef list partition
-    if certificate:
+    if certificate and branch_and_bound_proper_thinness == -1:
+        ret = None
+    elif certificate:
         order = [best_order[i] for i in range(n)]
-        partition = [set() for _ in range(proper_thinness)]
-        for vertex in range(n):
-            partition[best_partition[vertex]].add(vertex)
-        ret = ConsistentSolution(order, partition)
+        ret = ConsistentSolution.from_parts(order, [best_partition[vertex] for vertex in order], proper_thinness)
     else:
         ret = proper_thinness
 
@@ -207,9 +221,10 @@ def calculate_proper_thinness_of_connected_graph(
     return ret
 
 
-cdef inline void _build_canonical_vertices(graph: Graph, bitset_t canonical_vertices):
-    cdef list orbit
-    for orbit in graph.automorphism_group(orbits=True, return_group=False):
+cdef inline void _build_canonical_vertices(graph: Graph, bitset_t canonical_vertices, orbits):
+    if orbits is None:
+        orbits = graph.automorphism_group(orbits=True, return_group=False)
+    for orbit in orbits:
         bitset_add(canonical_vertices, <int> orbit[0])
 
 
@@ -231,7 +246,7 @@ cdef int _branch_and_bound(
     binary_matrix_t part_suffix_neighbors,
     bitset_t prefix_non_neighbors_of_vertex,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -241,6 +256,7 @@ cdef int _branch_and_bound(
     int max_seen_entries,
 ):
     """upper_bound is inclusive"""
+    statistics.nodes += 1
     cdef int level = _get_level(suffix_vertices)
 
     cdef bitset_t new_suffix = new_suffixes.rows[level]
@@ -264,7 +280,7 @@ cdef int _branch_and_bound(
 
     # if _check_state_seen(
     #     seen_states,
-    #     seen_entries,
+    #     statistics,
     #     prefix_vertices,
     #     new_suffix,
     #     parts_used,
@@ -293,7 +309,7 @@ cdef int _branch_and_bound(
         part_suffix_neighbors,
         prefix_non_neighbors_of_vertex,
         seen_states,
-        seen_entries,
+        statistics,
         canonical_vertices,
         lower_bound,
         upper_bound,
@@ -349,7 +365,7 @@ cdef int _branch_and_bound(
                 part_suffix_neighbors,
                 prefix_non_neighbors_of_vertex,
                 seen_states,
-                seen_entries,
+                statistics,
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
@@ -377,7 +393,7 @@ cdef int _branch_and_bound(
                 part_suffix_neighbors,
                 prefix_non_neighbors_of_vertex,
                 seen_states,
-                seen_entries,
+                statistics,
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
@@ -420,7 +436,7 @@ cdef inline int _branch_adding_to_existing_part(
     binary_matrix_t part_suffix_neighbors,
     bitset_t prefix_non_neighbors_of_vertex,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -471,7 +487,7 @@ cdef inline int _branch_adding_to_existing_part(
                 part_suffix_neighbors,
                 prefix_non_neighbors_of_vertex,
                 seen_states,
-                seen_entries,
+                statistics,
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
@@ -558,7 +574,7 @@ cdef inline int _branch_adding_to_new_part(
     binary_matrix_t part_suffix_neighbors,
     bitset_t prefix_non_neighbors_of_vertex,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -596,7 +612,7 @@ cdef inline int _branch_adding_to_new_part(
             part_suffix_neighbors,
             prefix_non_neighbors_of_vertex,
             seen_states,
-            seen_entries,
+            statistics,
             canonical_vertices,
             lower_bound,
             upper_bound,
@@ -639,7 +655,7 @@ cdef inline int _branch_with_vertex_on_part(
     binary_matrix_t part_suffix_neighbors,
     bitset_t prefix_non_neighbors_of_vertex,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -686,7 +702,7 @@ cdef inline int _branch_with_vertex_on_part(
         part_suffix_neighbors,
         prefix_non_neighbors_of_vertex,
         seen_states,
-        seen_entries,
+        statistics,
         canonical_vertices,
         lower_bound,
         upper_bound,
@@ -837,7 +853,7 @@ cdef inline bint _is_greedy_part_for_vertex(
 
 cdef inline bint _check_state_seen(
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t prefix_vertices,
     bitset_t suffix_vertices,
     int parts_used,
@@ -858,13 +874,14 @@ cdef inline bint _check_state_seen(
     if frozen_prefix_vertices in seen_states:
         seen_part_neighbors = seen_states[frozen_prefix_vertices]
         if frozen_part_neighbors in seen_part_neighbors:
+            statistics.memo_hits += 1
             return True
-        elif seen_entries[0] < max_seen_entries:
+        elif statistics.memo_entries < max_seen_entries:
             seen_part_neighbors.add(frozen_part_neighbors)
-            seen_entries[0] += 1
-    elif seen_entries[0] < max_seen_entries:
+            statistics.memo_entries += 1
+    elif statistics.memo_entries < max_seen_entries:
         seen_states[frozen_prefix_vertices] = {frozen_part_neighbors}
-        seen_entries[0] += 1
+        statistics.memo_entries += 1
     
     return False
 
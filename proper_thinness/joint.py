@@ -0,0 +1,138 @@
+"""Thinness and proper thinness of a graph, computed together.
+
+Every strongly consistent solution is consistent, so the proper thinness is at least the thinness,
+and a proper solution is a thinness solution. The components are split, relabelled and looked up
+in `thinness.small_graphs` once, and the automorphism orbits of each one are computed once and
+given to both engines. The thinness of the whole graph is then the lower bound of the proper
+search of each component, which stops as soon as it reaches it, and a thinness solution that is
+already strongly consistent saves the proper search altogether. An `incumbent` strongly consistent
+solution bounds both searches from above.
+"""
+from sage.graphs.graph import Graph
+
+from thinness.branch_and_bound import (
+    DEFAULT_MAX_PREFIX_LENGTH,
+    DEFAULT_MAX_SEEN_ENTRIES,
+    _restrict_solution,
+    calculate_thinness_of_connected_graph,
+)
+from thinness.consistent_solution import ConsistentSolution
+from thinness.recognition import thinness_of_recognized_graph
+from thinness.search_statistics import SearchStatistics
+from thinness.small_graphs import lookup_both
+
+from .branch_and_bound import _join_solutions, calculate_proper_thinness_of_connected_graph
+from .verify import verify_solution
+
+
+def calculate_thinness_and_proper_thinness(
+    graph: Graph,
+    certificate: bool = False,
+    max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH,
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    incumbent: ConsistentSolution = None,
+    statistics: SearchStatistics = None,
+    recognize_classes: bool = True,
+    use_small_graphs_table: bool = True
+) -> tuple[int, int] | tuple[ConsistentSolution, ConsistentSolution]:
+    """Return the thinness and the proper thinness of `graph`, or optimal solutions for both with `certificate`.
+
+    `incumbent` is a known strongly consistent solution for `graph`. The counters of both searches
+    are added to `statistics`, if given. Components in the table of `thinness.small_graphs` are
+    answered without searching unless `use_small_graphs_table` is False, and so is the thinness of
+    components in a class with a known thinness unless `recognize_classes` is False.
+    """
+    components = [graph.subgraph(component, immutable=False) for component in graph.connected_components(sort=False)]
+    relabellings = [component.relabel(return_map=True) for component in components]
+    incumbents = [
+        _restrict_solution(incumbent, relabelling) if incumbent is not None else None
+        for relabelling in relabellings
+    ]
+
+    known = [lookup_both(component, certificate=True) if use_small_graphs_table else None for component in components]
+    orbits = [
+        None if pair is not None else component.automorphism_group(orbits=True, return_group=False)
+        for component, pair in zip(components, known)
+    ]
+
+    solutions = [
+        pair[0] if pair is not None else _thinness_solution(
+            component, component_incumbent, component_orbits, max_prefix_length, max_seen_entries, statistics, recognize_classes
+        ) for component, pair, component_incumbent, component_orbits in zip(components, known, incumbents, orbits)
+    ]
+    thinness = max((solution.thinness for solution in solutions), default=0)
+
+    proper_solutions = []
+    for component, pair, solution, component_incumbent, component_orbits in zip(components, known, solutions, incumbents, orbits):
+        if pair is not None:
+            proper_solution = pair[1]
+        elif verify_solution(component, solution):
+            proper_solution = solution
+        else:
+            proper_solution = _proper_solution(
+                component,
+                thinness,
+                component_incumbent,
+                component_orbits,
+                max_prefix_length,
+                max_seen_entries,
+                statistics
+            )
+        proper_solutions.append(proper_solution)
+
+    if certificate:
+        return _join_solutions(solutions, relabellings), _join_solutions(proper_solutions, relabellings)
+    return thinness, max((solution.thinness for solution in proper_solutions), default=0)
+
+
+def _thinness_solution(
+    component: Graph,
+    incumbent: ConsistentSolution | None,
+    orbits: list,
+    max_prefix_length: int,
+    max_seen_entries: int,
+    statistics: SearchStatistics | None,
+    recognize_classes: bool
+) -> ConsistentSolution:
+    # The table was already looked up, so only the recognized classes are left to try.
+    recognized = thinness_of_recognized_graph(component, certificate=True) if recognize_classes else None
+    if recognized is not None:
+        return recognized
+    return calculate_thinness_of_connected_graph(
+        component,
+        certificate=True,
+        max_prefix_length=max_prefix_length,
+        max_seen_entries=max_seen_entries,
+        incumbent=incumbent,
+        statistics=statistics,
+        recognize_classes=False,
+        use_small_graphs_table=False,
+        orbits=orbits
+    )
+
+
+def _proper_solution(
+    component: Graph,
+    lower_bound: int,
+    incumbent: ConsistentSolution | None,
+    orbits: list,
+    max_prefix_length: int,
+    max_seen_entries: int,
+    statistics: SearchStatistics | None
+) -> ConsistentSolution:
+    if incumbent is not None and incumbent.thinness <= lower_bound:
+        return incumbent
+    upper_bound = incumbent.thinness if incumbent is not None else None
+    solution = calculate_proper_thinness_of_connected_graph(
+        component,
+        lower_bound=lower_bound,
+        upper_bound=upper_bound,
+        certificate=True,
+        max_prefix_length=max_prefix_length,
+        max_seen_entries=max_seen_entries,
+        statistics=statistics,
+        use_small_graphs_table=False,
+        orbits=orbits
+    )
+    # The search finds nothing below the exclusive upper bound when the incumbent is optimal.
+    return incumbent if solution is None else solution
@@ -1,25 +1,72 @@
+import functools
 import sys
 import itertools
+import time
 from datetime import datetime
 import multiprocessing as mp
+from collections.abc import Iterable
 
 from thinness.z3_thinness import calculate_proper_thinness_with_z3
 from thinness.helpers import *
-from data import load_graphs_by_proper_thinness, save_graph_with_proper_thinness, get_last_processed_index, save_last_processed_index
-from verify import verify_solution
+from thinness.data import load_graphs_by_proper_thinness, save_graph_with_proper_thinness, get_last_processed_index, save_last_processed_index, \
+    export_results_to_csvs, PROPER_THINNESS
+from thinness.store import ResultStore
+from thinness.table import TABLES_DIR, ThinnessTables, ThinnessTableWriter, encode_record, table_filename, PROPER_THINNESS_COLUMN
+from proper_thinness.verify import verify_solution
 from thinness.consistent_solution import ConsistentSolution
+from thinness.itertools_utils import batched
+from thinness.spool import Coordinator, files_directory, run_worker
+from thinness.telemetry import PipelineMetrics, WorkerMetrics
+from sage.graphs.graph import Graph
 
 GRAPHS_OF_ORDER_10 = 11716571
 GRAPHS_OF_ORDER_9 = 261080
 CHUNK_SIZE = 50
+SHARDS = 4096
 
+# Proper thinness of every connected graph of smaller order, opened once per worker by `init_process`.
+_tables = None
 
-def process_graph(params):
-    G, graphs_dict = params
-    lower_bound = find_lower_bound(G, graphs_dict)
+
+def init_process(n, tables_directory: str = TABLES_DIR):
+    global _tables
+    _tables = ThinnessTables(n - 1, tables_directory)
+
+
+def process_graph(graph6: bytes, metrics: WorkerMetrics):
+    """Return the proper thinness of the graph, whether it is minimal, and its record for the table of its order."""
+    with metrics.time('serialization'):
+        G = Graph(graph6.decode(), immutable=True)
+    with metrics.time('lower_bound'):
+        lower_bound = _tables.max_after_vertex_deletion(G, PROPER_THINNESS_COLUMN)
+    start = time.perf_counter()
     k, _, _ = calculate_proper_thinness_with_z3(G, lower_bound=lower_bound)
-    is_minimal = k > 1 and not has_induced_subgraph(G, graphs_dict[k])
-    return G.graph6_string(), k, is_minimal
+    metrics.record_graph(graph6, G.order(), k, time.perf_counter() - start)
+    is_minimal = k > lower_bound
+    with metrics.time('serialization'):
+        record = encode_record(canonical_graph6(G).encode(), proper_thinness=k)
+    return k, is_minimal, record
+
+
+def process_graphs(batch: Iterable[bytes], metrics: WorkerMetrics = None) -> tuple[int, list[tuple[bytes, int]], bytes, WorkerMetrics]:
+    """Return the number of graphs processed, the minimal ones found with their proper thinness, the table records of all of them and the metrics of the batch."""
+    metrics = metrics or WorkerMetrics()
+    processed = 0
+    minimal_graphs = []
+    records = []
+    for graph6 in batch:
+        k, is_minimal, record = process_graph(graph6, metrics)
+        if is_minimal:
+            minimal_graphs.append((graph6, k))
+        records.append(record)
+        processed += 1
+    return processed, minimal_graphs, b''.join(records), metrics
+
+
+def process_shard(shard: tuple[int, int, int]) -> tuple[int, int, list[tuple[bytes, int]], bytes, WorkerMetrics]:
+    n, res, mod = shard
+    metrics = WorkerMetrics()
+    return res, *process_graphs(metrics.timed(connected_graph6_shard(n, res, mod)), metrics)
 
 
 def estimate_time_remaining(start_time, graphs_processed, graphs_remaining):
@@ -29,11 +76,10 @@ def estimate_time_remaining(start_time, graphs_processed, graphs_remaining):
 
 
 def print_updated_progress(index, last_skipped_graph, start_time):
-    if index % CHUNK_SIZE == 0:
-        graphs_processed = index - last_skipped_graph
-        graphs_remaining = GRAPHS_OF_ORDER_10 - index - 1
-        time_remaining = estimate_time_remaining(start_time, graphs_processed, graphs_remaining)
-        print(f'{index + 1:,} total graphs processed, {graphs_remaining:,} remaining. Time remaining: {time_remaining}', end='\r', flush=True)
+    graphs_processed = index - last_skipped_graph
+    graphs_remaining = GRAPHS_OF_ORDER_10 - index - 1
+    time_remaining = estimate_time_remaining(start_time, graphs_processed, graphs_remaining)
+    print(f'{index + 1:,} total graphs processed, {graphs_remaining:,} remaining. Time remaining: {time_remaining}', end='\r', flush=True)
 
 
 def print_found_graph(graph6, thinness):
@@ -58,25 +104,105 @@ def skip_processed_graphs(graphs):
     return last_processed
 
 
-def fill_csvs_paralelly(n=9):
-    graphs_dict = load_graphs_by_proper_thinness(n-1)
-    for i in range(n):
-        graphs_dict.setdefault(i, [])
+def fill_csvs_paralelly(n=9, metrics: PipelineMetrics = None):
     graphs = connected_graphs_upto(n, start=n)
     last_skipped_graph = skip_processed_graphs(graphs)
+    metrics = metrics or PipelineMetrics()
     
     start_time = datetime.today()
-    with mp.Pool() as pool:
-        params = ((G, graphs_dict) for G in graphs)
-        process_map = pool.imap(process_graph, params, chunksize=CHUNK_SIZE)
-        for index, (graph6, thinness, is_minimal) in enumerate(process_map, start=last_skipped_graph + 1):
-            if is_minimal:
-                save_graph_with_proper_thinness(graph6, thinness)
-                print_found_graph(graph6, thinness)
+    with mp.Pool(initializer=init_process, initargs=(n,)) as pool:
+        batches = metrics.counted(batched(metrics.timed(G.graph6_string().encode() for G in graphs), CHUNK_SIZE))
+        process_map = pool.imap(process_graphs, batches)
+        index = last_skipped_graph
+        for processed, minimal_graphs, _, batch_metrics in metrics.timed(process_map, 'waiting'):
+            metrics.add(batch_metrics)
+            for graph6, thinness in minimal_graphs:
+                save_graph_with_proper_thinness(graph6.decode(), thinness)
+                print_found_graph(graph6.decode(), thinness)
+            index += processed
             save_last_processed_index(index)
             print_updated_progress(index, last_skipped_graph, start_time)
 
 
+def fill_csvs_by_shards(n=9, mod=SHARDS, metrics: PipelineMetrics = None):
+    """Like `fill_csvs_paralelly`, but each worker generates its own geng shards.
+
+    Results go through a `ResultStore`, which records finished shards, so resuming only skips them.
+    The proper thinness of every graph goes to the table of order `n`, used by the run of order `n + 1`.
+    """
+    table_writer = ThinnessTableWriter(n)
+    metrics = metrics or PipelineMetrics()
+    with ResultStore() as store, mp.Pool(initializer=init_process, initargs=(n,)) as pool:
+        processed_shards = store.processed_shards(PROPER_THINNESS, n, mod)
+        shards = metrics.counted((n, res, mod) for res in range(mod) if res not in processed_shards)
+        process_map = pool.imap_unordered(process_shard, shards)
+        for shards_done, result in enumerate(metrics.timed(process_map, 'waiting'), start=len(processed_shards) + 1):
+            merge_shard(table_writer, store, n, mod, result, metrics)
+            print(f'{shards_done:,}/{mod:,} shards processed.', end='\r', flush=True)
+        table_writer.finalize()
+        export_results_to_csvs(store)
+
+
+def fill_csvs_with_workers(spool_directory: str, n=9, mod=SHARDS, metrics: PipelineMetrics = None):
+    """Like `fill_csvs_by_shards`, but the shards are processed by `run_spool_workers`, on any machine sharing `spool_directory`.
+
+    The tables of smaller order are published in the spool with the job, and the workers read them from there.
+    """
+    table_writer = ThinnessTableWriter(n)
+    metrics = metrics or PipelineMetrics()
+    with ResultStore() as store:
+        processed_shards = store.processed_shards(PROPER_THINNESS, n, mod)
+        coordinator = Coordinator(
+            spool_directory,
+            n,
+            mod,
+            [res for res in range(mod) if res not in processed_shards],
+            files=[table_filename(order) for order in range(2, n)]
+        )
+        metrics.expect(len(coordinator.pending))
+        shards_done = len(processed_shards)
+
+        def merge(result):
+            nonlocal shards_done
+            merge_shard(table_writer, store, n, mod, result, metrics)
+            shards_done += 1
+            print(f'{shards_done:,}/{mod:,} shards processed.', end='\r', flush=True)
+
+        coordinator.run(merge)
+        table_writer.finalize()
+        export_results_to_csvs(store)
+
+
+def run_spool_workers(spool_directory: str, processes: int = None):
+    """Run a worker per process on the shards handed out in `spool_directory`, until the coordinator stops them."""
+    initializer = functools.partial(init_process, tables_directory=files_directory(spool_directory))
+    workers = [
+        mp.Process(target=run_worker, args=(spool_directory, process_shard, initializer))
+        for _ in range(processes or mp.cpu_count())
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def merge_shard(
+    table_writer: ThinnessTableWriter,
+    store: ResultStore,
+    n: int,
+    mod: int,
+    result: tuple[int, int, list[tuple[bytes, int]], bytes, WorkerMetrics],
+    metrics: PipelineMetrics = None
+):
+    res, processed, minimal_graphs, records, shard_metrics = result
+    if metrics is not None:
+        metrics.add(shard_metrics)
+    table_writer.add_shard(res, mod, records)
+    store.add_shard(PROPER_THINNESS, n, res, mod, ((graph6.decode(), k) for graph6, k in minimal_graphs))
+    for graph6, thinness in minimal_graphs:
+        print_found_graph(graph6.decode(), thinness)
+
+
 def verify_graphs():
     graphs = load_graphs_by_proper_thinness(9)
     for graph in itertools.chain(*graphs.values()):
@@ -10,15 +10,17 @@ from proper_thinness.verify import verify_solution
 
 class TestBranchAndBound(unittest.TestCase):
     def _assert_proper_thinness_of_graph(self, graph: Graph, expected_proper_thinness: int):
-        actual_proper_thinness = calculate_proper_thinness(graph)
-        self.assertEqual(actual_proper_thinness, expected_proper_thinness)
-        solution = calculate_proper_thinness(graph, certificate=True)
-        self.assertEqual(solution.thinness, expected_proper_thinness)
-        if not verify_solution(graph, solution):
-            print("Graph:", graph.graph6_string())
-            print("Solution order:", solution.order)
-            print("Solution partition:", solution.partition)
-        self.assertTrue(verify_solution(graph, solution))
+        for use_small_graphs_table in [True, False]:
+            with self.subTest(use_small_graphs_table=use_small_graphs_table):
+                actual_proper_thinness = calculate_proper_thinness(graph, use_small_graphs_table=use_small_graphs_table)
+                self.assertEqual(actual_proper_thinness, expected_proper_thinness)
+                solution = calculate_proper_thinness(graph, certificate=True, use_small_graphs_table=use_small_graphs_table)
+                self.assertEqual(solution.thinness, expected_proper_thinness)
+                if not verify_solution(graph, solution):
+                    print("Graph:", graph.graph6_string())
+                    print("Solution order:", solution.order)
+                    print("Solution partition:", solution.partition)
+                self.assertTrue(verify_solution(graph, solution))
 
     def test_proper_thinness_of_K1(self):
         self._assert_proper_thinness_of_graph(Graph(1), 1)
@@ -39,6 +41,14 @@ class TestBranchAndBound(unittest.TestCase):
         graph = Graph(r'J?AADI\x\z_')
         calculate_proper_thinness(graph)
 
+    def test_upper_bound(self):
+        graph = graphs.ClawGraph().disjoint_union(graphs.PathGraph(3))
+        self.assertEqual(calculate_proper_thinness(graph, upper_bound=2, use_small_graphs_table=False), 2)
+        self.assertIsNone(calculate_proper_thinness(graph, upper_bound=2, certificate=True, use_small_graphs_table=False))
+        solution = calculate_proper_thinness(graph, upper_bound=3, certificate=True, use_small_graphs_table=False)
+        self.assertEqual(solution.thinness, 2)
+        self.assertTrue(verify_solution(graph, solution))
+
     def test_proper_thinness_of_small_graph(self):
         graph = Graph(r'CN')
         self._assert_proper_thinness_of_graph(graph, 1)
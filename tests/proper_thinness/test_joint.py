@@ -0,0 +1,51 @@
+import unittest
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from proper_thinness.branch_and_bound import calculate_proper_thinness
+from proper_thinness.joint import calculate_thinness_and_proper_thinness
+from proper_thinness.verify import verify_solution as verify_proper_solution
+from thinness.branch_and_bound import calculate_thinness
+from thinness.search_statistics import SearchStatistics
+from thinness.verify import verify_solution
+
+
+class TestJoint(unittest.TestCase):
+    def _assert_joint(self, graph: Graph, **kwargs):
+        expected = (calculate_thinness(graph), calculate_proper_thinness(graph))
+        self.assertEqual(calculate_thinness_and_proper_thinness(graph, **kwargs), expected)
+        solution, proper_solution = calculate_thinness_and_proper_thinness(graph, certificate=True, **kwargs)
+        self.assertEqual((solution.thinness, proper_solution.thinness), expected)
+        self.assertTrue(verify_solution(graph, solution))
+        self.assertTrue(verify_proper_solution(graph, proper_solution))
+
+    def test_small_graphs(self):
+        for graph in [Graph(1), Graph(5), graphs.CycleGraph(4), graphs.PetersenGraph().subgraph(range(9))]:
+            with self.subTest(graph=graph.graph6_string()):
+                self._assert_joint(graph)
+
+    def test_random_graphs_without_the_table(self):
+        set_random_seed(0)
+        for _ in range(10):
+            graph = graphs.RandomGNP(10, 0.4)
+            with self.subTest(graph=graph.graph6_string()):
+                self._assert_joint(graph, recognize_classes=False, use_small_graphs_table=False)
+
+    def test_disconnected_graph(self):
+        graph = graphs.PetersenGraph().disjoint_union(graphs.CycleGraph(6)).disjoint_union(graphs.PathGraph(12))
+        self._assert_joint(graph)
+
+    def test_proper_incumbent(self):
+        graph = graphs.PetersenGraph()
+        incumbent = calculate_proper_thinness(graph, certificate=True)
+        statistics = SearchStatistics()
+        solution, proper_solution = calculate_thinness_and_proper_thinness(graph, certificate=True, incumbent=incumbent, statistics=statistics)
+        self.assertEqual(proper_solution.thinness, incumbent.thinness)
+        self.assertTrue(verify_proper_solution(graph, proper_solution))
+        self.assertEqual(solution.thinness, calculate_thinness(graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import copy
+import resource
+import unittest
+
+from thinness.benchmark import run, compare
+
+
+class TestBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = run(['crown'], ['thinness-bab', 'thinness-dp'])
+
+    def test_results_have_statistics_per_instance_and_engine(self):
+        results = self.results['results']
+        self.assertEqual(
+            [(result['instance'], result['engine']) for result in results if result['instance'] == '4'],
+            [('4', 'thinness-bab'), ('4', 'thinness-dp')]
+        )
+        for result in results:
+            self.assertEqual(result['status'], 'ok')
+            self.assertEqual(result['value'], int(result['instance']) - 1)
+            # The memory of the parent, which the forked runs start with, is not counted.
+            self.assertGreaterEqual(result['peak_rss_increase_kb'], 0)
+            self.assertLess(result['peak_rss_increase_kb'], resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 2)
+            if result['engine'] == 'thinness-bab':
+                self.assertIsNotNone(result['nodes'])
+            else:
+                self.assertIsNone(result['nodes'])
+        self.assertEqual(self.results['metadata']['seed'], 0)
+
+    def test_compare_flags_regressions(self):
+        self.assertEqual(compare(self.results, self.results), [])
+        current = copy.deepcopy(self.results)
+        slower, wrong = current['results'][-2:]
+        slower['wall_time'] = slower['wall_time'] * 2 + 1
+        wrong['value'] += 1
+        regressions = compare(self.results, current)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('wall time', regressions[0])
+        self.assertIn('value changed', regressions[1])
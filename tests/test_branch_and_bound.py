@@ -5,18 +5,23 @@ from sage.graphs.graph import Graph
 from sage.graphs.graph_generators import graphs
 from sage.misc.randstate import set_random_seed
 
-from thinness.branch_and_bound import calculate_thinness
+from thinness.branch_and_bound import calculate_thinness, calculate_thinness_of_graph6
 from thinness.z3 import Z3ThinnessSolver
 from thinness.verify import verify_solution
+from thinness.consistent_solution import ConsistentSolution
+from thinness.search_statistics import SearchBudgetExceeded, SearchStatistics
 from thinness.shower import show_graph, show_solution
 
 class TestBranchAndBound(unittest.TestCase):
     def _assert_thinness_of_graph(self, graph: Graph, expected_thinness: int):
-        actual_thinness = calculate_thinness(graph)
-        self.assertEqual(actual_thinness, expected_thinness)
-        solution = calculate_thinness(graph, certificate=True)
-        self.assertEqual(solution.thinness, expected_thinness)
-        self.assertTrue(verify_solution(graph, solution))
+        for search_only in [False, True]:
+            options = dict(recognize_classes=False, use_small_graphs_table=False) if search_only else {}
+            with self.subTest(search_only=search_only):
+                actual_thinness = calculate_thinness(graph, **options)
+                self.assertEqual(actual_thinness, expected_thinness)
+                solution = calculate_thinness(graph, certificate=True, **options)
+                self.assertEqual(solution.thinness, expected_thinness)
+                self.assertTrue(verify_solution(graph, solution))
 
     def test_thinness_of_K1(self):
         self._assert_thinness_of_graph(Graph(1), 1)
@@ -33,6 +38,27 @@ class TestBranchAndBound(unittest.TestCase):
     def test_thinness_of_cycle(self):
         self._assert_thinness_of_graph(graphs.CycleGraph(4), 2)
 
+    def test_incumbent_reaching_the_lower_bound(self):
+        graph = crown_graph(4)
+        incumbent = calculate_thinness(graph, certificate=True)
+        solution = calculate_thinness(
+            graph, lower_bound=3, certificate=True, incumbent=incumbent, recognize_classes=False, use_small_graphs_table=False
+        )
+        self.assertEqual(solution.thinness, 3)
+        self.assertTrue(verify_solution(graph, solution))
+
+    def test_incumbent_is_improved(self):
+        graph = graphs.CycleGraph(4).disjoint_union(graphs.PathGraph(3))
+        order = list(graph)
+        incumbent = ConsistentSolution(order, [{vertex} for vertex in order])
+        statistics = SearchStatistics()
+        solution = calculate_thinness(
+            graph, certificate=True, incumbent=incumbent, statistics=statistics, recognize_classes=False, use_small_graphs_table=False
+        )
+        self.assertEqual(solution.thinness, 2)
+        self.assertGreater(statistics.nodes, 0)
+        self.assertTrue(verify_solution(graph, solution))
+
     def test_graph_that_segfaults(self):
         graph = Graph(r'J?AADI\x\z_')
         calculate_thinness(graph)
@@ -74,6 +100,46 @@ class TestBranchAndBound(unittest.TestCase):
         self.assertGreaterEqual(calculate_thinness(second), calculate_thinness(first))
         self._assert_thinness_of_graph(first, 3)
 
+    def test_lower_bound_prunes_nodes(self):
+        statistics = SearchStatistics()
+        self._assert_thinness_of_graph(crown_graph(6), 5)
+        self.assertEqual(calculate_thinness(crown_graph(6), statistics=statistics, recognize_classes=False), 5)
+        self.assertGreater(statistics.bound_prunes, 0)
+
+    def test_node_budget(self):
+        graph = crown_graph(6)
+        statistics = SearchStatistics()
+        self.assertEqual(calculate_thinness(graph, recognize_classes=False, statistics=statistics), 5)
+        self.assertEqual(calculate_thinness(graph, recognize_classes=False, max_nodes=statistics.nodes), 5)
+        with self.assertRaises(SearchBudgetExceeded):
+            calculate_thinness(graph, recognize_classes=False, max_nodes=statistics.nodes // 2)
+
+    def test_thinness_of_graph6(self):
+        set_random_seed(0)
+        graph_list = [graph for n in range(1, 7) for graph in graphs(n)]
+        graph_list += [graphs.RandomGNP(n, 0.3) for n in range(8, 14)] + [Graph(r'Mi\rzx?OA@gEONON?'), crown_graph(5)]
+        for graph in graph_list:
+            graph6 = graph.graph6_string().encode()
+            orbits = graph.automorphism_group(orbits=True, return_group=False)
+            expected_thinness = calculate_thinness(graph)
+            self.assertEqual(calculate_thinness_of_graph6(graph6), expected_thinness)
+            self.assertEqual(calculate_thinness_of_graph6(graph6, orbits=orbits), expected_thinness)
+            solution = calculate_thinness_of_graph6(graph6, certificate=True, orbits=orbits)
+            self.assertEqual(solution.thinness, expected_thinness)
+            self.assertTrue(verify_solution(graph, solution))
+
+    def test_graph6_of_large_orders(self):
+        graph = graphs.CycleGraph(70)
+        self.assertEqual(calculate_thinness_of_graph6(graph.graph6_string().encode()), 2)
+        with self.assertRaises(ValueError):
+            calculate_thinness_of_graph6(b'D')
+        # A string for 53520 vertices without its adjacency bits, whose length overflows an int.
+        with self.assertRaises(ValueError):
+            calculate_thinness_of_graph6(b'~LCO')
+        for graph6 in [b'D\x00???', b'\x00', b'C~\x7f']:
+            with self.assertRaises(ValueError):
+                calculate_thinness_of_graph6(graph6)
+
 
 def crown_graph(vertices_per_side: int) -> Graph:
     graph = Graph(2*vertices_per_side)
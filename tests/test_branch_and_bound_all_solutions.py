@@ -0,0 +1,81 @@
+import itertools
+import time
+import unittest
+
+from sage.graphs.graph_generators import graphs
+
+from thinness.branch_and_bound_all_solutions import calculate_thinness_of_connected_graph, optimal_solutions, \
+    count_optimal_solutions, to_consistent_solution
+from thinness.verify import verify_solution
+
+
+class TestBranchAndBoundAllSolutions(unittest.TestCase):
+    def _grid(self, rows, columns):
+        graph = graphs.Grid2dGraph(rows, columns)
+        graph.relabel()
+        return graph
+
+    def test_streamed_solutions_match_the_list(self):
+        graph = self._grid(3, 4)
+        solutions = calculate_thinness_of_connected_graph(graph)
+        streamed = list(optimal_solutions(graph))
+        self.assertEqual(
+            sorted((tuple(solution.order), tuple(solution.part_of(vertex) for vertex in graph)) for solution in solutions),
+            sorted((tuple(order), tuple(part_of)) for order, part_of in streamed)
+        )
+        self.assertEqual(count_optimal_solutions(graph), len(streamed))
+        for order, part_of in streamed:
+            solution = to_consistent_solution(order, part_of)
+            self.assertEqual(solution.thinness, 2)
+            self.assertTrue(verify_solution(graph, solution))
+
+    def test_orbit_representatives(self):
+        cube = graphs.CubeGraph(3)
+        cube.relabel()
+        for graph in [self._grid(3, 3), cube]:
+            with self.subTest(graph=graph.graph6_string()):
+                representatives = list(optimal_solutions(graph, orbit_representatives=True))
+                self.assertEqual(len(representatives), count_optimal_solutions(graph, orbit_representatives=True))
+                self.assertLess(len(representatives), count_optimal_solutions(graph))
+
+                automorphisms = graph.automorphism_group().list()
+                orbits = [
+                    {(tuple(automorphism(vertex) for vertex in order), _parts_in_order(order, part_of)) for automorphism in automorphisms}
+                    for order, part_of in representatives
+                ]
+                for first, second in itertools.combinations(orbits, 2):
+                    self.assertTrue(first.isdisjoint(second))
+                # Every solution is in the orbit of a representative.
+                for order, part_of in optimal_solutions(graph):
+                    solution = (tuple(order), _parts_in_order(order, part_of))
+                    self.assertTrue(any(solution in orbit for orbit in orbits))
+
+    def test_orbit_representatives_of_graphs_with_large_groups(self):
+        # Their automorphism groups have 12! and 2^8 * 8! elements, far too many to list.
+        for graph in [graphs.StarGraph(12), (graphs.CompleteGraph(2) * 8).complement()]:
+            graph.relabel()
+            with self.subTest(graph=graph.graph6_string()):
+                representatives = list(optimal_solutions(graph, orbit_representatives=True))
+                self.assertGreaterEqual(len(representatives), 1)
+                self.assertLessEqual(len(representatives), count_optimal_solutions(graph))
+
+    def test_closing_the_generator_stops_the_search(self):
+        graph = self._grid(5, 5)
+        solutions = optimal_solutions(graph, thinness=3, max_queued_solutions=4)
+        first_solutions = list(itertools.islice(solutions, 3))
+        solutions.close()
+        self.assertEqual(len(first_solutions), 3)
+
+    def test_closing_the_generator_with_room_in_the_queue_stops_the_search(self):
+        # The search would take seconds to fill the queue, and minutes to finish.
+        graph = self._grid(6, 6)
+        solutions = optimal_solutions(graph, thinness=4, max_queued_solutions=1_000_000)
+        self.assertEqual(len(list(itertools.islice(solutions, 3))), 3)
+        start = time.perf_counter()
+        solutions.close()
+        self.assertLess(time.perf_counter() - start, 1)
+
+
+def _parts_in_order(order, part_of):
+    names = {}
+    return tuple(names.setdefault(part_of[vertex], len(names)) for vertex in order)
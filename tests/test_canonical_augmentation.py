@@ -0,0 +1,25 @@
+import unittest
+from collections import Counter
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.canonical_augmentation import connected_graphs_with_thinness
+from thinness.helpers import canonical_graph6
+from thinness.verify import verify_solution
+
+CONNECTED_GRAPHS_BY_ORDER = [1, 1, 1, 2, 6, 21, 112, 853]  # https://oeis.org/A001349
+
+
+class TestCanonicalAugmentation(unittest.TestCase):
+    def test_every_connected_graph_is_generated_once(self):
+        max_order = 7
+        generated = list(connected_graphs_with_thinness(max_order))
+        orders = Counter(graph.order() for graph, _ in generated)
+        self.assertEqual([orders[n] for n in range(1, max_order + 1)], CONNECTED_GRAPHS_BY_ORDER[1:])
+        self.assertEqual(len({canonical_graph6(graph) for graph, _ in generated}), len(generated))
+
+    def test_inherited_bounds_give_the_thinness(self):
+        for graph, solution in connected_graphs_with_thinness(6, min_order=6):
+            with self.subTest(graph=graph.graph6_string()):
+                self.assertTrue(graph.is_connected())
+                self.assertTrue(verify_solution(graph, solution))
+                self.assertEqual(solution.thinness, calculate_thinness(graph))
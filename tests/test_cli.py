@@ -0,0 +1,70 @@
+import io
+import unittest
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.cli import parse_arguments, run
+from thinness.consistent_solution import ConsistentSolution
+from thinness.verify import verify_solution
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.graphs = [G for G in graphs(6) if G.is_connected()]
+        self.input = io.StringIO(''.join(G.graph6_string() + '\n' for G in self.graphs))
+
+    def _run(self, *arguments, errors=None):
+        output = io.StringIO()
+        run(self.input, output, parse_arguments(['--workers', '2', '--chunk-size', '7', *arguments]), errors=errors or io.StringIO())
+        return [row.split(',') for row in output.getvalue().splitlines()]
+
+    def test_rows_follow_the_input_order(self):
+        rows = self._run()
+        self.assertEqual([graph6 for graph6, _ in rows], [G.graph6_string() for G in self.graphs])
+        self.assertEqual([int(thinness) for _, thinness in rows], [calculate_thinness(G) for G in self.graphs])
+
+    def test_unordered_rows_have_the_same_content(self):
+        self.assertCountEqual(self._run('--unordered'), [[G.graph6_string(), str(calculate_thinness(G))] for G in self.graphs])
+
+    def test_filters(self):
+        rows = self._run('--min', '2')
+        self.assertEqual(
+            [graph6 for graph6, _ in rows],
+            [G.graph6_string() for G in self.graphs if calculate_thinness(G) >= 2]
+        )
+        self.assertEqual(self._run('--max', '0'), [])
+
+    def test_minimal(self):
+        cycle_with_pendant_vertex = graphs.CycleGraph(4)
+        cycle_with_pendant_vertex.add_edge(0, 4)
+        candidates = [graphs.CycleGraph(4), graphs.CycleGraph(5), cycle_with_pendant_vertex]
+        self.input = io.StringIO(''.join(G.graph6_string() + '\n' for G in candidates))
+        self.assertEqual(self._run('--minimal'), [[graphs.CycleGraph(4).graph6_string(), '2'], [graphs.CycleGraph(5).graph6_string(), '2']])
+
+    def test_graphs_of_order_0_and_1(self):
+        self.input = io.StringIO('?\n@\n')
+        self.assertEqual(self._run('--minimal', '--proper'), [['?', '0', '0'], ['@', '1', '1']])
+        self.input = io.StringIO('?\n@\n')
+        self.assertEqual(self._run('--certificate'), [['?', '0', ''], ['@', '1', '0:0']])
+
+    def test_invalid_lines_are_reported_without_stopping(self):
+        self.input = io.StringIO('C~\nnot graph6\nCN\n')
+        errors = io.StringIO()
+        rows = self._run(errors=errors)
+        self.assertEqual([graph6 for graph6, _ in rows], ['C~', 'CN'])
+        self.assertEqual(len(errors.getvalue().splitlines()), 1)
+        self.assertTrue(errors.getvalue().startswith('not graph6: '))
+
+    def test_proper_thinness_and_certificate(self):
+        for graph6, thinness, proper_thinness, certificate in self._run('--proper', '--certificate'):
+            pairs = [pair.split(':') for pair in certificate.split()]
+            solution = ConsistentSolution.from_parts([int(vertex) for vertex, _ in pairs], [int(part) for _, part in pairs])
+            self.assertEqual(solution.thinness, int(thinness))
+            self.assertGreaterEqual(int(proper_thinness), int(thinness))
+            self.assertTrue(verify_solution(Graph(graph6), solution))
+
+
+if __name__ == '__main__':
+    unittest.main()
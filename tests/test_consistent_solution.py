@@ -0,0 +1,27 @@
+import unittest
+
+from thinness.consistent_solution import ConsistentSolution
+
+
+class TestConsistentSolution(unittest.TestCase):
+    def test_parts_follow_the_partition(self):
+        solution = ConsistentSolution(['b', 'a', 'c'], [{'a'}, {'b', 'c'}])
+        self.assertEqual(solution.parts, [1, 0, 1])
+        self.assertEqual(solution.thinness, 2)
+        self.assertEqual(solution.position('c'), 2)
+        self.assertEqual(solution.part_of('b'), 1)
+        self.assertIsNone(solution.part_of('d'))
+
+    def test_partition_is_built_from_parts(self):
+        solution = ConsistentSolution.from_parts([2, 0, 1, 3], [0, 1, 0, 2])
+        self.assertEqual(solution.thinness, 3)
+        self.assertEqual(solution.partition, [{2, 1}, {0}, {3}])
+        self.assertEqual(solution.part_of(3), 2)
+
+    def test_explicit_thinness_keeps_empty_parts(self):
+        solution = ConsistentSolution.from_parts([0], [0], thinness=2)
+        self.assertEqual(solution.partition, [{0}, set()])
+
+    def test_attributes_are_slots(self):
+        with self.assertRaises(AttributeError):
+            ConsistentSolution([0], [{0}]).other = 1
@@ -0,0 +1,18 @@
+import unittest
+
+from sage.graphs.graph import Graph
+
+from thinness.helpers import connected_graph6_shard
+
+
+class TestConnectedGraph6Shard(unittest.TestCase):
+    def test_single_shard_generates_all_connected_graphs(self):
+        graph6_strings = list(connected_graph6_shard(6))
+        self.assertEqual(len(graph6_strings), 112)
+        self.assertTrue(all(Graph(graph6.decode()).is_connected() for graph6 in graph6_strings))
+
+    def test_shards_partition_the_graphs(self):
+        mod = 7
+        shards = [set(connected_graph6_shard(7, res, mod)) for res in range(mod)]
+        self.assertEqual(sum(len(shard) for shard in shards), 853)
+        self.assertEqual(len(set.union(*shards)), 853)
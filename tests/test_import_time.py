@@ -0,0 +1,38 @@
+import json
+import subprocess
+import sys
+import unittest
+
+ENGINE_MODULES = [
+    'thinness.branch_and_bound',
+    'thinness.table',
+    'thinness.helpers',
+    'proper_thinness.branch_and_bound',
+    'lmimw.branch_and_bound',
+]
+HEAVY_MODULES = [
+    'sage.all',
+    'z3',
+    'sage.plot.plot',
+    'sage.numerical.mip',
+    'sage.combinat.permutation',
+    'sage.features.nauty',
+]
+IMPORT_TIME_BUDGET = 2.0  # seconds
+
+
+class TestImportTime(unittest.TestCase):
+    def test_engines_import_quickly_without_heavy_modules(self):
+        script = f'''
+import json, sys, time
+start = time.perf_counter()
+for module in {ENGINE_MODULES!r}:
+    __import__(module)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "heavy": [module for module in {HEAVY_MODULES!r} if module in sys.modules]}}))
+'''
+        # A fresh interpreter, as this one has already imported everything the other tests use.
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, check=True, text=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        self.assertEqual(result['heavy'], [])
+        self.assertLess(result['elapsed'], IMPORT_TIME_BUDGET)
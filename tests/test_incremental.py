@@ -0,0 +1,63 @@
+import random
+import unittest
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.incremental import GraphEdit, repair_solution, resolve_thinness
+from thinness.search_statistics import SearchStatistics
+from thinness.verify import verify_solution
+
+
+def _random_edit(graph: Graph, generator: random.Random) -> GraphEdit:
+    vertices = list(graph)
+    non_edges = [(u, v) for i, u in enumerate(vertices) for v in vertices[i + 1:] if not graph.has_edge(u, v)]
+    edges = [(u, v) for u, v, _ in graph.edges()]
+    new_vertex = max(vertices) + 1
+    return GraphEdit(
+        added_vertices=(new_vertex,) if generator.random() < 0.5 else (),
+        removed_vertices=tuple(generator.sample(vertices, generator.randint(0, 1))),
+        added_edges=tuple(generator.sample(non_edges, min(len(non_edges), generator.randint(0, 2)))) +
+            ((new_vertex, generator.choice(vertices)),) * (generator.random() < 0.5),
+        removed_edges=tuple(generator.sample(edges, min(len(edges), generator.randint(0, 2)))),
+    )
+
+
+class TestIncremental(unittest.TestCase):
+    def test_random_edits_keep_an_optimal_solution(self):
+        set_random_seed(0)
+        generator = random.Random(0)
+        graph = graphs.RandomGNP(9, 0.5)
+        solution = calculate_thinness(graph, certificate=True)
+        for _ in range(30):
+            edit = _random_edit(graph, generator)
+            graph = edit.apply(graph)
+            solution = resolve_thinness(graph, solution, edit)
+            with self.subTest(graph=graph.graph6_string(), edit=edit):
+                self.assertTrue(verify_solution(graph, solution))
+                self.assertEqual(solution.thinness, calculate_thinness(graph))
+
+    def test_repaired_solution_keeps_the_old_order(self):
+        graph = graphs.PathGraph(6)
+        solution = calculate_thinness(graph, certificate=True)
+        edited = GraphEdit(added_vertices=(6,), removed_vertices=(0,), added_edges=((6, 3),)).apply(graph)
+        repaired = repair_solution(edited, solution)
+        self.assertTrue(verify_solution(edited, repaired))
+        self.assertEqual([vertex for vertex in repaired.order if vertex != 6], [vertex for vertex in solution.order if vertex != 0])
+
+    def test_adding_a_vertex_that_fits_needs_no_search(self):
+        graph = graphs.CycleGraph(8)
+        solution = calculate_thinness(graph, certificate=True)
+        edit = GraphEdit(added_vertices=(8,), added_edges=((8, 0),))
+        statistics = SearchStatistics()
+        edited = edit.apply(graph)
+        resolved = resolve_thinness(edited, solution, edit, statistics)
+        self.assertEqual(resolved.thinness, solution.thinness)
+        self.assertTrue(verify_solution(edited, resolved))
+        self.assertEqual(statistics.nodes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from thinness import helpers
+from thinness.induced_subgraph import PatternSet, find_induced_subgraph
+
+
+class TestInducedSubgraph(unittest.TestCase):
+    def _assert_is_induced_embedding(self, host, pattern, embedding):
+        self.assertEqual(sorted(embedding), sorted(pattern))
+        self.assertEqual(len(set(embedding.values())), pattern.order())
+        for u in pattern:
+            for v in pattern:
+                if u != v:
+                    self.assertEqual(pattern.has_edge(u, v), host.has_edge(embedding[u], embedding[v]))
+
+    def test_matches_sage(self):
+        set_random_seed(0)
+        patterns = [G for G in graphs(5) if G.is_connected()]
+        pattern_set = PatternSet(patterns)
+        for _ in range(40):
+            host = graphs.RandomGNP(9, 0.4)
+            expected = next((i for i, H in enumerate(patterns) if host.subgraph_search(H, induced=True) is not None), None)
+            found = pattern_set.find(host)
+            if expected is None:
+                self.assertIsNone(found)
+            else:
+                index, embedding = found
+                self.assertEqual(index, expected)
+                self._assert_is_induced_embedding(host, patterns[index], embedding)
+
+    def test_labels_of_host_and_pattern_are_kept(self):
+        host = graphs.Grid2dGraph(3, 3)
+        pattern = Graph({'a': ['b'], 'b': ['c'], 'c': ['d'], 'd': ['a']})
+        index, embedding = find_induced_subgraph(host, [graphs.CompleteGraph(3), pattern])
+        self.assertEqual(index, 1)
+        self._assert_is_induced_embedding(host, pattern, embedding)
+
+    def test_induced_is_required(self):
+        # C4 is a subgraph of K4, but not an induced one.
+        self.assertIsNone(find_induced_subgraph(graphs.CompleteGraph(4), [graphs.CycleGraph(4)]))
+        self.assertIsNone(find_induced_subgraph(graphs.CycleGraph(5), [graphs.CycleGraph(4), graphs.PathGraph(6)]))
+
+    def test_large_hosts_fall_back_to_sage(self):
+        host = graphs.CycleGraph(70)
+        index, embedding = find_induced_subgraph(host, [graphs.CycleGraph(4), graphs.PathGraph(5)])
+        self.assertEqual(index, 1)
+        self._assert_is_induced_embedding(host, graphs.PathGraph(5), embedding)
+
+    def test_graph6_patterns(self):
+        set_random_seed(0)
+        patterns = [G for G in graphs(5) if G.is_connected()]
+        graph6_set = PatternSet([G.graph6_string().encode() for G in patterns])
+        pattern_set = PatternSet(patterns)
+        for _ in range(40):
+            host = graphs.RandomGNP(9, 0.4)
+            found = graph6_set.find(host)
+            self.assertEqual(found[0] if found else None, (pattern_set.find(host) or (None,))[0])
+            if found is not None:
+                self._assert_is_induced_embedding(host, patterns[found[0]], found[1])
+        index, embedding = PatternSet([graphs.CycleGraph(64).graph6_string()]).find(graphs.CycleGraph(64))
+        self._assert_is_induced_embedding(graphs.CycleGraph(64), graphs.CycleGraph(64), embedding)
+        with self.assertRaises(ValueError):
+            PatternSet([graphs.CycleGraph(70).graph6_string()])
+
+    def test_has_induced_subgraph_sees_changed_lists(self):
+        patterns = [graphs.CycleGraph(4)]
+        self.assertFalse(helpers.has_induced_subgraph(graphs.CycleGraph(6), patterns))
+        patterns[0] = graphs.PathGraph(4)
+        self.assertTrue(helpers.has_induced_subgraph(graphs.CycleGraph(6), patterns))
+
+
+if __name__ == '__main__':
+    unittest.main()
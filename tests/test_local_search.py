@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.local_search import OrderState, local_search, parallel_local_search
+from thinness.order import thinness_of_order
+from thinness.verify import verify_solution
+
+
+class TestOrderState(unittest.TestCase):
+    def test_moves_keep_an_optimal_partition_for_the_order(self):
+        set_random_seed(0)
+        generator = random.Random(0)
+        for _ in range(10):
+            graph = graphs.RandomGNP(9, 0.5)
+            neighbors = [sum(1 << neighbor for neighbor in graph.neighbor_iterator(vertex)) for vertex in graph]
+            state = OrderState(neighbors, list(range(9)))
+            for _ in range(10):
+                state.move(generator.randrange(9), generator.randrange(9))
+                with self.subTest(graph=graph.graph6_string(), order=state.order):
+                    self.assertEqual(state.thinness, thinness_of_order(graph, list(state.order)))
+                    self.assertTrue(verify_solution(graph, state.solution()))
+                    fresh = OrderState(neighbors, state.order)
+                    self.assertEqual(state.incompatible_pairs, fresh.incompatible_pairs)
+
+
+class TestLocalSearch(unittest.TestCase):
+    def test_small_graphs_reach_the_thinness(self):
+        set_random_seed(0)
+        for _ in range(5):
+            graph = graphs.RandomGNP(10, 0.4)
+            with self.subTest(graph=graph.graph6_string()):
+                result = local_search(graph, seed=0, max_iterations=5000)
+                self.assertEqual(result.solution.thinness, calculate_thinness(graph))
+                self.assertTrue(verify_solution(graph, result.solution))
+
+    def test_history_and_progress_report_improvements(self):
+        graph = graphs.Grid2dGraph(5, 5)
+        reported = []
+        result = local_search(graph, seed=0, max_iterations=2000, progress=lambda seconds, solution: reported.append(solution.thinness))
+        self.assertEqual(reported, [thinness for _, thinness in result.history])
+        self.assertEqual(reported, sorted(reported, reverse=True))
+        self.assertEqual(result.solution.thinness, reported[-1])
+        self.assertTrue(verify_solution(graph, result.solution))
+
+    def test_parallel_results_are_sorted(self):
+        graph = graphs.Grid2dGraph(4, 6)
+        results = parallel_local_search(graph, [0, 1, 2], max_iterations=500)
+        self.assertEqual(sorted(result.seed for result in results), [0, 1, 2])
+        self.assertEqual(results, sorted(results, key=lambda result: result.solution.thinness))
+        for result in results:
+            self.assertTrue(verify_solution(graph, result.solution))
@@ -0,0 +1,33 @@
+import random
+import unittest
+
+from thinness.non_betweenness import non_betweenness, non_betweenness_by_enumeration, solve_non_betweenness
+from thinness.time_non_betweenness import random_instance
+
+
+def _is_valid(permutation, triples):
+    position = {element: i for i, element in enumerate(permutation)}
+    return all(not min(position[a], position[c]) < position[b] < max(position[a], position[c]) for a, b, c in triples)
+
+
+class TestNonBetweenness(unittest.TestCase):
+    def test_matches_enumeration(self):
+        generator = random.Random(0)
+        for _ in range(100):
+            n = generator.randint(3, 7)
+            triples = [tuple(generator.sample(range(n), 3)) for _ in range(generator.randint(0, 3 * n))]
+            with self.subTest(n=n, triples=triples):
+                permutation = solve_non_betweenness(range(n), triples)
+                self.assertEqual(permutation is not None, non_betweenness_by_enumeration(range(n), triples))
+                if permutation is not None:
+                    self.assertEqual(sorted(permutation), list(range(n)))
+                    self.assertTrue(_is_valid(permutation, triples))
+
+    def test_no_element_can_be_in_the_middle(self):
+        self.assertFalse(non_betweenness('abc', [('a', 'b', 'c'), ('b', 'c', 'a'), ('c', 'a', 'b')]))
+
+    def test_thousands_of_triples(self):
+        triples = random_instance(100, 2000, seed=0, planted=True)
+        permutation = solve_non_betweenness(range(100), triples)
+        self.assertTrue(_is_valid(permutation, triples))
+        self.assertIsNone(solve_non_betweenness(range(100), random_instance(100, 2000, seed=0)))
@@ -0,0 +1,70 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from thinness.obstructions import Obstructions, _decode_degrees, compile_obstructions, compiled_filename
+
+
+class TestObstructions(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.csv_filename = os.path.join(self.directory.name, 'thinness-2.csv')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_csv(self, graph_list):
+        with open(self.csv_filename, mode='w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['graph6', 'name', 'hog'])
+            writer.writerows([graph.graph6_string(), '', ''] for graph in graph_list)
+
+    def _obstructions(self):
+        return Obstructions(self.csv_filename, os.path.join(self.directory.name, 'compiled'))
+
+    def test_degrees_are_decoded_from_graph6(self):
+        set_random_seed(0)
+        for n in range(1, 15):
+            graph = graphs.RandomGNP(n, 0.5)
+            self.assertEqual(_decode_degrees(graph.graph6_string().encode()), (n, graph.degree()))
+
+    def test_graphs_are_grouped_by_order(self):
+        self._write_csv([graphs.CycleGraph(5), graphs.CycleGraph(4), graphs.PathGraph(5)])
+        obstructions = self._obstructions()
+        self.assertEqual(obstructions.orders(), [4, 5])
+        self.assertEqual(obstructions.count(5), 2)
+        self.assertEqual(len(obstructions), 3)
+        self.assertEqual([graph.order() for graph in obstructions.graphs(max_order=4)], [4])
+
+    def test_candidates_are_filtered(self):
+        self._write_csv([graphs.CycleGraph(4), graphs.StarGraph(3), graphs.CompleteGraph(4)])
+        obstructions = self._obstructions()
+        candidates = list(obstructions.candidates(graphs.CycleGraph(6)))
+        self.assertEqual([candidate.graph6_string() for candidate in candidates], [graphs.CycleGraph(4).graph6_string()])
+        self.assertFalse(obstructions.has_induced_subgraph_of(graphs.CycleGraph(6)))
+        self.assertTrue(obstructions.has_induced_subgraph_of(graphs.WheelGraph(5)))
+
+    def test_compiled_file_is_rebuilt_when_the_csv_changes(self):
+        self._write_csv([graphs.CycleGraph(4)])
+        self.assertEqual(len(self._obstructions()), 1)
+        self._write_csv([graphs.CycleGraph(4), graphs.CycleGraph(5)])
+        compiled_mtime = os.path.getmtime(self._obstructions().filename)
+        os.utime(self.csv_filename, (compiled_mtime + 1, compiled_mtime + 1))
+        self.assertEqual(len(self._obstructions()), 2)
+
+    def test_missing_csv_has_no_graphs(self):
+        self.assertEqual(len(self._obstructions()), 0)
+
+    def test_compiling_uses_a_temporary_file_of_its_own(self):
+        self._write_csv([graphs.CycleGraph(4)])
+        filename = compiled_filename(self.csv_filename, os.path.join(self.directory.name, 'compiled'))
+        # A fixed temporary name would collide with the one of another process.
+        os.makedirs(f'{filename}.tmp')
+        compile_obstructions(self.csv_filename, filename)
+        compile_obstructions(self.csv_filename, filename)
+        self.assertEqual(sorted(os.listdir(os.path.dirname(filename))), sorted([os.path.basename(filename), f'{os.path.basename(filename)}.tmp']))
+        self.assertEqual(len(self._obstructions()), 1)
@@ -0,0 +1,57 @@
+import itertools
+import random
+import unittest
+
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.partition import thinness_with_partition
+from thinness.verify import verify_solution
+
+
+def _has_consistent_order(graph, partition):
+    part_of = {vertex: i for i, part in enumerate(partition) for vertex in part}
+    return any(
+        all(
+            part_of[u] != part_of[v] or not graph.has_edge(u, w) or graph.has_edge(v, w)
+            for u, v, w in itertools.combinations(order, 3)
+        )
+        for order in itertools.permutations(graph)
+    )
+
+
+class TestThinnessWithPartition(unittest.TestCase):
+    def test_matches_exhaustive_search(self):
+        set_random_seed(0)
+        generator = random.Random(0)
+        for _ in range(50):
+            graph = graphs.RandomGNP(6, 0.5)
+            part_of = [generator.randrange(3) for _ in graph]
+            partition = [{vertex for vertex in graph if part_of[vertex] == part} for part in range(3)]
+            partition = [part for part in partition if part]
+            with self.subTest(graph=graph.graph6_string(), partition=partition):
+                solution = thinness_with_partition(graph, partition, certificate=True)
+                self.assertEqual(solution.thinness == len(partition), _has_consistent_order(graph, partition))
+                self.assertEqual(thinness_with_partition(graph, partition), solution.thinness)
+                self.assertTrue(verify_solution(graph, solution))
+                self.assertTrue(all(any(part <= given_part for given_part in partition) for part in solution.partition))
+
+    def test_refinement_of_a_single_part_is_the_thinness(self):
+        set_random_seed(0)
+        for _ in range(10):
+            graph = graphs.RandomGNP(10, 0.5)
+            with self.subTest(graph=graph.graph6_string()):
+                self.assertEqual(thinness_with_partition(graph, [set(graph)]), calculate_thinness(graph))
+
+    def test_partition_of_a_solution_has_an_order(self):
+        graph = graphs.Grid2dGraph(3, 4)
+        solution = calculate_thinness(graph, certificate=True)
+        self.assertEqual(thinness_with_partition(graph, solution.partition), solution.thinness)
+
+    def test_invalid_partitions(self):
+        graph = graphs.PathGraph(3)
+        with self.assertRaises(ValueError):
+            thinness_with_partition(graph, [{0, 1}])
+        with self.assertRaises(ValueError):
+            thinness_with_partition(graph, [{0, 1}, {1, 2}])
@@ -0,0 +1,71 @@
+import unittest
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.recognition import thinness_of_recognized_graph
+from thinness.split_crown import build_split_crown_graph
+from thinness.time_branch_and_bound import crown_graph
+from thinness.verify import verify_solution
+
+
+class TestRecognition(unittest.TestCase):
+    def _assert_recognized(self, graph, thinness):
+        self.assertEqual(thinness_of_recognized_graph(graph), thinness)
+        solution = thinness_of_recognized_graph(graph, certificate=True)
+        self.assertEqual(solution.thinness, thinness)
+        self.assertTrue(verify_solution(graph, solution))
+
+    def test_interval_graphs(self):
+        set_random_seed(0)
+        for _ in range(20):
+            graph = graphs.RandomIntervalGraph(12)
+            if graph.is_connected():
+                self._assert_recognized(graph, 1)
+
+    def test_trees_match_the_branch_and_bound(self):
+        for n in range(1, 12):
+            for tree in graphs.trees(n):
+                tree = tree.copy(immutable=False)
+                with self.subTest(tree=tree.graph6_string()):
+                    self._assert_recognized(tree, calculate_thinness(tree, recognize_classes=False))
+
+    def test_tree_of_thinness_3(self):
+        spider = Graph([(0, 1), (1, 2), (0, 3), (3, 4), (0, 5), (5, 6)])
+        tree = Graph([(0, 1), (0, 2), (0, 3)])
+        for leg in [1, 2, 3]:
+            tree = tree.union(spider.relabel(lambda vertex: vertex + 10 * leg, inplace=False))
+            tree.add_edge(leg, 10 * leg)
+        self._assert_recognized(tree, 3)
+
+    def test_large_random_tree(self):
+        set_random_seed(0)
+        tree = graphs.RandomTree(100)
+        solution = thinness_of_recognized_graph(tree, certificate=True)
+        self.assertTrue(verify_solution(tree, solution))
+
+    def test_crown_graphs(self):
+        for n in range(2, 7):
+            with self.subTest(n=n):
+                self._assert_recognized(crown_graph(n), calculate_thinness(crown_graph(n), recognize_classes=False))
+        self._assert_recognized(crown_graph(12), 11)
+
+    def test_split_crown_graphs(self):
+        for n in range(3, 7):
+            with self.subTest(n=n):
+                graph = build_split_crown_graph(n)
+                self._assert_recognized(graph, calculate_thinness(graph, recognize_classes=False))
+        self._assert_recognized(build_split_crown_graph(12), 6)
+
+    def test_other_graphs_are_not_recognized(self):
+        for graph in [graphs.CycleGraph(4), graphs.PetersenGraph(), graphs.Grid2dGraph(3, 3)]:
+            self.assertIsNone(thinness_of_recognized_graph(graph))
+
+    def test_calculate_thinness_answers_recognized_components(self):
+        graph = crown_graph(8).disjoint_union(graphs.PathGraph(5), labels='integers')
+        solution = calculate_thinness(graph, certificate=True)
+        self.assertEqual(solution.thinness, 7)
+        self.assertTrue(verify_solution(graph, solution))
+        self.assertEqual(calculate_thinness(graph, upper_bound=3), 3)
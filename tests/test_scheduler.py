@@ -0,0 +1,39 @@
+import multiprocessing as mp
+import unittest
+
+from thinness.scheduler import AdaptiveChunkSize, schedule
+from thinness.telemetry import PipelineMetrics
+
+
+def _square_small(chunk: list[int]) -> tuple[list[int], list[int]]:
+    """Square the numbers below 100 and leave the others as hard items."""
+    return [x * x for x in chunk if x < 100], [x for x in chunk if x >= 100]
+
+
+def _square(x: int) -> list[int]:
+    return [x * x]
+
+
+class TestAdaptiveChunkSize(unittest.TestCase):
+    def test_size_follows_the_cost_per_item(self):
+        chunk_size = AdaptiveChunkSize(target_seconds=1.0, initial=10, max_size=1000, smoothing=1.0)
+        chunk_size.observe(10, 0.1)
+        self.assertEqual(chunk_size.size, 100)
+        chunk_size.observe(100, 50.0)
+        self.assertEqual(chunk_size.size, 2)
+        chunk_size.observe(2, 0.0)
+        self.assertEqual(chunk_size.size, 1000)
+
+
+class TestSchedule(unittest.TestCase):
+    def test_every_item_is_processed_once(self):
+        metrics = PipelineMetrics()
+        items = list(range(95, 105)) + list(range(95)) + [1000]
+        with mp.get_context('fork').Pool(3) as pool:
+            results = list(schedule(pool, 3, iter(items), _square_small, _square, AdaptiveChunkSize(initial=4, min_size=4, max_size=4), metrics))
+        self.assertEqual(sorted(x for result in results for x in result), sorted(x * x for x in items))
+        self.assertEqual(metrics.submitted, 27 + 6)  # chunks of 4 items, then the hard items one by one
+
+
+if __name__ == '__main__':
+    unittest.main()
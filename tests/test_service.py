@@ -0,0 +1,107 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from sage.graphs.graph_generators import graphs
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.consistent_solution import ConsistentSolution
+from thinness.service import DeadlineExceeded, SolverService, call
+from thinness.verify import verify_solution
+
+
+class TestSolverService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        cls.service = SolverService(workers=2)
+        cls.loop.run_until_complete(cls.service.start())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.run_until_complete(cls.service.close())
+        cls.loop.close()
+
+    def _solve_all(self, requests):
+        async def solve_all():
+            return await asyncio.gather(*(self.service.solve(**request) for request in requests), return_exceptions=True)
+        return self.loop.run_until_complete(solve_all())
+
+    def test_values_match_the_engines(self):
+        graph_list = [graphs.CycleGraph(n) for n in range(4, 9)] + [graphs.PetersenGraph(), graphs.Grid2dGraph(3, 3)]
+        results = self._solve_all([{'method': 'thinness', 'graph6': G.graph6_string()} for G in graph_list])
+        self.assertEqual(results, [calculate_thinness(G) for G in graph_list])
+
+    def test_certificates_use_the_labels_of_the_request(self):
+        G = graphs.PetersenGraph()
+        relabeled = G.relabel({v: (3 * v + 1) % 10 for v in G}, inplace=False)
+        for graph in (G, relabeled):
+            result, = self._solve_all([{'method': 'thinness', 'graph6': graph.graph6_string(), 'certificate': True}])
+            self.assertEqual(result['value'], calculate_thinness(G))
+            self.assertEqual(sorted(result['order']), list(range(10)))
+            self.assertTrue(verify_solution(graph, ConsistentSolution.from_parts(result['order'], result['parts'])))
+
+    def test_isomorphic_requests_are_coalesced(self):
+        G = graphs.Grid2dGraph(4, 4).relabel(inplace=False)
+        coalesced = self.service.coalesced
+        relabelings = [G.relabel({v: (v + shift) % 16 for v in G}, inplace=False) for shift in range(5)]
+        results = self._solve_all([{'method': 'thinness', 'graph6': H.graph6_string()} for H in relabelings])
+        self.assertEqual(results, [calculate_thinness(G)] * 5)
+        self.assertEqual(self.service.coalesced - coalesced, 4)
+
+    def test_deadline(self):
+        # The deadline has passed when the job reaches a worker, so the search never starts.
+        G = graphs.Grid2dGraph(7, 7)
+        result, = self._solve_all([{'method': 'thinness', 'graph6': G.graph6_string(), 'deadline': 0}])
+        self.assertIsInstance(result, DeadlineExceeded)
+
+    def test_close_does_not_wait_for_running_searches(self):
+        service = SolverService(workers=1, batch_window=0)
+
+        async def close_while_solving():
+            await service.start()
+            task = asyncio.create_task(service.solve('thinness', graphs.Grid2dGraph(7, 7).graph6_string()))
+            while service.running == 0:
+                await asyncio.sleep(0.01)
+            start = time.perf_counter()
+            await service.close()
+            task.cancel()
+            return time.perf_counter() - start
+
+        self.assertLess(self.loop.run_until_complete(close_while_solving()), 5)
+
+    def test_other_methods(self):
+        G = graphs.CycleGraph(6)
+        self.assertEqual(self._solve_all([
+            {'method': 'proper_thinness', 'graph6': G.graph6_string()},
+            {'method': 'lmimwidth', 'graph6': G.graph6_string()},
+        ]), [2, 2])
+
+    def test_socket(self):
+        async def session(socket_path):
+            server = asyncio.create_task(self.service.serve(socket_path))
+            while not os.path.exists(socket_path):
+                await asyncio.sleep(0.01)
+            try:
+                value = await asyncio.to_thread(call, socket_path, 'thinness', graph6=graphs.CycleGraph(5).graph6_string())
+                stats = await asyncio.to_thread(call, socket_path, 'stats')
+                try:
+                    await asyncio.to_thread(call, socket_path, 'treewidth', graph6='Cl')
+                    error = None
+                except RuntimeError as raised:
+                    error = raised
+            finally:
+                server.cancel()
+            return value, stats, error
+
+        with tempfile.TemporaryDirectory() as directory:
+            value, stats, error = self.loop.run_until_complete(session(os.path.join(directory, 'service.sock')))
+        self.assertEqual(value, 2)
+        self.assertEqual(stats['queued'], 0)
+        self.assertIsNotNone(stats['latency']['p50'])
+        self.assertIn('Unknown method', str(error))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from proper_thinness.branch_and_bound import calculate_proper_thinness
+from proper_thinness.verify import verify_solution as verify_proper_solution
+from thinness.branch_and_bound import calculate_thinness
+from thinness.search_statistics import SearchStatistics
+from thinness.small_graphs import MAX_ORDER, _perfect_hash, _slot, _hash, lookup_thinness
+from thinness.verify import verify_solution
+
+
+class TestSmallGraphs(unittest.TestCase):
+    def test_perfect_hash_places_every_key_once(self):
+        keys = random.Random(0).sample(range(1 << 40), 1000)
+        slots, displacements, key_of_slot = _perfect_hash(keys)
+        self.assertEqual(sorted(key for key in key_of_slot if key is not None), sorted(keys))
+        for key in keys:
+            self.assertEqual(key_of_slot[_slot(key, displacements[_hash(key, 0) % len(displacements)], slots)], key)
+
+    def test_values_and_certificates_of_small_graphs(self):
+        set_random_seed(0)
+        graph_list = [graph for n in range(1, 6) for graph in graphs(n) if graph.is_connected()]
+        graph_list += [graphs.RandomGNP(MAX_ORDER, 0.5) for _ in range(10)]
+        for graph in graph_list:
+            if not graph.is_connected():
+                continue
+            graph = graph.relabel(lambda vertex: f'v{vertex}', inplace=False)
+            with self.subTest(graph=graph.graph6_string()):
+                thinness = calculate_thinness(graph, recognize_classes=False, use_small_graphs_table=False)
+                proper_thinness = calculate_proper_thinness(graph, use_small_graphs_table=False)
+                self.assertEqual(lookup_thinness(graph), thinness)
+                self.assertEqual(lookup_thinness(graph, proper=True), proper_thinness)
+                solution = lookup_thinness(graph, certificate=True)
+                self.assertEqual(solution.thinness, thinness)
+                self.assertTrue(verify_solution(graph, solution))
+                proper_solution = lookup_thinness(graph, certificate=True, proper=True)
+                self.assertEqual(proper_solution.thinness, proper_thinness)
+                self.assertTrue(verify_proper_solution(graph, proper_solution))
+
+    def test_larger_graphs_are_not_in_the_table(self):
+        self.assertIsNone(lookup_thinness(graphs.PathGraph(MAX_ORDER + 1)))
+
+    def test_engines_answer_small_components_from_the_table(self):
+        graph = graphs.CompleteBipartiteGraph(4, 4)
+        graph.delete_edges((i, i + 4) for i in range(4))  # the crown graph on 8 vertices
+        graph = graph.disjoint_union(graphs.PetersenGraph().subgraph(range(MAX_ORDER)))
+        statistics = SearchStatistics()
+        self.assertEqual(calculate_thinness(graph, statistics=statistics), calculate_thinness(graph, recognize_classes=False, use_small_graphs_table=False))
+        self.assertEqual(calculate_proper_thinness(graph, statistics=statistics), calculate_proper_thinness(graph, use_small_graphs_table=False))
+        self.assertEqual(statistics.nodes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
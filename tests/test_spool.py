@@ -0,0 +1,130 @@
+import functools
+import multiprocessing as mp
+import os
+import tempfile
+import unittest
+
+from thinness.spool import Coordinator, ShardFailed, files_directory, run_worker, stop_workers
+
+
+def _square(shard):
+    n, res, mod = shard
+    return res, res * res
+
+
+def _die_on_first_shard(shard):
+    """Exit without releasing the lease, like a machine that goes down."""
+    os._exit(1)
+
+
+def _fail_on_shard_2(shard):
+    n, res, mod = shard
+    if res == 2:
+        raise ValueError('bad shard')
+    return res, res * res
+
+
+def _read_published_file(directory, shard):
+    n, res, mod = shard
+    with open(os.path.join(files_directory(directory), 'input.txt')) as file:
+        return res, file.read()
+
+
+def _run_worker(directory, process, lease_timeout):
+    run_worker(directory, process, lease_timeout=lease_timeout, poll_interval=0.01)
+
+
+class TestSpool(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.spool = self.directory.name
+        self.context = mp.get_context('fork')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _start_workers(self, process, count, lease_timeout=60.0):
+        workers = [
+            self.context.Process(target=_run_worker, args=(self.spool, process, lease_timeout))
+            for _ in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        return workers
+
+    def _coordinate(self, n, mod, pending, lease_timeout=60.0):
+        merged = []
+        Coordinator(self.spool, n, mod, pending, lease_timeout=lease_timeout, poll_interval=0.01).run(merged.append)
+        return merged
+
+    def test_every_shard_is_merged_exactly_once(self):
+        workers = self._start_workers(_square, 4)
+        merged = self._coordinate(5, 40, list(range(40)))
+        stop_workers(self.spool)
+        for worker in workers:
+            worker.join(timeout=10)
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(sorted(merged), [(res, res * res) for res in range(40)])
+
+    def test_workers_follow_successive_jobs(self):
+        workers = self._start_workers(_square, 2)
+        first = self._coordinate(5, 8, [1, 3, 5])
+        second = self._coordinate(6, 8, [0, 7])
+        stop_workers(self.spool)
+        for worker in workers:
+            worker.join(timeout=10)
+        self.assertEqual(sorted(first), [(1, 1), (3, 9), (5, 25)])
+        self.assertEqual(sorted(second), [(0, 0), (7, 49)])
+
+    def test_shards_of_dead_workers_are_reassigned(self):
+        coordinator = Coordinator(self.spool, 5, 6, list(range(6)), lease_timeout=0.3, poll_interval=0.01)
+        dead_worker, = self._start_workers(_die_on_first_shard, 1)
+        dead_worker.join(timeout=10)
+        self.assertEqual(os.listdir(os.path.join(self.spool, 'leases')), ['5-0-6.lease'])
+
+        workers = self._start_workers(_square, 2, lease_timeout=0.3)
+        merged = []
+        coordinator.run(merged.append)
+        stop_workers(self.spool)
+        for worker in workers:
+            worker.join(timeout=10)
+        self.assertEqual(sorted(merged), [(res, res * res) for res in range(6)])
+        self.assertEqual(os.listdir(os.path.join(self.spool, 'results')), [])
+
+    def test_failing_shards_stop_the_coordinator(self):
+        workers = self._start_workers(_fail_on_shard_2, 2)
+        merged = []
+        coordinator = Coordinator(self.spool, 5, 4, list(range(4)), poll_interval=0.01, max_attempts=3)
+        with self.assertRaisesRegex(ShardFailed, 'bad shard'):
+            coordinator.run(merged.append)
+        stop_workers(self.spool)
+        for worker in workers:
+            worker.join(timeout=10)
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(len(os.listdir(os.path.join(self.spool, 'failures'))), 3)
+
+    def test_files_are_published_with_the_job(self):
+        filename = os.path.join(self.directory.name, 'input.txt')
+        with open(filename, 'w') as file:
+            file.write('first')
+        workers = self._start_workers(functools.partial(_read_published_file, self.spool), 1)
+        first = self._coordinate_with_files(5, 2, [filename])
+        with open(filename, 'w') as file:
+            file.write('second')
+        os.utime(filename, (0, 0))
+        second = self._coordinate_with_files(6, 2, [filename])
+        stop_workers(self.spool)
+        for worker in workers:
+            worker.join(timeout=10)
+        self.assertEqual(sorted(first), [(0, 'first'), (1, 'first')])
+        self.assertEqual(sorted(second), [(0, 'second'), (1, 'second')])
+        self.assertEqual(os.listdir(files_directory(self.spool)), ['input.txt'])
+
+    def _coordinate_with_files(self, n, mod, files):
+        merged = []
+        Coordinator(self.spool, n, mod, list(range(mod)), poll_interval=0.01, files=files).run(merged.append)
+        return merged
+
+
+if __name__ == '__main__':
+    unittest.main()
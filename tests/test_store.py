@@ -0,0 +1,50 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from sage.graphs.graph_generators import graphs
+
+from thinness.store import ResultStore
+
+
+class TestResultStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, 'results.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _csv_filename(self, width_parameter, value):
+        return os.path.join(self.directory.name, f'{width_parameter}-{value}.csv')
+
+    def test_shards_are_recorded_on_commit(self):
+        with ResultStore(self.filename, shards_per_commit=2) as store:
+            store.add_shard('thinness', 6, 0, 3, [])
+            store.add_shard('thinness', 6, 2, 3, [])
+            store.add_shard('thinness', 6, 1, 5, [])
+        with ResultStore(self.filename) as store:
+            self.assertEqual(store.processed_shards('thinness', 6, 3), {0, 2})
+            self.assertEqual(store.processed_shards('thinness', 6, 5), {1})
+
+    def test_isomorphic_graphs_are_deduplicated(self):
+        cycle = graphs.CycleGraph(4)
+        relabeled_cycle = cycle.relabel({0: 0, 1: 2, 2: 1, 3: 3}, inplace=False)
+        self.assertNotEqual(cycle.graph6_string(), relabeled_cycle.graph6_string())
+        with ResultStore(self.filename) as store:
+            store.add_shard('thinness', 4, 0, 2, [(cycle.graph6_string(), 2)])
+            store.add_shard('thinness', 4, 1, 2, [(relabeled_cycle.graph6_string(), 2)])
+            self.assertEqual(len(store.graph6_strings('thinness', 2)), 1)
+
+    def test_export_to_csvs_is_idempotent(self):
+        with ResultStore(self.filename) as store:
+            store.add_shard('thinness', 4, 0, 1, [(graphs.CycleGraph(4).graph6_string(), 2)])
+            store.export_to_csvs(self._csv_filename)
+            self.assertEqual(store.graph6_strings('thinness', 2, exported=False), [])
+            store.connection.execute('UPDATE graphs SET exported = 0')
+            store.export_to_csvs(self._csv_filename)
+
+        with open(self._csv_filename('thinness', 2), newline='') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+        self.assertEqual([row['graph6'] for row in rows], [graphs.CycleGraph(4).graph6_string()])
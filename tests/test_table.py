@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.helpers import canonical_graph6, connected_graph6_shard
+from thinness.table import ThinnessTable, ThinnessTables, ThinnessTableWriter, encode_record, table_filename, \
+    THINNESS_COLUMN, PROPER_THINNESS_COLUMN
+
+
+class TestThinnessTable(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write_thinness_tables(self, max_order, mod=3):
+        for n in range(2, max_order + 1):
+            writer = ThinnessTableWriter(n, self.directory.name)
+            for res in range(mod):
+                records = b''.join(
+                    encode_record(canonical_graph6(graph6.decode()).encode(), thinness=calculate_thinness(Graph(graph6.decode())))
+                    for graph6 in connected_graph6_shard(n, res, mod)
+                )
+                writer.add_shard(res, mod, records)
+            writer.finalize()
+
+    def test_tables_have_every_connected_graph(self):
+        self._write_thinness_tables(5)
+        self.assertFalse(os.path.exists(f'{table_filename(5, self.directory.name)}.shards'))
+        self.assertEqual(len(ThinnessTable(4, self.directory.name)), 6)
+        self.assertEqual(len(ThinnessTable(5, self.directory.name)), 21)
+
+    def test_max_after_vertex_deletion(self):
+        self._write_thinness_tables(4)
+        tables = ThinnessTables(4, self.directory.name)
+        self.assertEqual(tables.lookup(graphs.CycleGraph(4), THINNESS_COLUMN), 2)
+        self.assertEqual(tables.max_after_vertex_deletion(graphs.CycleGraph(4), THINNESS_COLUMN), 1)
+        self.assertEqual(tables.max_after_vertex_deletion(graphs.CycleGraph(5), THINNESS_COLUMN), 1)
+        # Deleting the center of the wheel leaves a C4.
+        self.assertEqual(tables.max_after_vertex_deletion(graphs.WheelGraph(5), THINNESS_COLUMN), 2)
+        # Disconnected graphs take the maximum over their components.
+        self.assertEqual(tables.lookup(graphs.CycleGraph(4).disjoint_union(graphs.PathGraph(2)), THINNESS_COLUMN), 2)
+
+    def test_unknown_values_raise(self):
+        self._write_thinness_tables(4)
+        tables = ThinnessTables(4, self.directory.name)
+        with self.assertRaises(KeyError):
+            tables.lookup(graphs.CycleGraph(4), PROPER_THINNESS_COLUMN)
+
+    def test_finalize_merges_columns(self):
+        canonical = canonical_graph6(graphs.CycleGraph(4)).encode()
+        writer = ThinnessTableWriter(4, self.directory.name)
+        writer.add_shard(0, 1, encode_record(canonical, thinness=2))
+        writer.finalize()
+        writer = ThinnessTableWriter(4, self.directory.name)
+        writer.add_shard(0, 1, encode_record(canonical, proper_thinness=2))
+        writer.finalize()
+        self.assertEqual(ThinnessTable(4, self.directory.name).lookup(canonical), (2, 2))
+        self.assertIsNone(ThinnessTable(4, self.directory.name).lookup(canonical_graph6(graphs.PathGraph(4)).encode()))
@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from thinness.telemetry import PipelineMetrics, WorkerMetrics, export_metrics
+
+
+def _batch(graph6_times: list[tuple[bytes, float]], order=5, value=2) -> WorkerMetrics:
+    metrics = WorkerMetrics()
+    for graph6, seconds in graph6_times:
+        metrics.record_graph(graph6, order, value, seconds)
+    return metrics
+
+
+class TestTelemetry(unittest.TestCase):
+    def test_batches_add_up(self):
+        metrics = PipelineMetrics(slowest=2)
+        metrics.expect(3)
+        metrics.add(_batch([(b'D?{', 0.5), (b'DCw', 0.002)]))
+        metrics.add(_batch([(b'D"w', 2.0)], value=3))
+        self.assertEqual(metrics.queue_depth, 1)
+        self.assertEqual(sum(metrics.worker_graphs.values()), 3)
+        self.assertAlmostEqual(metrics.phase_seconds['solving'], 2.502)
+        self.assertEqual(sorted(metrics.slowest, reverse=True), [(2.0, b'D"w'), (0.5, b'D?{')])
+
+        text = metrics.to_prometheus()
+        self.assertIn('thinness_queue_depth 1\n', text)
+        self.assertIn('thinness_solve_seconds_bucket{order="5",value="2",le="0.003"} 1\n', text)
+        self.assertIn('thinness_solve_seconds_bucket{order="5",value="2",le="1.0"} 2\n', text)
+        self.assertIn('thinness_solve_seconds_count{order="5",value="3"} 1\n', text)
+        self.assertIn('thinness_slowest_graph_seconds{graph6="D\\"w"} 2.000000\n', text)
+
+    def test_timed_iterables_count_their_time(self):
+        metrics = WorkerMetrics()
+        self.assertEqual(list(metrics.timed(iter(range(3)))), [0, 1, 2])
+        self.assertGreater(metrics.phase_seconds['generation'], 0)
+        pipeline = PipelineMetrics()
+        self.assertEqual(list(pipeline.counted(pipeline.timed(['a', 'b'], 'waiting'))), ['a', 'b'])
+        self.assertEqual(pipeline.submitted, 2)
+
+    def test_export_to_file_and_http(self):
+        metrics = PipelineMetrics()
+        metrics.add(_batch([(b'Bw', 0.01)]))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'thinness.prom')
+            with export_metrics(metrics, path, port=0, interval=0.01) as port:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+                    served = response.read().decode()
+            with open(path) as file:
+                written = file.read()
+        for text in (served, written):
+            self.assertIn('thinness_solve_seconds_count{order="5",value="2"} 1\n', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
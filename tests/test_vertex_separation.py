@@ -64,4 +64,12 @@ class TestVertexSeparation(unittest.TestCase):
                 solution = solution_from_vertex_separation(graph, layout)
                 thinness = max(1, cost)
                 self.assertEqual(solution.thinness, thinness, f"Solution: {solution}, linear layout: {layout}, cost: {cost}")
-                self.assertTrue(verify_solution(graph, solution))
\ No newline at end of file
+                self.assertTrue(verify_solution(graph, solution))
+
+    def test_large_sparse_graph(self):
+        set_random_seed(0)
+        graph = graphs.RandomTree(300)
+        layout = list(range(300))
+        solution = solution_from_vertex_separation(graph, layout)
+        self.assertEqual(sorted(solution.order), layout)
+        self.assertTrue(verify_solution(graph, solution))
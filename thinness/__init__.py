@@ -1,4 +1,7 @@
-# Initialize all of sage so that it doesn't error out in Arch Linux
-from sage import all
+import os
+
+# Importing all of sage takes seconds, so it is opt-in for the Sage installs that error out without it, like on Arch Linux.
+if os.environ.get('THINNESS_IMPORT_SAGE_ALL'):
+    from sage import all
 from .consistent_solution import ConsistentSolution
 from .verify import verify_solution
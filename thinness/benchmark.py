@@ -0,0 +1,312 @@
+"""Benchmark suite for the engines.
+
+Runs every engine on named families of instances, built with fixed seeds, and writes the wall time,
+search statistics and peak RSS increase of each run as JSON. `compare` flags the regressions between
+two result files.
+
+    python -m thinness.benchmark run -o results.json
+    python -m thinness.benchmark compare baseline.json results.json
+"""
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import resource
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sage.graphs.graph import Graph
+from sage.graphs.graph_generators import graphs
+from sage.misc.randstate import set_random_seed
+
+from lmimw.branch_and_bound import lmimwidth
+from proper_thinness.branch_and_bound import calculate_proper_thinness
+from thinness.branch_and_bound import calculate_thinness
+from thinness.dynamic_programming import calculate_thinness_with_dynamic_programming
+from thinness.search_statistics import SearchStatistics
+from thinness.time_branch_and_bound import crown_graph, cylinder_graph
+from thinness.z3 import Z3ThinnessSolver
+
+
+SEED = 0
+DEFAULT_TIMEOUT = 60.0  # seconds
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_TIME = 0.01  # seconds, below which timings are too noisy to compare
+
+
+@dataclass(frozen=True)
+class Engine:
+    name: str
+    run: Callable[[Graph, SearchStatistics], int]
+    max_order: int | None = None
+    collects_statistics: bool = True
+
+
+def _thinness_branch_and_bound(graph, statistics):
+    return calculate_thinness(graph, statistics=statistics, recognize_classes=False, use_small_graphs_table=False)
+
+
+def _proper_thinness_branch_and_bound(graph, statistics):
+    return calculate_proper_thinness(graph, statistics=statistics)
+
+
+def _thinness_z3(graph, statistics):
+    return Z3ThinnessSolver(graph.order()).solve(graph.relabel(inplace=False)).thinness
+
+
+def _thinness_dynamic_programming(graph, statistics):
+    return calculate_thinness_with_dynamic_programming(graph.relabel(inplace=False))
+
+
+def _lmimw_branch_and_bound(graph, statistics):
+    return lmimwidth(graph, statistics=statistics)
+
+
+ENGINES = {engine.name: engine for engine in [
+    Engine('thinness-bab', _thinness_branch_and_bound),
+    Engine('proper-thinness-bab', _proper_thinness_branch_and_bound, max_order=16),
+    Engine('thinness-z3', _thinness_z3, max_order=10, collects_statistics=False),
+    Engine('thinness-dp', _thinness_dynamic_programming, max_order=8, collects_statistics=False),
+    Engine('lmimw-bab', _lmimw_branch_and_bound, max_order=16),
+]}
+
+
+def _crown_graphs():
+    for n in range(2, 8):
+        yield f'{n}', crown_graph(n)
+
+
+def _complements_of_nK2():
+    for n in range(1, 7):
+        yield f'{n}', (graphs.CompleteGraph(2) * n).complement()
+
+
+def _grid_graphs():
+    for rows in range(2, 6):
+        for columns in range(2, rows + 1):
+            yield f'{rows}x{columns}', graphs.Grid2dGraph(rows, columns)
+
+
+def _cylinder_graphs():
+    for rows in range(2, 6):
+        for columns in range(3, 6):
+            yield f'{rows}x{columns}', cylinder_graph(rows, columns)
+
+
+def _random_gnm_graphs():
+    set_random_seed(SEED)
+    for n in [10, 12, 14]:
+        for density in [0.2, 0.5, 0.8]:
+            m = int(n * (n - 1) // 2 * density)
+            for i in range(3):
+                yield f'n{n}-d{density}-{i}', graphs.RandomGNM(n, m)
+
+
+def _random_gnp_graphs_of_order_10():
+    set_random_seed(SEED)
+    for i in range(20):
+        yield f'{i}', graphs.RandomGNP(10, 0.5)
+
+
+FAMILIES = {
+    'crown': _crown_graphs,
+    'complement-of-nK2': _complements_of_nK2,
+    'grid': _grid_graphs,
+    'cylinder': _cylinder_graphs,
+    'random-gnm': _random_gnm_graphs,
+    'random-gnp-10': _random_gnp_graphs_of_order_10,
+}
+
+
+def run(families: list[str] = None, engines: list[str] = None, timeout: float = DEFAULT_TIMEOUT, progress=None) -> dict:
+    """Run `engines` on the instances of `families`, all of them by default.
+
+    Each run happens in a forked process, so a run over `timeout` seconds can be stopped. The forked
+    process starts with the resident memory of this one, so the memory of a run is the increase of
+    its peak RSS over the RSS it has right after the fork.
+    """
+    families = families or list(FAMILIES)
+    engines = engines or list(ENGINES)
+    # Sage loads many modules, such as the group theory ones, on first use. Loading them here means
+    # the forked runs inherit them instead of timing them.
+    for engine in engines:
+        ENGINES[engine].run(graphs.CycleGraph(4), SearchStatistics())
+    results = []
+    for family in families:
+        for instance, graph in FAMILIES[family]():
+            for engine in engines:
+                if ENGINES[engine].max_order is not None and graph.order() > ENGINES[engine].max_order:
+                    continue
+                result = {
+                    'family': family,
+                    'instance': instance,
+                    'graph6': graph.graph6_string(),
+                    'engine': engine,
+                    **_measure(ENGINES[engine], graph, timeout),
+                }
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return {'metadata': _metadata(timeout), 'results': results}
+
+
+def _metadata(timeout: float) -> dict:
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _git_commit(),
+        'python': sys.version,
+        'platform': platform.platform(),
+        'seed': SEED,
+        'timeout': timeout,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, check=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _measure(engine: Engine, graph: Graph, timeout: float) -> dict:
+    context = mp.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_in_child, args=(engine, graph, sender))
+    process.start()
+    sender.close()
+    try:
+        if receiver.poll(timeout):
+            return receiver.recv()
+        return _result('timeout')
+    except EOFError:
+        return _result('error', error=f'exit code {process.exitcode}')
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+
+def _run_in_child(engine: Engine, graph: Graph, connection):
+    statistics = SearchStatistics()
+    # Right after the fork, the peak RSS of the child is the RSS it inherits from the parent.
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    try:
+        start = time.perf_counter()
+        value = engine.run(graph, statistics)
+        wall_time = time.perf_counter() - start
+    except Exception as error:
+        connection.send(_result('error', error=repr(error)))
+    else:
+        connection.send(_result(
+            'ok',
+            value=int(value),
+            wall_time=wall_time,
+            statistics=statistics if engine.collects_statistics else None,
+            peak_rss_increase_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - start_rss
+        ))
+    finally:
+        connection.close()
+
+
+def _result(
+    status: str,
+    value=None,
+    wall_time=None,
+    statistics: SearchStatistics = None,
+    peak_rss_increase_kb: int = None,
+    error=None
+) -> dict:
+    result = {
+        'status': status,
+        'value': value,
+        'wall_time': wall_time,
+        'nodes': None,
+        'memo_hits': None,
+        'memo_entries': None,
+        'bound_prunes': None,
+        'peak_rss_increase_kb': peak_rss_increase_kb,
+    }
+    if statistics is not None:
+        result.update(statistics.as_dict())
+    if error is not None:
+        result['error'] = error
+    return result
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD, min_time: float = DEFAULT_MIN_TIME) -> list[str]:
+    """Return a description of every regression of `current` with respect to `baseline`.
+
+    A run regresses if it stops succeeding, gives a different value, or its wall time or node count
+    grows by more than `threshold`. Wall times under `min_time` seconds in both files are ignored.
+    """
+    baseline_results = {_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = baseline_results.get(_key(result))
+        if old is None or old['status'] != 'ok':
+            continue
+        name = '/'.join(_key(result))
+        if result['status'] != 'ok':
+            regressions.append(f'{name}: {result["status"]}')
+        elif result['value'] != old['value']:
+            regressions.append(f'{name}: value changed from {old["value"]} to {result["value"]}')
+        else:
+            if max(old['wall_time'], result['wall_time']) >= min_time and result['wall_time'] > old['wall_time'] * (1 + threshold):
+                regressions.append(f'{name}: wall time {old["wall_time"]:.4f}s -> {result["wall_time"]:.4f}s')
+            if old['nodes'] is not None and result['nodes'] is not None and result['nodes'] > old['nodes'] * (1 + threshold):
+                regressions.append(f'{name}: nodes {old["nodes"]} -> {result["nodes"]}')
+    return regressions
+
+
+def _key(result: dict) -> tuple[str, str, str]:
+    return result['family'], result['instance'], result['engine']
+
+
+def _print_result(result: dict):
+    name = '/'.join(_key(result))
+    if result['status'] == 'ok':
+        print(f'{name}: {result["value"]} in {result["wall_time"]:.4f}s', flush=True)
+    else:
+        print(f'{name}: {result["status"]}', flush=True)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(prog='python -m thinness.benchmark')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the benchmark suite and write the results as JSON')
+    run_parser.add_argument('-o', '--output', required=True)
+    run_parser.add_argument('--families', nargs='+', choices=list(FAMILIES))
+    run_parser.add_argument('--engines', nargs='+', choices=list(ENGINES))
+    run_parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT)
+
+    compare_parser = subparsers.add_parser('compare', help='flag the regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    compare_parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME)
+
+    arguments = parser.parse_args(arguments)
+    if arguments.command == 'run':
+        results = run(arguments.families, arguments.engines, arguments.timeout, progress=_print_result)
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+        return 0
+
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)
+    with open(arguments.current) as file:
+        current = json.load(file)
+    regressions = compare(baseline, current, arguments.threshold, arguments.min_time)
+    for regression in regressions:
+        print(regression)
+    print(f'{len(regressions)} regressions found.')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,16 +1,21 @@
-import itertools
+import random
+from collections.abc import Iterable
+
 from multiset import Multiset, FrozenMultiset
 
 from sage.graphs.graph import Graph
-from sage.data_structures.bitset import Bitset
 from sage.data_structures.binary_matrix cimport *
 from sage.graphs.base.static_dense_graph cimport dense_graph_init
 from cysignals.memory cimport check_malloc, sig_malloc, sig_free
 from cysignals.signals cimport sig_on, sig_off 
-from sage.graphs.graph_decompositions.vertex_separation import vertex_separation
+from thinness.search_statistics cimport search_statistics_t, record_search_statistics
 
 from thinness.consistent_solution import ConsistentSolution 
-from thinness.vertex_separation import solution_from_vertex_separation
+from thinness.recognition import thinness_of_recognized_graph
+from thinness.small_graphs import lookup_thinness
+from thinness.search_statistics import SearchBudgetExceeded, SearchStatistics
+from thinness.vertex_separation import vertex_separation, solution_from_vertex_separation
+from thinness.local_search import OrderState, breadth_first_order
 
 DEFAULT_MAX_PREFIX_LENGTH = 15
 DEFAULT_MAX_SEEN_ENTRIES = 1_000_000
@@ -22,8 +27,23 @@ def calculate_thinness(
     upper_bound: int = None,
     certificate: bool = False, 
     max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH, 
-    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    incumbent: ConsistentSolution = None,
+    statistics: SearchStatistics = None,
+    recognize_classes: bool = True,
+    use_small_graphs_table: bool = True,
+    vertex_separation_bound: bool = True,
+    max_nodes: int = None
 ) -> ConsistentSolution | int:
+    """`incumbent` is a known solution for `graph`, used as the starting upper bound of the search.
+    Raises SearchBudgetExceeded if the search of a component needs more than `max_nodes` nodes.
+    The vertex separation of each component is computed as a second upper bound unless
+    `vertex_separation_bound` is False and there is an incumbent, which saves its cost when the
+    incumbent is known to be good.
+    The counters of the search are added to `statistics`, if given.
+    Components in the table of `thinness.small_graphs` are answered without searching unless
+    `use_small_graphs_table` is False, and so are components in a class with a known thinness, see
+    `thinness.recognition`, unless `recognize_classes` is False."""
     components = [graph.subgraph(component, immutable=False) for component in graph.connected_components(sort=False)]
     relabellings = [component.relabel(return_map=True) for component in components]
     solutions = [
@@ -33,43 +53,48 @@ def calculate_thinness(
             upper_bound,
             certificate, 
             max_prefix_length, 
-            max_seen_entries
-        ) for component in components
+            max_seen_entries,
+            _restrict_solution(incumbent, relabelling) if incumbent is not None else None,
+            statistics,
+            recognize_classes,
+            use_small_graphs_table,
+            vertex_separation_bound,
+            max_nodes
+        ) for component, relabelling in zip(components, relabellings)
     ]
 
     if certificate:
         return _join_solutions(solutions, relabellings)
     else:
-        return max(solutions)
+        return max(solutions, default=0)
 
 
 def _join_solutions(solutions: list[ConsistentSolution], relabellings: list[dict]) -> ConsistentSolution:
-    order = _join_orders([solution.order for solution in solutions], relabellings)
-    partition = _join_partitions([solution.partition for solution in solutions], relabellings)
-    return ConsistentSolution(order, partition)
-
+    """Part `i` of the joined solution is the union of the parts `i` of the solutions of the components."""
+    order = []
+    parts = []
+    for solution, relabelling in zip(solutions, relabellings):
+        labels = _original_labels(relabelling)
+        order.extend(labels[vertex] for vertex in solution.order)
+        parts.extend(solution.parts)
+    return ConsistentSolution.from_parts(order, parts, max((solution.thinness for solution in solutions), default=0))
 
-def _join_orders(orders: list[list[int]], relabellings: list[dict]) -> list[int]:
-    orders = [
-        [_original_label(vertex, relabellings[i]) for vertex in order]
-        for i, order in enumerate(orders)
-    ]
-    return list(itertools.chain.from_iterable(orders))
 
+def _original_labels(relabelling: dict) -> list:
+    """Invert `relabelling`, which maps the vertices of a graph to 0, ..., n - 1."""
+    labels = [None] * len(relabelling)
+    for label, vertex in relabelling.items():
+        labels[vertex] = label
+    return labels
 
-def _join_partitions(partitions: list[list[set]], relabellings: list[dict]) -> list[set]:
-    partitions = [
-        [set(_original_label(vertex, relabellings[i]) for vertex in part) for part in partition]
-        for i, partition in enumerate(partitions)
-    ]
-    return [
-        set(itertools.chain.from_iterable(parts))
-        for parts in itertools.zip_longest(*partitions, fillvalue=set())
-    ]
 
-
-def _original_label(vertex: int, relabelling: dict):
-    return next(key for key, value in relabelling.items() if value == vertex)
+def _restrict_solution(solution: ConsistentSolution, relabelling: dict) -> ConsistentSolution:
+    """Restrict `solution` to the vertices in `relabelling`, which is still consistent for the induced subgraph."""
+    kept = [i for i, vertex in enumerate(solution.order) if vertex in relabelling]
+    order = [relabelling[solution.order[i]] for i in kept]
+    # Renumber the parts that are left, keeping their relative order.
+    new_part = {part: i for i, part in enumerate(sorted({solution.parts[i] for i in kept}))}
+    return ConsistentSolution.from_parts(order, [new_part[solution.parts[i]] for i in kept])
 
 
 def calculate_thinness_of_connected_graph(
@@ -78,27 +103,76 @@ def calculate_thinness_of_connected_graph(
     upper_bound: int = None,
     certificate: bool = False,
     max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH, 
-    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    incumbent: ConsistentSolution = None,
+    statistics: SearchStatistics = None,
+    recognize_classes: bool = True,
+    use_small_graphs_table: bool = True,
+    vertex_separation_bound: bool = True,
+    max_nodes: int = None,
+    orbits: Iterable[Iterable[int]] = None
 ) -> ConsistentSolution | int:
-    """upper_bound is exclusive."""
-    vertex_separation_value, vertex_separation_order = vertex_separation(graph)
-    upper_bound_from_vertex_separation = max(vertex_separation_value, 1)
-    if upper_bound_from_vertex_separation <= lower_bound:
+    """upper_bound is exclusive. `orbits` are the orbits of the automorphism group of `graph`, as
+    lists, which are computed here if not given."""
+    recognized = lookup_thinness(graph, certificate) if use_small_graphs_table else None
+    if recognized is None and recognize_classes:
+        recognized = thinness_of_recognized_graph(graph, certificate)
+    if recognized is not None:
+        if certificate or upper_bound is None:
+            return recognized
+        return min(recognized, upper_bound)
+    if incumbent is not None and not vertex_separation_bound:
+        known_thinness, vertex_separation_order = incumbent.thinness, None
+    else:
+        vertex_separation_value, vertex_separation_order = vertex_separation(graph)
+        known_thinness = max(vertex_separation_value, 1)
+        if incumbent is not None and incumbent.thinness < known_thinness:
+            known_thinness = incumbent.thinness
+        else:
+            incumbent = None
+    if known_thinness <= lower_bound:
         if certificate:
-            return solution_from_vertex_separation(graph, vertex_separation_order)
+            return _known_solution(graph, vertex_separation_order, incumbent)
         else:
-            return upper_bound_from_vertex_separation
+            return known_thinness
     upper_bound = (
-        upper_bound_from_vertex_separation
+        known_thinness
         if upper_bound is None
-        else min(upper_bound, upper_bound_from_vertex_separation)
+        else min(upper_bound, known_thinness)
     )
 
-    cdef int max_branch_and_bound_thinness = upper_bound - 1
-
     cdef binary_matrix_t adjacency_matrix
     dense_graph_init(adjacency_matrix, graph)
+    cdef bitset_t canonical_vertices
+    bitset_init(canonical_vertices, adjacency_matrix.n_cols)
+    _build_canonical_vertices(graph, canonical_vertices, orbits)
+    try:
+        solution = _search(adjacency_matrix, canonical_vertices, lower_bound, upper_bound, max_prefix_length, max_seen_entries, statistics, max_nodes or 0)
+    finally:
+        binary_matrix_free(adjacency_matrix)
+        bitset_free(canonical_vertices)
 
+    if solution is None:
+        return _known_solution(graph, vertex_separation_order, incumbent) if certificate else upper_bound
+    return solution if certificate else solution.thinness
+
+
+cdef _search(
+    binary_matrix_t adjacency_matrix,
+    bitset_t canonical_vertices,
+    int lower_bound,
+    int upper_bound,
+    int max_prefix_length,
+    int max_seen_entries,
+    object statistics,
+    long max_nodes
+):
+    """Search for a solution of the connected graph with fewer than `upper_bound` parts, and return None if there is none.
+
+    Only the vertices in `canonical_vertices` are tried first in the order. Raises
+    SearchBudgetExceeded after `max_nodes` nodes, unless it is 0.
+    """
+    cdef int max_branch_and_bound_thinness = upper_bound - 1
     cdef int n = adjacency_matrix.n_cols
 
     cdef bitset_t prefix_vertices
@@ -132,18 +206,17 @@ def calculate_thinness_of_connected_graph(
     
     cdef binary_matrix_t vertices_not_added
     binary_matrix_init(vertices_not_added, n, n)
+
+    cdef binary_matrix_t bound_rows
+    binary_matrix_init(bound_rows, 3, n)
     
     cdef dict seen_states = dict() 
 
-    cdef int seen_entries = 0
+    cdef search_statistics_t search_statistics = search_statistics_t(0, 0, 0, 0, max_nodes)
 
     cdef int* best_order = <int*>sig_malloc(sizeof(int) * n)
     cdef int* best_partition = <int*>sig_malloc(sizeof(int) * n)
 
-    cdef bitset_t canonical_vertices
-    bitset_init(canonical_vertices, n)
-    _build_canonical_vertices(graph, canonical_vertices)
-
     try:
         sig_on()
         branch_and_bound_thinness = _branch_and_bound(
@@ -161,8 +234,9 @@ def calculate_thinness_of_connected_graph(
             suffix_neighbors_of_vertex=suffix_neighbors_of_vertex,
             part_suffix_neighbors=part_suffix_neighbors,
             vertices_not_added=vertices_not_added,
+            bound_rows=bound_rows,
             seen_states=seen_states,
-            seen_entries=&seen_entries,
+            statistics=&search_statistics,
             canonical_vertices=canonical_vertices,
             lower_bound=lower_bound,
             upper_bound=max_branch_and_bound_thinness,
@@ -173,7 +247,6 @@ def calculate_thinness_of_connected_graph(
         )
         sig_off()
     finally:
-        binary_matrix_free(adjacency_matrix)
         bitset_free(prefix_vertices)
         bitset_free(suffix_vertices)
         binary_matrix_free(new_suffixes)
@@ -186,35 +259,205 @@ def calculate_thinness_of_connected_graph(
         bitset_free(suffix_neighbors_of_vertex)
         binary_matrix_free(part_suffix_neighbors)
         binary_matrix_free(vertices_not_added)
-        bitset_free(canonical_vertices)
+        binary_matrix_free(bound_rows)
+    record_search_statistics(statistics, &search_statistics)
 
-    cdef int thinness = branch_and_bound_thinness if branch_and_bound_thinness != -1 else upper_bound
-    cdef list order
-    cdef list partition
-    if certificate:
+    try:
+        if _out_of_nodes(&search_statistics):
+            raise SearchBudgetExceeded(f'The search needed more than {max_nodes} nodes')
         if branch_and_bound_thinness == -1:
-            ret = solution_from_vertex_separation(graph, vertex_separation_order)
-        else:    
-            order = [best_order[i] for i in range(n)]
-            partition = [set() for _ in range(thinness)]
-            for vertex in range(n):
-                partition[best_partition[vertex]].add(vertex)
-            ret = ConsistentSolution(order, partition)
-    else:
-        ret = thinness
+            return None
+        order = [best_order[i] for i in range(n)]
+        return ConsistentSolution.from_parts(order, [best_partition[vertex] for vertex in order], branch_and_bound_thinness)
+    finally:
+        sig_free(best_order)
+        sig_free(best_partition)
 
-    sig_free(best_order)
-    sig_free(best_partition)
 
-    return ret
+def _known_solution(graph: Graph, vertex_separation_order: list[int] | None, incumbent: ConsistentSolution | None) -> ConsistentSolution:
+    if incumbent is not None:
+        return incumbent
+    return solution_from_vertex_separation(graph, vertex_separation_order)
 
 
-cdef inline void _build_canonical_vertices(graph: Graph, bitset_t canonical_vertices):
-    cdef list orbit
-    for orbit in graph.automorphism_group(orbits=True, return_group=False):
+cdef inline void _build_canonical_vertices(graph: Graph, bitset_t canonical_vertices, orbits):
+    if orbits is None:
+        orbits = graph.automorphism_group(orbits=True, return_group=False)
+    for orbit in orbits:
         bitset_add(canonical_vertices, <int> orbit[0])
 
 
+def calculate_thinness_of_graph6(
+    graph6: bytes,
+    lower_bound: int = 1,
+    upper_bound: int = None,
+    certificate: bool = False,
+    orbits: Iterable[Iterable[int]] = None,
+    max_prefix_length: int = DEFAULT_MAX_PREFIX_LENGTH,
+    max_seen_entries: int = DEFAULT_MAX_SEEN_ENTRIES,
+    statistics: SearchStatistics = None
+) -> ConsistentSolution | int:
+    """Like `calculate_thinness`, for the graph with the given graph6 string, without building a Sage `Graph`.
+
+    The graph is decoded straight into the adjacency matrix of the search, and its components are
+    found by breadth-first search on the rows. `orbits` are the orbits of the vertices under the
+    automorphisms of the graph, or of a subgroup of them, for example from a canonical labelling
+    done beforehand; without them, the search cannot skip symmetric first vertices. The starting
+    upper bound comes from a breadth-first order instead of the exact vertex separation, and neither
+    the table of `thinness.small_graphs` nor the classes of `thinness.recognition` are checked,
+    since they need a `Graph`.
+    Vertices are numbered as in the graph6 string.
+    """
+    cdef binary_matrix_t adjacency_matrix
+    _decode_graph6(graph6, adjacency_matrix)
+    try:
+        components = _components(adjacency_matrix)
+        solutions = []
+        relabellings = []
+        for component in components:
+            relabellings.append({vertex: i for i, vertex in enumerate(component)})
+            solutions.append(_thinness_of_component(
+                adjacency_matrix, component, lower_bound, upper_bound, certificate,
+                orbits, max_prefix_length, max_seen_entries, statistics
+            ))
+    finally:
+        binary_matrix_free(adjacency_matrix)
+
+    if certificate:
+        return _join_solutions(solutions, relabellings)
+    else:
+        return max(solutions, default=0)
+
+
+cdef _thinness_of_component(
+    binary_matrix_t adjacency_matrix,
+    list component,
+    int lower_bound,
+    upper_bound,
+    bint certificate,
+    orbits,
+    int max_prefix_length,
+    int max_seen_entries,
+    object statistics
+):
+    """Calculate the thinness of the connected subgraph induced by `component`, with its vertices numbered by their index in it."""
+    cdef int n = len(component)
+    cdef int i, j
+    cdef binary_matrix_t component_matrix
+    cdef bitset_t canonical_vertices
+
+    cdef int u, v
+    neighbors = [0] * n
+    for i in range(n):
+        u = component[i]
+        for j in range(n):
+            v = component[j]
+            if bitset_in(adjacency_matrix.rows[u], v):
+                neighbors[i] |= 1 << j
+    known = OrderState(neighbors, breadth_first_order(neighbors, random.Random(0)))
+    if known.thinness <= lower_bound:
+        return known.solution() if certificate else known.thinness
+    upper_bound = known.thinness if upper_bound is None else min(upper_bound, known.thinness)
+
+    binary_matrix_init(component_matrix, n, n)
+    bitset_init(canonical_vertices, n)
+    try:
+        for i in range(n):
+            for j in range(n):
+                if neighbors[i] >> j & 1:
+                    bitset_add(component_matrix.rows[i], j)
+        if orbits is None:
+            bitset_complement(canonical_vertices, canonical_vertices)
+        else:
+            index = {vertex: i for i, vertex in enumerate(component)}
+            for orbit in orbits:
+                first = next((index[vertex] for vertex in orbit if vertex in index), None)
+                if first is not None:
+                    bitset_add(canonical_vertices, <int> first)
+        solution = _search(component_matrix, canonical_vertices, lower_bound, upper_bound, max_prefix_length, max_seen_entries, statistics, 0)
+    finally:
+        binary_matrix_free(component_matrix)
+        bitset_free(canonical_vertices)
+
+    if solution is None:
+        return known.solution() if certificate else upper_bound
+    return solution if certificate else solution.thinness
+
+
+cdef void _decode_graph6(bytes graph6, binary_matrix_t adjacency_matrix) except *:
+    """Initialize `adjacency_matrix` with the graph of the graph6 string, which the caller must free."""
+    cdef const unsigned char* data = graph6
+    cdef Py_ssize_t length = len(graph6)
+    cdef Py_ssize_t position, k
+    cdef int n, i, j, bit
+    cdef int value = 0
+    for k in range(length):
+        if data[k] < 63 or data[k] > 126:
+            raise ValueError(f'Invalid byte {data[k]} in the graph6 string')
+    if length >= 1 and data[0] == 126:  # '~'
+        if length < 4 or data[1] == 126:
+            raise ValueError('Graphs with more than 258047 vertices are not supported')
+        n = ((data[1] - 63) << 12) | ((data[2] - 63) << 6) | (data[3] - 63)
+        position = 4
+    elif length >= 1:
+        n = data[0] - 63
+        position = 1
+    else:
+        raise ValueError('Empty graph6 string')
+    if length - position < ((<Py_ssize_t> n) * (n - 1) // 2 + 5) // 6:
+        raise ValueError(f'The graph6 string is too short for {n} vertices')
+
+    binary_matrix_init(adjacency_matrix, n, n)
+    bit = 6
+    for j in range(1, n):
+        for i in range(j):
+            if bit == 6:
+                value = data[position] - 63
+                position += 1
+                bit = 0
+            if value >> (5 - bit) & 1:
+                bitset_add(adjacency_matrix.rows[i], j)
+                bitset_add(adjacency_matrix.rows[j], i)
+            bit += 1
+
+
+cdef list _components(binary_matrix_t adjacency_matrix):
+    """Return the vertices of each connected component, in increasing order, found by breadth-first search on the rows."""
+    cdef int n = adjacency_matrix.n_rows
+    cdef long vertex
+    cdef bitset_t unvisited, component, frontier, next_frontier
+    bitset_init(unvisited, max(n, 1))
+    bitset_init(component, max(n, 1))
+    bitset_init(frontier, max(n, 1))
+    bitset_init(next_frontier, max(n, 1))
+    components = []
+    try:
+        bitset_clear(unvisited)
+        for vertex in range(n):
+            bitset_add(unvisited, vertex)
+        while not bitset_isempty(unvisited):
+            vertex = bitset_first(unvisited)
+            bitset_clear(component)
+            bitset_add(component, vertex)
+            bitset_copy(frontier, component)
+            while not bitset_isempty(frontier):
+                bitset_clear(next_frontier)
+                vertex = bitset_first(frontier)
+                while vertex != -1:
+                    bitset_union(next_frontier, next_frontier, adjacency_matrix.rows[vertex])
+                    vertex = bitset_next(frontier, vertex + 1)
+                bitset_difference(frontier, next_frontier, component)
+                bitset_union(component, component, frontier)
+            bitset_difference(unvisited, unvisited, component)
+            components.append(bitset_list(component))
+    finally:
+        bitset_free(unvisited)
+        bitset_free(component)
+        bitset_free(frontier)
+        bitset_free(next_frontier)
+    return components
+
+
 cdef int _branch_and_bound(
     binary_matrix_t graph,
     int* prefix,
@@ -230,8 +473,9 @@ cdef int _branch_and_bound(
     bitset_t suffix_neighbors_of_vertex,
     binary_matrix_t part_suffix_neighbors,
     binary_matrix_t vertices_not_added,
+    binary_matrix_t bound_rows,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -241,6 +485,9 @@ cdef int _branch_and_bound(
     int max_seen_entries,
 ):
     """upper_bound is inclusive"""
+    statistics.nodes += 1
+    if _out_of_nodes(statistics):
+        return -1
     cdef int level = _get_level(suffix_vertices)
   
     cdef bitset_t new_suffix = new_suffixes.rows[level]
@@ -262,9 +509,13 @@ cdef int _branch_and_bound(
         _copy_array(graph.n_cols, part_of, best_partition)
         return parts_used
 
+    if parts_used >= upper_bound and not _suffix_fits_in_existing_parts(graph, new_suffix, parts_used, part_neighbors, part_suffix_neighbors, bound_rows):
+        statistics.bound_prunes += 1
+        return -1
+
     if _check_state_seen(
         seen_states,
-        seen_entries,
+        statistics,
         prefix_vertices,
         new_suffix,
         parts_used,
@@ -290,8 +541,9 @@ cdef int _branch_and_bound(
         suffix_neighbors_of_vertex,
         part_suffix_neighbors,
         vertices_not_added,
+        bound_rows,
         seen_states,
-        seen_entries,
+        statistics,
         canonical_vertices,
         lower_bound,
         upper_bound,
@@ -342,8 +594,9 @@ cdef int _branch_and_bound(
                 suffix_neighbors_of_vertex,
                 part_suffix_neighbors,
                 vertices_not_added,
+                bound_rows,
                 seen_states,
-                seen_entries,
+                statistics,
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
@@ -368,8 +621,9 @@ cdef int _branch_and_bound(
                 suffix_neighbors_of_vertex,
                 part_suffix_neighbors,
                 vertices_not_added,
+                bound_rows,
                 seen_states,
-                seen_entries,
+                statistics,
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
@@ -385,6 +639,11 @@ cdef int _branch_and_bound(
     return best_solution_found
 
 
+cdef inline bint _out_of_nodes(search_statistics_t* statistics):
+    """Once out of nodes, every new node fails at once, which unwinds the search."""
+    return statistics.max_nodes != 0 and statistics.nodes > statistics.max_nodes
+
+
 cdef inline int _get_level(bitset_t suffix_vertices):
     return suffix_vertices.size - bitset_len(suffix_vertices)
 
@@ -409,8 +668,9 @@ cdef inline int _branch_adding_to_existing_part(
     bitset_t suffix_neighbors_of_vertex,
     binary_matrix_t part_suffix_neighbors,
     binary_matrix_t vertices_not_added,
+    binary_matrix_t bound_rows,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -461,8 +721,9 @@ cdef inline int _branch_adding_to_existing_part(
                 suffix_neighbors_of_vertex,
                 part_suffix_neighbors,
                 vertices_not_added,
+                bound_rows,
                 seen_states,
-                seen_entries,
+                statistics,
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
@@ -543,8 +804,9 @@ cdef inline int _branch_adding_to_new_part(
     bitset_t suffix_neighbors_of_vertex,
     binary_matrix_t part_suffix_neighbors,
     binary_matrix_t vertices_not_added,
+    binary_matrix_t bound_rows,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -579,8 +841,9 @@ cdef inline int _branch_adding_to_new_part(
             suffix_neighbors_of_vertex,
             part_suffix_neighbors,
             vertices_not_added,
+            bound_rows,
             seen_states,
-            seen_entries,
+            statistics,
             canonical_vertices,
             lower_bound,
             upper_bound,
@@ -620,8 +883,9 @@ cdef inline int _branch_with_vertex_on_part(
     bitset_t suffix_neighbors_of_vertex,
     binary_matrix_t part_suffix_neighbors,
     binary_matrix_t vertices_not_added,
+    binary_matrix_t bound_rows,
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
@@ -653,8 +917,9 @@ cdef inline int _branch_with_vertex_on_part(
         suffix_neighbors_of_vertex,
         part_suffix_neighbors,
         vertices_not_added,
+        bound_rows,
         seen_states,
-        seen_entries,
+        statistics,
         canonical_vertices,
         lower_bound,
         upper_bound,
@@ -796,9 +1061,50 @@ cdef inline bint _is_greedy_part_for_vertex(
     return bitset_eq(part_suffix_neighbors.rows[part], suffix_neighbors_of_vertex)
 
 
+cdef inline bint _suffix_fits_in_existing_parts(
+    binary_matrix_t graph,
+    bitset_t suffix_vertices,
+    int parts_used,
+    binary_matrix_t part_neighbors,
+    binary_matrix_t part_suffix_neighbors,
+    binary_matrix_t bound_rows,
+):
+    """Whether the suffix vertices might all be added to the existing parts, a necessary condition.
+
+    A vertex can only be added to a part once every suffix neighbor of the part that is not a
+    neighbor of the vertex is in the prefix, since part neighborhoods only grow. Peel the vertices
+    whose constraints for some part are met by the vertices already peeled: in any completion, each
+    vertex is peeled after the ones before it, so if some vertex is never peeled, the vertices that
+    must come before each other form a cycle and a new part is needed.
+    """
+    cdef bitset_s* remaining = bound_rows.rows[0]
+    cdef bitset_s* peeled = bound_rows.rows[1]
+    cdef bitset_s* allowed = bound_rows.rows[2]
+    cdef int part, vertex
+    cdef bint changed = True
+    for part in range(parts_used):
+        bitset_intersection(part_suffix_neighbors.rows[part], part_neighbors.rows[part], suffix_vertices)
+    bitset_copy(remaining, suffix_vertices)
+    bitset_clear(peeled)
+    while changed:
+        changed = False
+        vertex = bitset_next(remaining, 0)
+        while vertex != -1:
+            bitset_union(allowed, graph.rows[vertex], peeled)
+            bitset_add(allowed, vertex)
+            for part in range(parts_used):
+                if bitset_issubset(part_suffix_neighbors.rows[part], allowed):
+                    bitset_add(peeled, vertex)
+                    bitset_discard(remaining, vertex)
+                    changed = True
+                    break
+            vertex = bitset_next(remaining, vertex + 1)
+    return bitset_isempty(remaining)
+
+
 cdef inline bint _check_state_seen(
     dict seen_states,
-    int* seen_entries,
+    search_statistics_t* statistics,
     bitset_t prefix_vertices,
     bitset_t suffix_vertices,
     int parts_used,
@@ -819,13 +1125,14 @@ cdef inline bint _check_state_seen(
     if frozen_prefix_vertices in seen_states:
         seen_part_neighbors = seen_states[frozen_prefix_vertices]
         if frozen_part_neighbors in seen_part_neighbors:
+            statistics.memo_hits += 1
             return True
-        elif seen_entries[0] < max_seen_entries:
+        elif statistics.memo_entries < max_seen_entries:
             seen_part_neighbors.add(frozen_part_neighbors)
-            seen_entries[0] += 1
-    elif seen_entries[0] < max_seen_entries:
+            statistics.memo_entries += 1
+    elif statistics.memo_entries < max_seen_entries:
         seen_states[frozen_prefix_vertices] = {frozen_part_neighbors}
-        seen_entries[0] += 1
+        statistics.memo_entries += 1
     
     return False
 
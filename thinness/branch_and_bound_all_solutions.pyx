@@ -1,18 +1,20 @@
 import itertools
+import queue
+import threading
+from collections.abc import Iterator
 
 from sage.graphs.graph import Graph
-from sage.data_structures.bitset import Bitset
 from sage.data_structures.binary_matrix cimport *
 from sage.graphs.base.static_dense_graph cimport dense_graph_init
 from cysignals.memory cimport check_malloc, sig_malloc, sig_free
 from cysignals.signals cimport sig_on, sig_off 
-from sage.graphs.graph_decompositions.vertex_separation import vertex_separation
 
 from thinness.consistent_solution import ConsistentSolution 
-from thinness.vertex_separation import solution_from_vertex_separation
+from thinness.vertex_separation import vertex_separation, solution_from_vertex_separation
 
 DEFAULT_MAX_PREFIX_LENGTH = 15
 DEFAULT_MAX_SEEN_ENTRIES = 1_000_000
+DEFAULT_MAX_QUEUED_SOLUTIONS = 1024
 
 
 def calculate_thinness_of_connected_graph(
@@ -30,6 +32,176 @@ def calculate_thinness_of_connected_graph(
         else min(upper_bound, upper_bound_from_vertex_separation)
     )
 
+    cdef list solutions = []
+    branch_and_bound_thinness = _search(
+        graph,
+        lower_bound,
+        upper_bound,
+        _SolutionSink(lambda order, part_of, thinness: solutions.append((order, part_of, thinness)))
+    )
+    return [
+        to_consistent_solution(order, part_of)
+        for order, part_of, thinness in solutions
+        if thinness == branch_and_bound_thinness
+    ]
+
+
+def optimal_solutions(
+    graph: Graph,
+    thinness: int = None,
+    orbit_representatives: bool = False,
+    max_queued_solutions: int = DEFAULT_MAX_QUEUED_SOLUTIONS,
+) -> Iterator[tuple[bytes, bytes]]:
+    """Yield the optimal solutions of the connected graph `graph` as they are found.
+
+    Each solution is a pair `(order, part_of)` of bytes: the vertices in order and the part of each
+    vertex. `thinness` is the thinness of `graph`, computed first if not given, so only solutions
+    with that many parts are searched for. If `orbit_representatives` is set, only one solution is
+    yielded for each orbit of the automorphism group of `graph` acting on the solutions.
+
+    The search runs in another thread, which waits while `max_queued_solutions` solutions are
+    waiting to be consumed, so solutions are never all held in memory. Closing the generator
+    stops the search.
+    graph must have vertices labeled as integers from 0 to n-1.
+    """
+    if thinness is None:
+        from thinness.branch_and_bound import calculate_thinness
+        thinness = calculate_thinness(graph)
+
+    pending = queue.Queue(maxsize=max_queued_solutions)
+
+    def put(item):
+        while not sink.cancelled:
+            try:
+                pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise _SearchCancelled()
+
+    consumer = lambda order, part_of, _: put((order, part_of))
+    if orbit_representatives:
+        consumer = _OrbitRepresentatives(graph, consumer)
+    sink = _SolutionSink(consumer)
+
+    def search():
+        try:
+            _search(graph, thinness, thinness, sink, interruptible=False)
+            put(_SEARCH_FINISHED)
+        except _SearchCancelled:
+            pass
+        except BaseException as error:
+            put(error)
+
+    searcher = threading.Thread(target=search, daemon=True)
+    searcher.start()
+    try:
+        while (item := pending.get()) is not _SEARCH_FINISHED:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # The search checks the flag at every node, so it stops soon after.
+        sink.cancelled = True
+        searcher.join()
+
+
+def count_optimal_solutions(graph: Graph, thinness: int = None, orbit_representatives: bool = False) -> int:
+    """Return the number of solutions `optimal_solutions` yields, without building any of them
+    unless `orbit_representatives` is set."""
+    if thinness is None:
+        from thinness.branch_and_bound import calculate_thinness
+        thinness = calculate_thinness(graph)
+
+    consumer = None
+    if orbit_representatives:
+        consumer = _OrbitRepresentatives(graph, lambda order, part_of, _: None)
+    sink = _SolutionSink(consumer)
+    _search(graph, thinness, thinness, sink)
+    return consumer.count if orbit_representatives else sink.count
+
+
+def to_consistent_solution(order: bytes, part_of: bytes) -> ConsistentSolution:
+    partition = [set() for _ in range(max(part_of) + 1)]
+    for vertex, part in enumerate(part_of):
+        partition[part].add(vertex)
+    return ConsistentSolution(list(order), partition)
+
+
+class _SearchCancelled(Exception):
+    pass
+
+
+_SEARCH_FINISHED = object()
+
+
+class _OrbitRepresentatives:
+    """Passes on to `consumer` only the first solution found of each orbit of the automorphism group.
+
+    Two solutions are in the same orbit if and only if the relabelling that maps the order of one
+    to the order of the other is an automorphism and maps parts to parts. So solutions are compared
+    by a key made of the adjacency matrix of the graph with each vertex relabelled by its position
+    in the order, and the parts in order, renamed in order of first appearance. The key takes
+    quadratic time, however large the automorphism group is.
+    """
+
+    def __init__(self, graph: Graph, consumer):
+        self.neighbors = [list(graph.neighbor_iterator(vertex)) for vertex in range(graph.order())]
+        self.row_length = (graph.order() + 7) // 8
+        self.consumer = consumer
+        self.seen_keys = set()
+        self.count = 0
+
+    def __call__(self, order: bytes, part_of: bytes, thinness: int):
+        key = self._key(order, part_of)
+        if key not in self.seen_keys:
+            self.seen_keys.add(key)
+            self.count += 1
+            self.consumer(order, part_of, thinness)
+
+    def _key(self, order: bytes, part_of: bytes) -> bytes:
+        position = [0] * len(order)
+        for i, vertex in enumerate(order):
+            position[vertex] = i
+        part_names = {}
+        parts_in_order = bytes(part_names.setdefault(part_of[vertex], len(part_names)) for vertex in order)
+        rows = (
+            sum(1 << position[neighbor] for neighbor in self.neighbors[vertex]).to_bytes(self.row_length, 'little')
+            for vertex in order
+        )
+        return parts_in_order + b''.join(rows)
+
+
+cdef class _SolutionSink:
+    """Receives the solutions found by the search, passing them to `consumer` as bytes unless it is None.
+
+    Setting `cancelled` makes the search raise `_SearchCancelled` at its next node.
+    """
+    cdef public long count
+    cdef public bint cancelled
+    cdef object consumer
+
+    def __init__(self, consumer):
+        self.count = 0
+        self.cancelled = False
+        self.consumer = consumer
+
+    cdef int emit(self, int* order, int* part_of, int n, int thinness) except -1:
+        self.count += 1
+        if self.consumer is not None:
+            self.consumer(
+                bytes([order[i] for i in range(n)]),
+                bytes([part_of[vertex] for vertex in range(n)]),
+                thinness
+            )
+        return 0
+
+
+def _search(graph: Graph, lower_bound: int, upper_bound: int, _SolutionSink sink, bint interruptible=True) -> int:
+    """Send every solution found with at most `upper_bound` parts to `sink` and return the best thinness found.
+
+    Signals are only handled while `interruptible`, which must be unset outside of the main thread.
+    """
     cdef int max_branch_and_bound_thinness = upper_bound
 
     cdef binary_matrix_t adjacency_matrix
@@ -68,18 +240,14 @@ def calculate_thinness_of_connected_graph(
     
     cdef bitset_t vertices_not_added
     bitset_init(vertices_not_added, n)
-    
-    cdef int* best_order = <int*>sig_malloc(sizeof(int) * n)
-    cdef int* best_partition = <int*>sig_malloc(sizeof(int) * n)
 
     cdef bitset_t canonical_vertices
     bitset_init(canonical_vertices, n)
     _build_canonical_vertices(graph, canonical_vertices)
 
-    cdef list solutions = []
-
     try:
-        sig_on()
+        if interruptible:
+            sig_on()
         branch_and_bound_thinness = _branch_and_bound(
             graph=adjacency_matrix,
             prefix=prefix,
@@ -98,11 +266,10 @@ def calculate_thinness_of_connected_graph(
             canonical_vertices=canonical_vertices,
             lower_bound=lower_bound,
             upper_bound=max_branch_and_bound_thinness,
-            best_order=best_order,
-            best_partition=best_partition,
-            solutions=solutions,
+            sink=sink,
         )
-        sig_off()
+        if interruptible:
+            sig_off()
     finally:
         binary_matrix_free(adjacency_matrix)
         bitset_free(prefix_vertices)
@@ -116,19 +283,10 @@ def calculate_thinness_of_connected_graph(
         binary_matrix_free(parts_for_vertices)
         bitset_free(suffix_neighbors_of_vertex)
         binary_matrix_free(part_suffix_neighbors)
+        bitset_free(vertices_not_added)
         bitset_free(canonical_vertices)
-        sig_free(best_order)
-        sig_free(best_partition)
 
-    return [solution for solution in solutions if solution.thinness == branch_and_bound_thinness]
-
-
-cdef _build_solution(int* best_order, int* best_partition, int thinness, int n):
-    cdef list order = [best_order[i] for i in range(n)]
-    cdef list partition = [set() for _ in range(thinness)]
-    for vertex in range(n):
-        partition[best_partition[vertex]].add(vertex)
-    return ConsistentSolution(order, partition)
+    return branch_and_bound_thinness
 
 
 cdef inline void _build_canonical_vertices(graph: Graph, bitset_t canonical_vertices):
@@ -155,10 +313,10 @@ cdef int _branch_and_bound(
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
-    int* best_order,
-    int* best_partition,
-    list solutions,
+    _SolutionSink sink,
 ):
+    if sink.cancelled:
+        raise _SearchCancelled()
     cdef int level = _get_level(suffix_vertices)
   
     cdef bitset_t new_suffix = new_suffixes.rows[level]
@@ -176,10 +334,7 @@ cdef int _branch_and_bound(
     )
 
     if bitset_isempty(new_suffix) and parts_used <= upper_bound:
-        _copy_array(graph.n_cols, prefix, best_order)
-        _copy_array(graph.n_cols, part_of, best_partition)
-        solution = _build_solution(best_order, best_partition, parts_used, graph.n_cols)
-        solutions.append(solution)
+        sink.emit(prefix, part_of, graph.n_cols, parts_used)
         return parts_used
     
     cdef int best_solution_found = _branch_adding_to_existing_part(
@@ -200,9 +355,7 @@ cdef int _branch_and_bound(
         canonical_vertices,
         lower_bound,
         upper_bound,
-        best_order,
-        best_partition,
-        solutions,
+        sink,
     )
     
     if best_solution_found != -1:
@@ -246,9 +399,7 @@ cdef int _branch_and_bound(
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
-                best_order,
-                best_partition,
-                solutions,
+                sink,
             )
         else:
             new_part_solution = _branch_adding_to_new_part(
@@ -269,9 +420,7 @@ cdef int _branch_and_bound(
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
-                best_order,
-                best_partition,
-                solutions,
+                sink,
             )
 
         if new_part_solution != -1:
@@ -284,11 +433,6 @@ cdef inline int _get_level(bitset_t suffix_vertices):
     return suffix_vertices.size - bitset_len(suffix_vertices)
 
 
-cdef inline void _copy_array(int n, int* array_from, int* array_to):
-    for i in range(n):
-        array_to[i] = array_from[i]
-
-
 cdef inline int _branch_adding_to_existing_part(
     binary_matrix_t graph,
     int* prefix,
@@ -307,9 +451,7 @@ cdef inline int _branch_adding_to_existing_part(
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
-    int* best_order,
-    int* best_partition,
-    list solutions,
+    _SolutionSink sink,
 ):
     cdef int level = _get_level(suffix_vertices)
     cdef int best_solution_found = -1
@@ -356,9 +498,7 @@ cdef inline int _branch_adding_to_existing_part(
                 canonical_vertices,
                 lower_bound,
                 upper_bound,
-                best_order,
-                best_partition,
-                solutions,
+                sink,
             )
 
             if current_solution != -1:
@@ -432,9 +572,7 @@ cdef inline int _branch_adding_to_new_part(
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
-    int* best_order,
-    int* best_partition,
-    list solutions,
+    _SolutionSink sink,
 ):
     cdef int level = _get_level(suffix_vertices)
     cdef int best_solution_found = -1
@@ -465,9 +603,7 @@ cdef inline int _branch_adding_to_new_part(
             canonical_vertices,
             lower_bound,
             upper_bound,
-            best_order,
-            best_partition,
-            solutions,
+            sink,
         )
 
         if current_solution != -1:
@@ -500,9 +636,7 @@ cdef inline int _branch_with_vertex_on_part(
     bitset_t canonical_vertices,
     int lower_bound,
     int upper_bound,
-    int* best_order,
-    int* best_partition,
-    list solutions,
+    _SolutionSink sink,
 ):
     part_of[vertex] = part
 
@@ -530,9 +664,7 @@ cdef inline int _branch_with_vertex_on_part(
         canonical_vertices,
         lower_bound,
         upper_bound,
-        best_order,
-        best_partition,
-        solutions,
+        sink,
     )
 
     _undo_update_part_neighbors(
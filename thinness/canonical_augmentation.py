@@ -0,0 +1,92 @@
+from collections.abc import Iterator
+
+from sage.graphs.graph import Graph
+
+from thinness.branch_and_bound import calculate_thinness
+from thinness.consistent_solution import ConsistentSolution
+from thinness.helpers import CANONICAL_LABEL_ALGORITHM
+
+
+def connected_graphs_with_thinness(max_order: int, min_order: int = 1) -> Iterator[tuple[Graph, ConsistentSolution]]:
+    """Yield every connected graph of order between `min_order` and `max_order` exactly once, up to isomorphism,
+    together with a certificate of its thinness.
+
+    Graphs are generated by canonical augmentation: each graph is obtained from its parent by adding a
+    new vertex, and is kept only if the new vertex is equivalent to its canonical deletion vertex, so no
+    isomorphism checks against previously generated graphs are needed.
+
+    Each child inherits bounds from its parent: thinness is hereditary, so the thinness of the parent
+    is a lower bound, and the parent's solution with the new vertex first, in a part of its own, is
+    consistent for the child. The branch and bound engine then only has to decide between those two values.
+    """
+    root = Graph(1)
+    yield from _augment(root, ConsistentSolution([0], [{0}]), max_order, min_order)
+
+
+def _augment(graph: Graph, solution: ConsistentSolution, max_order: int, min_order: int):
+    if graph.order() >= min_order:
+        yield graph, solution
+    if graph.order() == max_order:
+        return
+    for child in _children(graph):
+        new_vertex = graph.order()
+        incumbent = ConsistentSolution([new_vertex] + solution.order, solution.partition + [{new_vertex}])
+        child_solution = calculate_thinness(
+            child,
+            lower_bound=solution.thinness,
+            upper_bound=solution.thinness + 1,
+            certificate=True,
+            incumbent=incumbent
+        )
+        yield from _augment(child, child_solution, max_order, min_order)
+
+
+def _children(graph: Graph) -> Iterator[Graph]:
+    """Yield the connected graphs obtained by adding the vertex `graph.order()` whose canonical parent is `graph`.
+
+    Neighborhoods in the same orbit of the automorphism group of `graph` give the same child, so only
+    one of them is tried.
+    """
+    new_vertex = graph.order()
+    seen_augmentations = set()
+    for neighborhood in _nonempty_subsets(list(graph)):
+        child = graph.copy(immutable=False)
+        child.add_vertex(new_vertex)
+        child.add_edges((new_vertex, neighbor) for neighbor in neighborhood)
+
+        canonical_child, relabelling = child.canonical_label(
+            partition=[list(graph), [new_vertex]],
+            certificate=True,
+            algorithm=CANONICAL_LABEL_ALGORITHM
+        )
+        augmentation = (canonical_child.graph6_string(), relabelling[new_vertex])
+        if augmentation in seen_augmentations:
+            continue
+        seen_augmentations.add(augmentation)
+
+        if _is_canonical_augmentation(child, new_vertex):
+            yield child
+
+
+def _is_canonical_augmentation(graph: Graph, new_vertex: int) -> bool:
+    """Return whether `new_vertex` is in the orbit of the canonical deletion vertex of `graph`.
+
+    The canonical deletion vertex is the non-cut vertex that comes last in the canonical labelling,
+    so the parent of a connected graph is always connected.
+    """
+    _, relabelling = graph.canonical_label(certificate=True, algorithm=CANONICAL_LABEL_ALGORITHM)
+    _, cut_vertices = graph.blocks_and_cut_vertices()
+    cut_vertices = set(cut_vertices)
+    deletion_vertex = max(
+        (vertex for vertex in graph if vertex not in cut_vertices),
+        key=lambda vertex: relabelling[vertex]
+    )
+    if deletion_vertex == new_vertex:
+        return True
+    orbits = graph.automorphism_group(orbits=True, return_group=False)
+    return any(new_vertex in orbit and deletion_vertex in orbit for orbit in orbits)
+
+
+def _nonempty_subsets(elements: list) -> Iterator[list]:
+    for mask in range(1, 1 << len(elements)):
+        yield [element for i, element in enumerate(elements) if mask >> i & 1]
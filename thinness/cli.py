@@ -0,0 +1,143 @@
+"""Streaming filter for graph6 lines, for shell pipelines.
+
+    geng -c 11 | python -m thinness --workers 64 --min 3 > out.csv
+
+Reads graph6 strings from stdin in chunks and writes a row `graph6,thinness[,proper_thinness][,certificate]`
+for each graph that passes the filters. At most a few chunks per worker are in flight at any time,
+so memory stays flat however long the input is. Rows come out in input order, or as soon as their
+chunk is done with `--unordered`. A line that cannot be processed, such as an invalid graph6 string,
+is reported on stderr without stopping the others, and the exit status is 1.
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sage.graphs.graph import Graph
+
+from .itertools_utils import batched
+
+
+DEFAULT_CHUNK_SIZE = 256
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+GRAPH6_HEADER = '>>graph6<<'
+
+
+def process_graph(graph6: str, options: argparse.Namespace) -> str | None:
+    """Return the output row of the graph, or None if it does not pass the filters."""
+    from .branch_and_bound import calculate_thinness
+
+    G = Graph(graph6)
+    if options.certificate:
+        solution = calculate_thinness(G, certificate=True)
+        thinness = solution.thinness
+    else:
+        thinness = calculate_thinness(G, upper_bound=None if options.max is None else options.max + 1)
+    if options.min is not None and thinness < options.min:
+        return None
+    if options.max is not None and thinness > options.max:
+        return None
+    if options.minimal and not _is_minimal(G, thinness):
+        return None
+
+    row = [graph6, str(thinness)]
+    if options.proper:
+        from proper_thinness.branch_and_bound import calculate_proper_thinness
+        row.append(str(calculate_proper_thinness(G, lower_bound=thinness)))
+    if options.certificate:
+        row.append(' '.join(f'{vertex}:{part}' for vertex, part in zip(solution.order, solution.parts)))
+    return ','.join(row)
+
+
+def process_chunk(chunk: tuple[str, ...], options: argparse.Namespace) -> tuple[list[str], list[str]]:
+    """Return the rows of the graphs of `chunk` that pass the filters, and an error message for each graph that failed."""
+    rows = []
+    errors = []
+    for graph6 in chunk:
+        try:
+            row = process_graph(graph6, options)
+        except Exception as error:
+            errors.append(f'{graph6}: {error!r}')
+        else:
+            if row is not None:
+                rows.append(row)
+    return rows, errors
+
+
+def _is_minimal(G: Graph, thinness: int) -> bool:
+    """Whether deleting any vertex lowers the thinness, so every proper induced subgraph has a smaller thinness."""
+    from .branch_and_bound import calculate_thinness
+    if G.order() <= 1:
+        # The empty graph has no proper induced subgraphs, and K1 only has the empty graph, of thinness 0.
+        return True
+    return all(
+        calculate_thinness(G.subgraph([u for u in G if u != v]), upper_bound=thinness) < thinness
+        for v in G
+    )
+
+
+def run(lines, output, options: argparse.Namespace, errors=sys.stderr) -> int:
+    """Write the rows of the graph6 strings in `lines` to `output`, keeping a bounded number of chunks in flight.
+
+    Return the number of graphs that failed, whose messages are written to `errors`.
+    """
+    graph6_strings = (line.strip().removeprefix(GRAPH6_HEADER) for line in lines)
+    chunks = batched((graph6 for graph6 in graph6_strings if graph6), options.chunk_size)
+    max_in_flight = options.workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    failures = 0
+    with ProcessPoolExecutor(options.workers) as executor:
+        if options.unordered:
+            in_flight = set()
+            for chunk in chunks:
+                in_flight.add(executor.submit(process_chunk, chunk, options))
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    failures += _write_rows(done, output, errors)
+            failures += _write_rows(in_flight, output, errors)
+        else:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(executor.submit(process_chunk, chunk, options))
+                if len(in_flight) >= max_in_flight:
+                    failures += _write_rows([in_flight.popleft()], output, errors)
+            failures += _write_rows(in_flight, output, errors)
+    return failures
+
+
+def _write_rows(futures, output, errors) -> int:
+    failures = 0
+    for future in futures:
+        rows, messages = future.result()
+        for row in rows:
+            output.write(row + '\n')
+        for message in messages:
+            errors.write(message + '\n')
+        failures += len(messages)
+    output.flush()
+    return failures
+
+
+def parse_arguments(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m thinness', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, one per CPU by default')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='graphs sent to a worker at a time')
+    parser.add_argument('--unordered', action='store_true', help='write the rows in completion order')
+    parser.add_argument('--min', type=int, help='only graphs of thinness at least MIN')
+    parser.add_argument('--max', type=int, help='only graphs of thinness at most MAX')
+    parser.add_argument('--minimal', action='store_true', help='only graphs whose proper induced subgraphs all have a smaller thinness')
+    parser.add_argument('--proper', action='store_true', help='add the proper thinness')
+    parser.add_argument('--certificate', action='store_true', help='add an optimal solution, as vertex:part pairs in order')
+    options = parser.parse_args(argv)
+    if options.workers is None:
+        options.workers = os.cpu_count()
+    return options
+
+
+def main(argv: list[str] = None):
+    if run(sys.stdin, sys.stdout, parse_arguments(argv)):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,47 @@
 class ConsistentSolution:
+    """A vertex order with the part of each vertex, stored as arrays aligned with the order.
+
+    `parts[i]` is the part of `order[i]`, so `position` and `part_of` take constant time. The
+    set-based `partition` is built from them on first use.
+    """
+    __slots__ = ('order', 'parts', 'thinness', '_position', '_partition')
+
     def __init__(self, order: list, partition: list[set]) -> None:
+        part_index = {vertex: part for part, vertices in enumerate(partition) for vertex in vertices}
+        self._set(order, [part_index.get(vertex) for vertex in order], len(partition))
+        self._partition = partition
+
+    @classmethod
+    def from_parts(cls, order: list, parts: list[int], thinness: int = None) -> 'ConsistentSolution':
+        """Build a solution from the part of each vertex of `order`, without going through sets.
+
+        `thinness` defaults to the number of parts that `parts` refers to.
+        """
+        solution = cls.__new__(cls)
+        solution._set(order, parts, thinness if thinness is not None else max(parts, default=-1) + 1)
+        solution._partition = None
+        return solution
+
+    def _set(self, order: list, parts: list[int], thinness: int):
         self.order = order
-        self.partition = partition
-        self.thinness = len(partition)
+        self.parts = parts
+        self.thinness = thinness
+        self._position = {vertex: i for i, vertex in enumerate(order)}
+
+    @property
+    def partition(self) -> list[set]:
+        if self._partition is None:
+            self._partition = [set() for _ in range(self.thinness)]
+            for vertex, part in zip(self.order, self.parts):
+                self._partition[part].add(vertex)
+        return self._partition
+
+    def position(self, vertex) -> int:
+        return self._position.get(vertex)
 
     def part_of(self, vertex) -> int:
-        for part, vertices in enumerate(self.partition):
-            if vertex in vertices:
-                return part
-        return None
+        position = self._position.get(vertex)
+        return self.parts[position] if position is not None else None
 
     def __str__(self):
         return '{' + f'Thinness: {self.thinness}, Order: {self.order}, Partition: {self.partition}' + '}'
@@ -2,6 +2,9 @@ import csv
 import os
 from sage.graphs.graph import Graph
 
+from .obstructions import Obstructions
+from .store import ResultStore, STORE_FILENAME
+
 
 DATA_DIR = 'data'
 LAST_PROCESSED_INDEX_FILENAME = f'{DATA_DIR}/last-processed.index'
@@ -54,18 +57,29 @@ def save_graph_with_proper_thinness(graph6, proper_thinness):
     _save_graph_with_width_parameter(graph6, PROPER_THINNESS, proper_thinness)
 
 
-def _load_graphs_with_width(width_parameter, value):
-    return load_graphs_from_csv(_width_parameter_graphs_filename(width_parameter, value))
+def export_results_to_csvs(store: ResultStore):
+    store.export_to_csvs(_width_parameter_graphs_filename)
+
+
+def load_obstructions(width_parameter, value) -> Obstructions:
+    """Return the minimal graphs with the given value, compiled from their CSV file without building any graph."""
+    return Obstructions(_width_parameter_graphs_filename(width_parameter, value))
+
+
+def _load_graphs_with_width(width_parameter, value, n=MAX_ORDER):
+    graphs = list(load_obstructions(width_parameter, value).graphs(max_order=n))
+    if os.path.exists(STORE_FILENAME):
+        with ResultStore(STORE_FILENAME) as store:
+            unexported_graphs = (
+                Graph(graph6, immutable=True)
+                for graph6 in store.graph6_strings(width_parameter, value, exported=False)
+            )
+            graphs.extend(graph for graph in unexported_graphs if graph.order() <= n)
+    return graphs
 
 
 def _load_graphs_by_width_parameter(n, width_parameter):
-    input_dict = {}
-    for k in range(2, MAX_THINNESS + 1):
-        input_dict[k] = _load_graphs_with_width(width_parameter, k)
-    output_dict = {}
-    for k in range(2, MAX_THINNESS + 1):
-        output_dict[k] = [graph for graph in input_dict[k] if graph.order() <= n]
-    return output_dict
+    return {k: _load_graphs_with_width(width_parameter, k, n) for k in range(2, MAX_THINNESS + 1)}
 
 
 def load_graphs_by_thinness(n=MAX_ORDER):
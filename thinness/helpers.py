@@ -1,14 +1,40 @@
-from sage.graphs.graph_generators import graphs
-from sage.combinat.permutation import Permutations
+import subprocess
+
+from sage.graphs.graph import Graph
+
+# Persisted results are keyed by canonical labels, so they must not depend on whether bliss is installed.
+CANONICAL_LABEL_ALGORITHM = 'sage'
 
 
 def connected_graphs_upto(n, start=2):
+    from sage.graphs.graph_generators import graphs
     for i in range(start, n+1):
         for G in graphs(i):
             if G.is_connected():
                 yield G.copy(immutable=True)
 
+
+def connected_graph6_shard(n: int, res: int = 0, mod: int = 1):
+    """Yield the graph6 strings, as bytes, of the connected graphs of order `n` in the shard `res`/`mod` of geng.
+
+    Running every shard `0 <= res < mod` generates each graph exactly once, so each worker
+    can generate its own shard without going through a central producer.
+    """
+    from sage.features.nauty import NautyExecutable
+    geng_path = NautyExecutable('geng').absolute_filename()
+    with subprocess.Popen([geng_path, '-cq', str(n), f'{res}/{mod}'], stdout=subprocess.PIPE) as geng:
+        for line in geng.stdout:
+            yield line.rstrip(b'\n')
+
+
+def canonical_graph6(graph: Graph | str) -> str:
+    if isinstance(graph, str):
+        graph = Graph(graph)
+    return graph.canonical_label(algorithm=CANONICAL_LABEL_ALGORITHM).graph6_string()
+
+
 def iterate_permutations(vertex_set, random_permutations=None):
+    from sage.combinat.permutation import Permutations
     if random_permutations:
         for x in range(random_permutations):
             yield Permutations(vertex_set).random_element()
@@ -17,7 +43,9 @@ def iterate_permutations(vertex_set, random_permutations=None):
             yield pi
 
 def has_induced_subgraph(G, graphs_list):
-    return any(G.subgraph_search(H, induced=True) for H in graphs_list)
+    # Callers that search the same patterns in many graphs should hold a `PatternSet` instead.
+    from .induced_subgraph import find_induced_subgraph
+    return find_induced_subgraph(G, graphs_list) is not None
     
 def find_lower_bound(G, graphs_dict):
     for k in sorted(graphs_dict, reverse=True):
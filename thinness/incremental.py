@@ -0,0 +1,115 @@
+"""Thinness of a graph that changes by small edits, starting from an optimal solution before the edit.
+
+The old solution gives both bounds for the edited graph, so the search only runs when they differ:
+
+- Upper bound: the old order, without the removed vertices, keeps its optimal partition recomputed
+  for the edited graph, and each added vertex goes to the position of the order where the partition
+  is smallest, see `thinness.local_search.OrderState`.
+- Lower bound: thinness is hereditary, and deleting a vertex lowers it by at most one. The old and
+  the edited graph share the subgraph induced by the old vertices that are kept, minus a vertex
+  cover of the edges that changed, so the edited graph has at least the old thinness minus the
+  number of vertices outside of it.
+"""
+from dataclasses import dataclass
+
+from sage.graphs.graph import Graph
+
+from .branch_and_bound import calculate_thinness
+from .consistent_solution import ConsistentSolution
+from .local_search import OrderState
+from .search_statistics import SearchStatistics
+
+
+@dataclass(frozen=True)
+class GraphEdit:
+    added_vertices: tuple = ()
+    removed_vertices: tuple = ()
+    added_edges: tuple = ()  # pairs of vertices
+    removed_edges: tuple = ()
+
+    def apply(self, graph: Graph) -> Graph:
+        """Return a copy of `graph` with the edit applied."""
+        edited = graph.copy(immutable=False)
+        edited.add_vertices(self.added_vertices)
+        edited.delete_vertices(self.removed_vertices)
+        edited.add_edges(self.added_edges)
+        edited.delete_edges(self.removed_edges)
+        return edited
+
+
+def resolve_thinness(
+    graph: Graph,
+    previous: ConsistentSolution,
+    edit: GraphEdit,
+    statistics: SearchStatistics = None
+) -> ConsistentSolution:
+    """Return an optimal solution for `graph`, the result of `edit` on a graph for which `previous` is optimal.
+
+    Vertices of `graph` missing from `previous` count as added, and vertices of `previous` missing
+    from `graph` count as removed, so `edit` only needs to list the edges that changed between
+    vertices of both graphs.
+    """
+    if graph.order() == 0:
+        return ConsistentSolution.from_parts([], [], 0)
+    repaired = repair_solution(graph, previous)
+    lower_bound = max(1, previous.thinness - len(_changed_vertices(graph, previous, edit)))
+    if repaired.thinness <= lower_bound:
+        return repaired
+    return calculate_thinness(
+        graph,
+        lower_bound=lower_bound,
+        certificate=True,
+        incumbent=repaired,
+        statistics=statistics,
+        vertex_separation_bound=False
+    )
+
+
+def repair_solution(graph: Graph, previous: ConsistentSolution) -> ConsistentSolution:
+    """Return a solution for `graph` that keeps the order of `previous` for the vertices they share."""
+    vertices = [vertex for vertex in previous.order if vertex in graph]
+    kept = set(vertices)
+    added = [vertex for vertex in graph if vertex not in kept]
+    vertices += added
+    index = {vertex: i for i, vertex in enumerate(vertices)}
+    neighbors = [sum(1 << index[neighbor] for neighbor in graph.neighbor_iterator(vertex)) for vertex in vertices]
+
+    # The added vertices start at the end, and each one is swept to the front to find the position
+    # with the smallest partition.
+    state = OrderState(neighbors, range(len(vertices)))
+    for vertex in range(len(kept), len(vertices)):
+        position = state.position[vertex]
+        best_position, best_thinness = position, state.thinness
+        for target in range(position - 1, -1, -1):
+            state.swap(target)
+            if state.thinness < best_thinness:
+                best_position, best_thinness = target, state.thinness
+        state.move(0, best_position)
+
+    solution = state.solution()
+    return ConsistentSolution.from_parts([vertices[vertex] for vertex in solution.order], solution.parts, solution.thinness)
+
+
+def _changed_vertices(graph: Graph, previous: ConsistentSolution, edit: GraphEdit) -> set:
+    """Return the removed vertices and a vertex cover of the changed edges between the kept vertices."""
+    removed = {vertex for vertex in previous.order if vertex not in graph}
+    changed_edges = [
+        (u, v) for u, v in (*edit.added_edges, *edit.removed_edges)
+        if u != v and all(previous.position(vertex) is not None and vertex in graph for vertex in (u, v))
+    ]
+    return removed | _greedy_vertex_cover(changed_edges)
+
+
+def _greedy_vertex_cover(edges: list[tuple]) -> set:
+    """Take the vertex that covers the most uncovered edges until every edge is covered."""
+    remaining = {frozenset(edge) for edge in edges}
+    cover = set()
+    while remaining:
+        degree = {}
+        for edge in remaining:
+            for vertex in edge:
+                degree[vertex] = degree.get(vertex, 0) + 1
+        vertex = max(degree, key=degree.get)
+        cover.add(vertex)
+        remaining = {edge for edge in remaining if vertex not in edge}
+    return cover
@@ -0,0 +1,229 @@
+"""Induced subgraph search of a whole set of small patterns in one host graph.
+
+The adjacency of the host is packed in one 64-bit word per vertex. Pattern vertices are matched in a
+fixed order in which each vertex has as many neighbors among the previous ones as possible, and the
+candidates for a vertex are the host vertices of large enough degree that are adjacent to the images
+of its previous neighbors and not adjacent to the images of its previous non-neighbors, which is a
+few word operations. The host words and the masks of vertices by degree are computed once per call
+and shared by every pattern.
+
+Patterns are Sage graphs or graph6 strings. Graph6 strings are decoded straight into the preprocessed
+form of a pattern, without building a `Graph`, so large lists of patterns can be kept as strings.
+"""
+from libc.stdint cimport uint64_t
+
+from sage.graphs.graph import Graph
+
+
+MAX_ORDER = 64
+
+
+cdef extern from *:
+    int __builtin_ctzll(unsigned long long)
+
+
+cdef class _Pattern:
+    cdef int n
+    cdef int size
+    cdef uint64_t earlier_neighbors[64]  # bit j of position i is set if positions j < i are adjacent
+    cdef int degree[64]
+    cdef list vertices  # pattern vertex at each position
+    cdef list sorted_degrees
+
+    def __init__(self, list labels, list neighbors):
+        """`neighbors[v]` are the indices of the neighbors of the vertex `labels[v]`."""
+        degrees = [len(adjacent) for adjacent in neighbors]
+        order = _matching_order(neighbors)
+        self.n = len(labels)
+        self.size = sum(degrees) // 2
+        self.vertices = [labels[v] for v in order]
+        self.sorted_degrees = sorted(degrees, reverse=True)
+        position = [0] * self.n
+        for i, v in enumerate(order):
+            position[v] = i
+        for i, v in enumerate(order):
+            self.degree[i] = degrees[v]
+            self.earlier_neighbors[i] = 0
+            for neighbor in neighbors[v]:
+                if position[neighbor] < i:
+                    self.earlier_neighbors[i] |= (<uint64_t> 1) << position[neighbor]
+
+
+cdef class PatternSet:
+    """A list of patterns, preprocessed to be searched as induced subgraphs of many hosts.
+
+    Each pattern is preprocessed, or decoded, the first time a search reaches it with a host of large
+    enough order, so a search that stops at an early pattern does not pay for the rest.
+    """
+    cdef list _sources  # the patterns as given
+    cdef list _orders
+    cdef list _patterns  # the preprocessed pattern of each source, or None until a search reaches it
+
+    def __init__(self, patterns):
+        self._sources = list(patterns)
+        self._orders = [_order(pattern) for pattern in self._sources]
+        if any(n > MAX_ORDER for n in self._orders):
+            raise ValueError(f'Patterns can have at most {MAX_ORDER} vertices')
+        self._patterns = [None] * len(self._sources)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def find(self, host: Graph) -> tuple[int, dict] | None:
+        """Return the index of the first pattern that is an induced subgraph of `host`, with an embedding
+        of it as a dict from its vertices to the vertices of `host`, or None if there is none."""
+        cdef int host_n = host.order()
+        cdef uint64_t host_rows[64]
+        cdef uint64_t at_least_degree[65]  # vertices of degree at least d
+        cdef int mapping[64]
+        cdef int i, d
+        cdef _Pattern pattern
+        if host_n > MAX_ORDER:
+            return self._find_with_sage(host)
+
+        vertices = list(host)
+        index_of = {vertex: i for i, vertex in enumerate(vertices)}
+        host_degrees = [0] * host_n
+        for i in range(host_n):
+            host_rows[i] = 0
+            for neighbor in host.neighbor_iterator(vertices[i]):
+                host_rows[i] |= (<uint64_t> 1) << index_of[neighbor]
+            host_degrees[i] = host.degree(vertices[i])
+        for d in range(host_n + 1):
+            at_least_degree[d] = 0
+        for i in range(host_n):
+            for d in range(host_degrees[i] + 1):
+                at_least_degree[d] |= (<uint64_t> 1) << i
+        host_size = host.size()
+        sorted_host_degrees = sorted(host_degrees, reverse=True)
+
+        for index in range(len(self._sources)):
+            if self._orders[index] > host_n:
+                continue
+            pattern = self._patterns[index]
+            if pattern is None:
+                pattern = self._patterns[index] = _preprocess(self._sources[index])
+            if pattern.size > host_size:
+                continue
+            if any(d > host_degree for d, host_degree in zip(pattern.sorted_degrees, sorted_host_degrees)):
+                continue
+            if _search(pattern, host_rows, at_least_degree, mapping):
+                return index, {pattern.vertices[i]: vertices[mapping[i]] for i in range(pattern.n)}
+        return None
+
+    def _find_with_sage(self, host: Graph) -> tuple[int, dict] | None:
+        for index, pattern in enumerate(self._sources):
+            graph = _graph(pattern)
+            copy = next(host.subgraph_search_iterator(graph, induced=True, return_graphs=False), None)
+            if copy is not None:
+                return index, dict(zip(graph, copy))
+        return None
+
+
+def find_induced_subgraph(host: Graph, patterns) -> tuple[int, dict] | None:
+    """Return the index of the first of `patterns` that is an induced subgraph of `host`, with its embedding.
+
+    Build a `PatternSet` once to search the same patterns in many hosts.
+    """
+    return PatternSet(patterns).find(host)
+
+
+cdef bint _search(_Pattern pattern, uint64_t* host_rows, uint64_t* at_least_degree, int* mapping):
+    """Depth-first search for an embedding, with the candidates left for each position kept as a word."""
+    cdef uint64_t candidates[64]
+    cdef uint64_t used = 0
+    cdef int i = 0
+    cdef int n = pattern.n
+    cdef int vertex
+    if n == 0:
+        return True
+    candidates[0] = _candidates(pattern, 0, host_rows, at_least_degree, mapping, used)
+    while i >= 0:
+        if candidates[i] == 0:
+            i -= 1
+            if i >= 0:
+                used &= ~((<uint64_t> 1) << mapping[i])
+            continue
+        vertex = __builtin_ctzll(candidates[i])
+        candidates[i] &= candidates[i] - 1
+        mapping[i] = vertex
+        if i == n - 1:
+            return True
+        used |= (<uint64_t> 1) << vertex
+        i += 1
+        candidates[i] = _candidates(pattern, i, host_rows, at_least_degree, mapping, used)
+    return False
+
+
+cdef inline uint64_t _candidates(_Pattern pattern, int i, uint64_t* host_rows, uint64_t* at_least_degree, int* mapping, uint64_t used):
+    cdef uint64_t result = at_least_degree[pattern.degree[i]] & ~used
+    cdef uint64_t earlier_neighbors = pattern.earlier_neighbors[i]
+    cdef int j
+    for j in range(i):
+        if earlier_neighbors >> j & 1:
+            result &= host_rows[mapping[j]]
+        else:
+            result &= ~host_rows[mapping[j]]
+    return result
+
+
+def _matching_order(neighbors: list) -> list[int]:
+    """Order the vertices so that each one has as many neighbors among the previous ones as possible, then by degree."""
+    remaining = set(range(len(neighbors)))
+    order = []
+    earlier_neighbors = [0] * len(neighbors)
+    while remaining:
+        vertex = max(remaining, key=lambda vertex: (earlier_neighbors[vertex], len(neighbors[vertex])))
+        remaining.remove(vertex)
+        order.append(vertex)
+        for neighbor in neighbors[vertex]:
+            earlier_neighbors[neighbor] += 1
+    return order
+
+
+def _preprocess(pattern) -> _Pattern:
+    if isinstance(pattern, (bytes, str)):
+        neighbors = _graph6_neighbors(_as_bytes(pattern))
+        return _Pattern(list(range(len(neighbors))), neighbors)
+    labels = list(pattern)
+    index_of = {vertex: i for i, vertex in enumerate(labels)}
+    return _Pattern(labels, [[index_of[neighbor] for neighbor in pattern.neighbor_iterator(vertex)] for vertex in labels])
+
+
+def _graph(pattern) -> Graph:
+    if isinstance(pattern, (bytes, str)):
+        return Graph(_as_bytes(pattern).decode())
+    return pattern
+
+
+def _order(pattern) -> int:
+    if not isinstance(pattern, (bytes, str)):
+        return pattern.order()
+    graph6 = _as_bytes(pattern)
+    if graph6[0] != 126:
+        return graph6[0] - 63
+    digits = graph6[1:4] if graph6[1] != 126 else graph6[2:8]
+    n = 0
+    for digit in digits:
+        n = n << 6 | digit - 63
+    return n
+
+
+def _as_bytes(graph6) -> bytes:
+    return graph6.encode() if isinstance(graph6, str) else bytes(graph6)
+
+
+def _graph6_neighbors(graph6: bytes) -> list[list[int]]:
+    """Decode the graph6 string of a graph of order at most `MAX_ORDER` into lists of neighbors."""
+    n = _order(graph6)
+    data = graph6[1:] if n <= 62 else graph6[4:]
+    neighbors = [[] for _ in range(n)]
+    bit = 0
+    for j in range(1, n):
+        for i in range(j):
+            if (data[bit // 6] - 63) >> (5 - bit % 6) & 1:
+                neighbors[i].append(j)
+                neighbors[j].append(i)
+            bit += 1
+    return neighbors
+
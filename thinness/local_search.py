@@ -0,0 +1,289 @@
+"""Simulated annealing over vertex orders, for graphs too large for the exact engines.
+
+For a fixed order, two vertices u < v can share a part if every neighbor of u after v is a neighbor
+of v. That relation is transitive along the order, so the minimum number of parts for the order is
+the number of vertices minus a maximum matching of the pairs that can share a part, and the chains of
+the matching are the parts. `OrderState` keeps both up to date: swapping two consecutive vertices only
+changes the pairs that involve them, so a swap takes O(n) bitset operations, plus the augmenting path
+searches that repair the matching.
+"""
+import math
+import multiprocessing as mp
+import random
+import time
+from dataclasses import dataclass, field
+
+from sage.graphs.graph import Graph
+
+from .consistent_solution import ConsistentSolution
+
+
+DEFAULT_TIME_LIMIT = 10.0  # seconds
+DEFAULT_INITIAL_TEMPERATURE = 0.5
+DEFAULT_COOLING = 0.9995
+DEFAULT_MAX_MOVE_DISTANCE = 16
+MIN_TEMPERATURE = 1e-3
+
+
+class OrderState:
+    """An order of the vertices 0 to n - 1, with an optimal partition for it.
+
+    `neighbors[v]` is the bitmask of the neighbors of `v`.
+    """
+
+    def __init__(self, neighbors: list[int], order: list[int]):
+        n = len(neighbors)
+        self.neighbors = neighbors
+        self.order = list(order)
+        self.position = [0] * n
+        self.after = [0] * n
+        self.compatible_after = [0] * n
+        self.successor = [-1] * n
+        self.predecessor = [-1] * n
+        self.matching_size = 0
+        self.compatible_pairs = 0
+
+        suffix = 0
+        for i in range(n - 1, -1, -1):
+            vertex = self.order[i]
+            self.position[vertex] = i
+            self.after[vertex] = suffix
+            suffix |= 1 << vertex
+        for i, u in enumerate(self.order):
+            for v in self.order[i + 1:]:
+                if self._compatible(u, v):
+                    self.compatible_after[u] |= 1 << v
+                    self.compatible_pairs += 1
+        # A greedy matching first leaves few augmenting paths to search for.
+        for u in self.order:
+            candidates = self.compatible_after[u]
+            while candidates:
+                lowest = candidates & -candidates
+                candidates ^= lowest
+                v = lowest.bit_length() - 1
+                if self.predecessor[v] == -1:
+                    self.successor[u] = v
+                    self.predecessor[v] = u
+                    self.matching_size += 1
+                    break
+        self._repair_matching()
+
+    @property
+    def thinness(self) -> int:
+        return len(self.order) - self.matching_size
+
+    @property
+    def incompatible_pairs(self) -> int:
+        n = len(self.order)
+        return n * (n - 1) // 2 - self.compatible_pairs
+
+    def solution(self) -> ConsistentSolution:
+        """Return the chains of the matching as the parts, numbered by their first vertex in the order."""
+        part_of = [None] * len(self.order)
+        parts = 0
+        for vertex in self.order:
+            if self.predecessor[vertex] == -1:
+                part_of[vertex] = parts
+                parts += 1
+            else:
+                part_of[vertex] = part_of[self.predecessor[vertex]]
+        return ConsistentSolution.from_parts(list(self.order), [part_of[vertex] for vertex in self.order], parts)
+
+    def move(self, source: int, target: int):
+        """Move the vertex in position `source` to position `target` with swaps of consecutive vertices."""
+        step = 1 if target > source else -1
+        for i in range(source, target, step):
+            self.swap(min(i, i + step))
+
+    def swap(self, i: int):
+        """Swap the vertices in positions `i` and `i + 1`."""
+        a, b = self.order[i], self.order[i + 1]
+        self.order[i], self.order[i + 1] = b, a
+        self.position[a], self.position[b] = i + 1, i
+        self.after[a] &= ~(1 << b)
+        self.after[b] |= 1 << a
+
+        # The pair of a and b changes direction.
+        if self.compatible_after[a] >> b & 1:
+            self.compatible_after[a] &= ~(1 << b)
+            self.compatible_pairs -= 1
+            if self.successor[a] == b:
+                self._unmatch(a, b)
+        self._update_pair(b, a)
+        # The vertices before them see a new set of vertices after a and after b.
+        for u in self.order[:i]:
+            self._update_pair(u, a)
+            self._update_pair(u, b)
+        self._repair_matching()
+
+    def _compatible(self, u: int, v: int) -> bool:
+        """Whether `u`, before `v`, can share a part with `v`."""
+        return not self.neighbors[u] & self.after[v] & ~self.neighbors[v]
+
+    def _update_pair(self, u: int, v: int):
+        was_compatible = self.compatible_after[u] >> v & 1
+        if self._compatible(u, v):
+            if not was_compatible:
+                self.compatible_after[u] |= 1 << v
+                self.compatible_pairs += 1
+        elif was_compatible:
+            self.compatible_after[u] &= ~(1 << v)
+            self.compatible_pairs -= 1
+            if self.successor[u] == v:
+                self._unmatch(u, v)
+
+    def _unmatch(self, u: int, v: int):
+        self.successor[u] = -1
+        self.predecessor[v] = -1
+        self.matching_size -= 1
+
+    def _repair_matching(self):
+        while self._augment():
+            pass
+
+    def _augment(self) -> bool:
+        """Search for an augmenting path from all the vertices without successor at once and apply it."""
+        queue = [u for u in self.order if self.successor[u] == -1]
+        reached_from = {}
+        visited = 0
+        while queue:
+            u = queue.pop()
+            candidates = self.compatible_after[u] & ~visited
+            visited |= candidates
+            while candidates:
+                lowest = candidates & -candidates
+                candidates ^= lowest
+                v = lowest.bit_length() - 1
+                reached_from[v] = u
+                if self.predecessor[v] == -1:
+                    self._flip_path(v, reached_from)
+                    return True
+                queue.append(self.predecessor[v])
+        return False
+
+    def _flip_path(self, v: int, reached_from: dict):
+        self.matching_size += 1
+        while v != -1:
+            u = reached_from[v]
+            next_v = self.successor[u]
+            self.successor[u] = v
+            self.predecessor[v] = u
+            v = next_v
+
+
+@dataclass
+class LocalSearchResult:
+    solution: ConsistentSolution
+    seed: int | None
+    iterations: int
+    history: list[tuple[float, int]] = field(default_factory=list)  # (seconds, thinness) at every improvement
+
+
+def local_search(
+    graph: Graph,
+    seed: int = None,
+    time_limit: float = DEFAULT_TIME_LIMIT,
+    max_iterations: int = None,
+    initial_order: list = None,
+    initial_temperature: float = DEFAULT_INITIAL_TEMPERATURE,
+    cooling: float = DEFAULT_COOLING,
+    max_move_distance: int = DEFAULT_MAX_MOVE_DISTANCE,
+    progress=None
+) -> LocalSearchResult:
+    """Anneal the order of the vertices of `graph`, moving one vertex at a time.
+
+    The search starts from `initial_order`, or from a breadth-first order from a random vertex, and a
+    move takes O(n * max_move_distance) bitset operations. The energy of an order is its thinness plus
+    the fraction of incompatible pairs, which guides the search across orders of the same thinness.
+    `progress(seconds, solution)` is called at every improvement of the thinness.
+    """
+    vertices = list(graph)
+    n = len(vertices)
+    index = {vertex: i for i, vertex in enumerate(vertices)}
+    neighbors = [sum(1 << index[neighbor] for neighbor in graph.neighbor_iterator(vertex)) for vertex in vertices]
+    generator = random.Random(seed)
+    if initial_order is None:
+        order = breadth_first_order(neighbors, generator)
+    else:
+        order = [index[vertex] for vertex in initial_order]
+
+    start = time.perf_counter()
+    state = OrderState(neighbors, order)
+    energy = _energy(state)
+    best_thinness = state.thinness
+    best_order = list(state.order)
+    history = [(time.perf_counter() - start, best_thinness)]
+    if progress is not None:
+        progress(history[-1][0], _relabel(state.solution(), vertices))
+
+    temperature = initial_temperature
+    iterations = 0
+    while n > 1 and best_thinness > 1 and (max_iterations is None or iterations < max_iterations):
+        if time.perf_counter() - start > time_limit:
+            break
+        iterations += 1
+        source = generator.randrange(n)
+        target = min(n - 1, max(0, source + generator.randint(-max_move_distance, max_move_distance)))
+        if target == source:
+            continue
+        state.move(source, target)
+        new_energy = _energy(state)
+        if new_energy <= energy or generator.random() < math.exp((energy - new_energy) / temperature):
+            energy = new_energy
+            if state.thinness < best_thinness:
+                best_thinness = state.thinness
+                best_order = list(state.order)
+                history.append((time.perf_counter() - start, best_thinness))
+                if progress is not None:
+                    progress(history[-1][0], _relabel(state.solution(), vertices))
+        else:
+            state.move(target, source)
+        temperature = max(MIN_TEMPERATURE, temperature * cooling)
+
+    solution = _relabel(OrderState(neighbors, best_order).solution(), vertices)
+    return LocalSearchResult(solution, seed, iterations, history)
+
+
+def parallel_local_search(graph: Graph, seeds: list[int], processes: int = None, **options) -> list[LocalSearchResult]:
+    """Run `local_search` with each of `seeds` in its own process, and return the results best first.
+
+    Ties are broken by the time at which the best thinness was reached.
+    """
+    with mp.get_context('fork').Pool(processes or min(len(seeds), mp.cpu_count())) as pool:
+        results = pool.starmap(_local_search_with_options, [(graph, seed, options) for seed in seeds])
+    return sorted(results, key=lambda result: (result.solution.thinness, result.history[-1][0]))
+
+
+def _local_search_with_options(graph: Graph, seed: int, options: dict) -> LocalSearchResult:
+    return local_search(graph, seed, **options)
+
+
+def breadth_first_order(neighbors: list[int], generator: random.Random) -> list[int]:
+    """Return a breadth-first order of every component, from random vertices and with shuffled neighbors."""
+    vertices = list(range(len(neighbors)))
+    generator.shuffle(vertices)
+    visited = 0
+    order = []
+    for root in vertices:
+        if visited >> root & 1:
+            continue
+        visited |= 1 << root
+        start = len(order)
+        order.append(root)
+        while start < len(order):
+            vertex = order[start]
+            start += 1
+            new = [neighbor for neighbor in vertices if neighbors[vertex] >> neighbor & 1 and not visited >> neighbor & 1]
+            for neighbor in new:
+                visited |= 1 << neighbor
+            order.extend(new)
+    return order
+
+
+def _energy(state: OrderState) -> float:
+    n = len(state.order)
+    return state.thinness + state.incompatible_pairs / (n * n)
+
+
+def _relabel(solution: ConsistentSolution, vertices: list) -> ConsistentSolution:
+    return ConsistentSolution.from_parts([vertices[vertex] for vertex in solution.order], solution.parts, solution.thinness)
@@ -6,6 +6,11 @@ def non_betweenness(elements, prohibitions):
     Return `True` if there exists a permutation of `elements` that does not
     contain any of the ordered triples in `prohibitions`.
     """
+    return solve_non_betweenness(elements, prohibitions) is not None
+
+
+def non_betweenness_by_enumeration(elements, prohibitions):
+    """Decide `non_betweenness` by trying every permutation, for comparison with the solver."""
     for permutation in permutations(elements):
         for a, b, c in prohibitions:
             if (permutation.index(a) < permutation.index(b) < permutation.index(c) or
@@ -13,4 +18,36 @@ def non_betweenness(elements, prohibitions):
                 break
         else:
             return True
-    return False
\ No newline at end of file
+    return False
+
+
+def solve_non_betweenness(elements, prohibitions, timeout: float = None) -> list | None:
+    """Return a permutation of `elements` in which, for every triple (a, b, c) in `prohibitions`, b is
+    not between a and c, or None if there is none.
+
+    Every element gets an integer position and every triple asks for the position of b to be below
+    both or above both of the others. Positions may repeat: sorting by position, with ties broken
+    arbitrarily, keeps every strict inequality, so the solver does not need them to be distinct.
+    Raises TimeoutError if the solver gives up after `timeout` seconds.
+    """
+    from z3 import And, Int, Or, Solver, sat, unsat
+
+    elements = list(elements)
+    positions = {element: Int(f'position_{i}') for i, element in enumerate(elements)}
+    solver = Solver()
+    if timeout is not None:
+        solver.set('timeout', int(timeout * 1000))
+    for a, b, c in prohibitions:
+        if len({a, b, c}) == 3:
+            solver.add(Or(
+                And(positions[b] < positions[a], positions[b] < positions[c]),
+                And(positions[b] > positions[a], positions[b] > positions[c])
+            ))
+
+    result = solver.check()
+    if result == unsat:
+        return None
+    if result != sat:
+        raise TimeoutError(f'The solver gave up: {solver.reason_unknown()}')
+    model = solver.model()
+    return sorted(elements, key=lambda element: model.eval(positions[element], model_completion=True).as_long())
@@ -0,0 +1,171 @@
+import csv
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Iterator
+
+from sage.graphs.graph import Graph
+
+from .table import graph6_length
+
+
+COMPILED_DIR = 'data/compiled'
+_MAGIC = b'OBST'
+_VERSION = 1
+_HEADER = struct.Struct('<4sII')
+_ORDER_INDEX_ENTRY = struct.Struct('<IQQ')
+_SIZE = struct.Struct('<H')
+
+
+def compiled_filename(csv_filename: str, directory: str = COMPILED_DIR) -> str:
+    name, _ = os.path.splitext(os.path.basename(csv_filename))
+    return f'{directory}/{name}.obstructions'
+
+
+class Obstructions:
+    """Memory-mapped, compiled form of a CSV of minimal graphs, grouped by order.
+
+    Every record holds the graph6 string of a graph, its number of edges and its degree sequence in
+    non-increasing order, so graphs that cannot be induced subgraphs of a given graph are discarded
+    without building them. Graphs are only materialized when they are candidates.
+
+    The CSV file stays the source of truth: the compiled file is rebuilt whenever it is older than
+    the CSV file, and a missing CSV file has no graphs.
+    """
+
+    def __init__(self, csv_filename: str, directory: str = COMPILED_DIR):
+        self.filename = compiled_filename(csv_filename, directory)
+        if _is_stale(self.filename, csv_filename):
+            compile_obstructions(csv_filename, self.filename)
+
+        with open(self.filename, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, number_of_orders = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f'{self.filename} is not a compiled obstruction file of version {_VERSION}')
+        self._pattern_set = None
+        self._blocks = {}
+        for i in range(number_of_orders):
+            n, offset, count = _ORDER_INDEX_ENTRY.unpack_from(self._map, _HEADER.size + i * _ORDER_INDEX_ENTRY.size)
+            self._blocks[n] = (offset, count)
+
+    def orders(self) -> list[int]:
+        return sorted(self._blocks)
+
+    def count(self, n: int) -> int:
+        return self._blocks.get(n, (0, 0))[1]
+
+    def __len__(self):
+        return sum(count for _, count in self._blocks.values())
+
+    def graph6_strings(self, max_order: int = None) -> Iterator[bytes]:
+        for n in self.orders():
+            if max_order is not None and n > max_order:
+                break
+            for graph6, _, _ in self._records(n):
+                yield graph6
+
+    def graphs(self, max_order: int = None) -> Iterator[Graph]:
+        for graph6 in self.graph6_strings(max_order):
+            yield Graph(graph6.decode(), immutable=True)
+
+    def candidates(self, graph: Graph) -> Iterator[Graph]:
+        """Yield the graphs that pass the order, size and degree sequence filters for being induced subgraphs of `graph`."""
+        size = graph.size()
+        degrees = sorted(graph.degree(), reverse=True)
+        for n in self.orders():
+            if n > graph.order():
+                break
+            for graph6, obstruction_size, obstruction_degrees in self._records(n):
+                if obstruction_size > size:
+                    break
+                if all(d <= degree for d, degree in zip(obstruction_degrees, degrees)):
+                    yield Graph(graph6.decode(), immutable=True)
+
+    def has_induced_subgraph_of(self, graph: Graph) -> bool:
+        """Whether any of the graphs is an induced subgraph of `graph`.
+
+        The graph6 strings are given to a `PatternSet`, which decodes each one the first time a
+        search reaches it, without building a `Graph`, and applies the same filters as `candidates`.
+        """
+        if self._pattern_set is None:
+            from .induced_subgraph import PatternSet
+            self._pattern_set = PatternSet(self.graph6_strings())
+        return self._pattern_set.find(graph) is not None
+
+    def _records(self, n: int):
+        offset, count = self._blocks.get(n, (0, 0))
+        key_length = graph6_length(n)
+        record_length = _record_length(n)
+        for start in range(offset, offset + count * record_length, record_length):
+            size, = _SIZE.unpack_from(self._map, start + key_length)
+            degrees_start = start + key_length + _SIZE.size
+            yield self._map[start:start + key_length], size, self._map[degrees_start:degrees_start + n]
+
+    def close(self):
+        self._map.close()
+
+
+def compile_obstructions(csv_filename: str, filename: str):
+    """Write the compiled form of `csv_filename`, with the records of each order sorted by size."""
+    records_by_order = {}
+    if os.path.exists(csv_filename):
+        with open(csv_filename, newline='') as csvfile:
+            for row in csv.DictReader(csvfile):
+                graph6 = row['graph6'].encode()
+                n, degrees = _decode_degrees(graph6)
+                size = sum(degrees) // 2
+                records_by_order.setdefault(n, []).append(
+                    (size, graph6 + _SIZE.pack(size) + bytes(sorted(degrees, reverse=True)))
+                )
+
+    orders = sorted(records_by_order)
+    offset = _HEADER.size + len(orders) * _ORDER_INDEX_ENTRY.size
+    index = []
+    for n in orders:
+        index.append(_ORDER_INDEX_ENTRY.pack(n, offset, len(records_by_order[n])))
+        offset += len(records_by_order[n]) * _record_length(n)
+
+    directory = os.path.dirname(filename) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # A temporary file of its own, so processes compiling the same file at once do not clash.
+    descriptor, temporary_filename = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filename), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(orders)))
+            file.writelines(index)
+            for n in orders:
+                file.writelines(record for _, record in sorted(records_by_order[n]))
+        os.replace(temporary_filename, filename)
+    except BaseException:
+        os.unlink(temporary_filename)
+        raise
+
+
+def _record_length(n: int) -> int:
+    return graph6_length(n) + _SIZE.size + n
+
+
+def _is_stale(filename: str, csv_filename: str) -> bool:
+    if not os.path.exists(filename):
+        return True
+    return os.path.exists(csv_filename) and os.path.getmtime(csv_filename) > os.path.getmtime(filename)
+
+
+def _decode_degrees(graph6: bytes) -> tuple[int, list[int]]:
+    """Return the order and degrees of the graph with the given graph6 string, for orders up to 62."""
+    n = graph6[0] - 63
+    degrees = [0] * n
+    bits = (bit for byte in graph6[1:] for bit in _six_bits(byte - 63))
+    for j in range(1, n):
+        for i in range(j):
+            if next(bits):
+                degrees[i] += 1
+                degrees[j] += 1
+    return n, degrees
+
+
+def _six_bits(value: int):
+    for shift in range(5, -1, -1):
+        yield value >> shift & 1
@@ -0,0 +1,101 @@
+from sage.graphs.graph import Graph
+
+from .consistent_solution import ConsistentSolution
+
+
+def thinness_with_partition(graph: Graph, partition: list[set], certificate: bool = False) -> ConsistentSolution | int:
+    """Calculate the minimum number of parts of a refinement of `partition` that has a consistent order.
+
+    It is `len(partition)`, without counting empty parts, if and only if `partition` itself has a
+    consistent order. With `certificate`, return a solution whose parts are subsets of the parts of
+    `partition`, numbered in the order they are first used.
+
+    Deciding whether a partition has a consistent order is NP-complete, by a reduction from
+    non-betweenness, so this is an exact search over the prefixes of the order, which are pruned
+    when a prefix with the same parts was already a dead end.
+    """
+    vertices = list(graph)
+    index = {vertex: i for i, vertex in enumerate(vertices)}
+    part_of = [None] * len(vertices)
+    partition = [part for part in partition if part]
+    for part, part_vertices in enumerate(partition):
+        for vertex in part_vertices:
+            if vertex not in index or part_of[index[vertex]] is not None:
+                raise ValueError(f'The parts must be disjoint sets of vertices of the graph: {vertex!r}')
+            part_of[index[vertex]] = part
+    if None in part_of:
+        raise ValueError('The parts must cover all the vertices of the graph')
+
+    neighbors = [sum(1 << index[neighbor] for neighbor in graph.neighbor_iterator(vertex)) for vertex in vertices]
+    # Singletons always have a consistent order, so the search succeeds with at most one part per vertex.
+    for number_of_parts in range(len(partition), len(vertices) + 1):
+        search = _PartitionSearch(neighbors, part_of, number_of_parts)
+        found = search.search(0, ())
+        if found is not None:
+            break
+
+    if not certificate:
+        return number_of_parts
+    order, parts = found
+    return ConsistentSolution.from_parts([vertices[vertex] for vertex in order], parts)
+
+
+class _PartitionSearch:
+    """Depth-first search over prefixes of the order for a refinement with at most `number_of_parts` parts.
+
+    A part of the refinement is a pair of the part of the given partition it refines and the set of
+    vertices after the prefix adjacent to some vertex of it in the prefix, as a bitmask. A vertex can
+    be added to a part only if it is adjacent to all of them.
+    """
+
+    def __init__(self, neighbors: list[int], part_of: list[int], number_of_parts: int):
+        self.neighbors = neighbors
+        self.part_of = part_of
+        self.number_of_parts = number_of_parts
+        self.number_of_given_parts = len(set(part_of))
+        self.all_vertices = (1 << len(neighbors)) - 1
+        self.dead_ends = set()
+
+    def search(self, prefix: int, parts: tuple[tuple[int, int], ...]) -> tuple[list[int], list[int]] | None:
+        """Return the rest of the order, with the index in `parts` of the part of each vertex."""
+        if prefix == self.all_vertices:
+            return [], []
+        key = (prefix, tuple(sorted(parts)))
+        if key in self.dead_ends:
+            return None
+        started = {part for part, _ in parts}
+        # Every part of the partition that is not started yet needs a part of its own.
+        spare_parts = self.number_of_parts - len(parts) - (self.number_of_given_parts - len(started))
+
+        for vertex in range(len(self.neighbors)):
+            bit = 1 << vertex
+            if prefix & bit:
+                continue
+            new_prefix = prefix | bit
+            remaining = [(part, suffix_neighbors & ~bit) for part, suffix_neighbors in parts]
+            vertex_suffix_neighbors = self.neighbors[vertex] & ~new_prefix
+            has_free_part = False
+            for i, (part, suffix_neighbors) in enumerate(remaining):
+                if part != self.part_of[vertex] or suffix_neighbors & ~self.neighbors[vertex]:
+                    continue
+                has_free_part = has_free_part or suffix_neighbors == 0
+                new_parts = remaining.copy()
+                new_parts[i] = (part, suffix_neighbors | vertex_suffix_neighbors)
+                found = self._extend(vertex, i, new_prefix, new_parts)
+                if found is not None:
+                    return found
+            # A new part does as well as a part with no neighbors after the prefix.
+            if not has_free_part and (self.part_of[vertex] not in started or spare_parts > 0):
+                found = self._extend(vertex, len(parts), new_prefix, remaining + [(self.part_of[vertex], vertex_suffix_neighbors)])
+                if found is not None:
+                    return found
+
+        self.dead_ends.add(key)
+        return None
+
+    def _extend(self, vertex: int, part: int, prefix: int, parts: list[tuple[int, int]]) -> tuple[list[int], list[int]] | None:
+        found = self.search(prefix, tuple(parts))
+        if found is None:
+            return None
+        order, part_indices = found
+        return [vertex] + order, [part] + part_indices
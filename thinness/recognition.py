@@ -0,0 +1,228 @@
+"""Recognition of graph classes with a known thinness, answered without the exponential search.
+
+- Interval graphs are exactly the graphs with thinness 1; the order of the right endpoints of an
+  interval model is consistent with a single part.
+- Trees: the thinness of a tree is at least k + 1 if and only if some vertex x has at least three
+  neighbors with a component of thinness at least k hanging from them once N[x] is removed. A tree of thinness k has a path P such that
+  the components left when N[P] is removed have thinness at most k - 1; N[P] induces a caterpillar,
+  which takes the last part, and the solution of each component goes right after the vertex of N[P]
+  it hangs from.
+- Crown graphs, K_{n,n} minus a perfect matching, have thinness n - 1 for n >= 2.
+- Split crown graphs, see `split_crown`, have thinness ceil(n / 2).
+"""
+from sage.graphs.graph import Graph
+
+from .consistent_solution import ConsistentSolution
+
+
+def thinness_of_recognized_graph(graph: Graph, certificate: bool = False) -> ConsistentSolution | int | None:
+    """Return the thinness of the connected graph `graph`, or an optimal solution if `certificate`,
+    if it belongs to one of the recognized classes, and None otherwise."""
+    if graph.order() == 0:
+        return None
+    for recognizer in _RECOGNIZERS:
+        result = recognizer(graph, certificate)
+        if result is not None:
+            return result
+    return None
+
+
+def _interval(graph: Graph, certificate: bool) -> ConsistentSolution | int | None:
+    if not certificate:
+        return 1 if graph.is_interval() else None
+    is_interval, intervals = graph.is_interval(certificate=True)
+    if not is_interval:
+        return None
+    order = sorted(graph, key=lambda vertex: intervals[vertex][1])
+    return ConsistentSolution.from_parts(order, [0] * len(order))
+
+
+def _tree(graph: Graph, certificate: bool) -> ConsistentSolution | int | None:
+    if not graph.is_tree():
+        return None
+    tree = _Tree(graph)
+    if not certificate:
+        return tree.thinness(tree.vertices)
+    order, parts = tree.solution(tree.vertices)
+    return ConsistentSolution.from_parts(order, parts)
+
+
+class _Tree:
+    """Thinness of the subtrees of a tree, given by their sets of vertices.
+
+    A tree of thinness k + 1 has a vertex with three neighbors, each with a component of thinness k
+    hanging from it, so it has at least `_min_order(k + 1)` vertices; smaller subtrees are decided
+    without recursing. Subtrees of thinness 1 are the caterpillars.
+    """
+
+    def __init__(self, graph: Graph):
+        self.neighbors = {vertex: frozenset(graph.neighbor_iterator(vertex)) for vertex in graph}
+        self.vertices = frozenset(graph)
+        self._at_least = {}
+
+    def thinness(self, vertices: frozenset) -> int:
+        thinness = 0
+        while self.at_least(vertices, thinness + 1):
+            thinness += 1
+        return thinness
+
+    def at_least(self, vertices: frozenset, thinness: int) -> bool:
+        if thinness <= 1:
+            return thinness <= 0 or bool(vertices)
+        if len(vertices) < _min_order(thinness):
+            return False
+        if thinness == 2:
+            return not self._is_caterpillar(vertices)
+        key = (vertices, thinness)
+        result = self._at_least.get(key)
+        if result is None:
+            result = any(self._heavy_neighbors(vertex, vertices, thinness) >= 3 for vertex in vertices)
+            self._at_least[key] = result
+        return result
+
+    def _heavy_neighbors(self, vertex, vertices: frozenset, thinness: int) -> int:
+        """Count the neighbors of `vertex` with a component of thinness at least `thinness - 1` hanging from them."""
+        heavy = set()
+        for component in self._components(vertices - self._closed_neighborhood(vertex, vertices)):
+            if len(component) >= _min_order(thinness - 1):
+                neighbor = next(iter(self._neighborhood(component, vertices)))
+                if neighbor not in heavy and self.at_least(component, thinness - 1):
+                    heavy.add(neighbor)
+        return len(heavy)
+
+    def _is_caterpillar(self, vertices: frozenset) -> bool:
+        """A tree is a caterpillar if and only if its vertices that are not leaves induce a path."""
+        inner = {vertex for vertex in vertices if len(self.neighbors[vertex] & vertices) >= 2}
+        return all(len(self.neighbors[vertex] & inner) <= 2 for vertex in inner)
+
+    def solution(self, vertices: frozenset) -> tuple[list, list[int]]:
+        """Return an optimal order of `vertices` with the part of each vertex, using parts 0 to thinness - 1."""
+        thinness = self.thinness(vertices)
+        path = next(
+            path for path in (self._spine(vertices, start, thinness) for start in vertices)
+            if path is not None
+        )
+        legs = [self.neighbors[vertex] & vertices - set(path) for vertex in path]
+        caterpillar = set(path).union(*legs)
+        hanging = {}
+        for component in self._components(vertices - caterpillar):
+            leg = next(iter(self._neighborhood(component, vertices)))
+            hanging.setdefault(leg, []).append(component)
+
+        order = []
+        parts = []
+        for vertex, vertex_legs in zip(path, legs):
+            for leg in vertex_legs:
+                order.append(leg)
+                parts.append(thinness - 1)
+                for component in hanging.get(leg, []):
+                    component_order, component_parts = self.solution(component)
+                    order.extend(component_order)
+                    parts.extend(component_parts)
+            order.append(vertex)
+            parts.append(thinness - 1)
+        return order, parts
+
+    def _spine(self, vertices: frozenset, start, thinness: int) -> list | None:
+        """Extend a path from `start` towards the components of thinness `thinness` until none is left."""
+        path = [start]
+        while True:
+            closed_neighborhood = set(path).union(*(self._closed_neighborhood(vertex, vertices) for vertex in path))
+            heavy_legs = {
+                next(iter(self._neighborhood(component, vertices)))
+                for component in self._components(vertices - closed_neighborhood)
+                if self.at_least(component, thinness)
+            }
+            if not heavy_legs:
+                return path
+            ends = {path[0]: [], path[-1]: []}
+            for leg in heavy_legs:
+                end = next(iter(self.neighbors[leg] & set(path)))
+                if end not in ends:
+                    return None
+                ends[end].append(leg)
+            if len(path) == 1:
+                if len(ends[start]) > 2:
+                    return None
+                path = ends[start][:1] + path + ends[start][1:]
+            else:
+                if len(ends[path[0]]) > 1 or len(ends[path[-1]]) > 1:
+                    return None
+                path = ends[path[0]] + path + ends[path[-1]]
+
+    def _closed_neighborhood(self, vertex, vertices: frozenset) -> frozenset:
+        return self.neighbors[vertex] & vertices | {vertex}
+
+    def _neighborhood(self, component: frozenset, vertices: frozenset) -> set:
+        return set().union(*(self.neighbors[vertex] for vertex in component)) & vertices - component
+
+    def _components(self, vertices) -> list[frozenset]:
+        components = []
+        unvisited = set(vertices)
+        while unvisited:
+            stack = [unvisited.pop()]
+            component = set(stack)
+            while stack:
+                for neighbor in self.neighbors[stack.pop()] & unvisited:
+                    unvisited.remove(neighbor)
+                    component.add(neighbor)
+                    stack.append(neighbor)
+            components.append(frozenset(component))
+        return components
+
+
+def _min_order(thinness: int) -> int:
+    """The order of the smallest tree with the given thinness."""
+    order = 1
+    for _ in range(thinness - 1):
+        order = 3 * (order + 1) + 1
+    return order
+
+
+def _crown(graph: Graph, certificate: bool) -> ConsistentSolution | int | None:
+    if graph.order() % 2 != 0 or graph.order() < 4:
+        return None
+    n = graph.order() // 2
+    if not graph.is_regular(n - 1):
+        return None
+    is_bipartite, coloring = graph.is_bipartite(certificate=True)
+    if not is_bipartite:
+        return None
+    a = [vertex for vertex in graph if coloring[vertex] == 0]
+    if len(a) != n:
+        return None
+    if not certificate:
+        return n - 1
+
+    other_side = [vertex for vertex in graph if coloring[vertex] == 1]
+    b = [next(other for other in other_side if not graph.has_edge(vertex, other)) for vertex in a]
+    order = a[:n - 2] + [b[n - 2], a[n - 2]] + b[:n - 2] + [b[n - 1], a[n - 1]]
+    parts = list(range(n - 2)) + [n - 2, 0] + [n - 2] * (n - 2) + [0, 0]
+    return ConsistentSolution.from_parts(order, parts)
+
+
+def _split_crown(graph: Graph, certificate: bool) -> ConsistentSolution | int | None:
+    if graph.order() % 2 != 0 or graph.order() < 6:
+        return None
+    n = graph.order() // 2
+    clique = [vertex for vertex in graph if graph.degree(vertex) == 2 * n - 2]
+    independent = [vertex for vertex in graph if graph.degree(vertex) == n - 1]
+    if len(clique) != n or len(independent) != n or graph.size() != n * (n - 1) // 2 + n * (n - 1):
+        return None
+    if not graph.is_clique(clique) or not graph.is_independent_set(independent):
+        return None
+    # Every vertex of the clique has n - 1 neighbors in the independent set, and vice versa.
+    if not certificate:
+        return (n + 1) // 2
+
+    from .split_crown import thinness_of_split_crown_graph
+    non_neighbor = {vertex: next(other for other in independent if not graph.has_edge(vertex, other)) for vertex in clique}
+    label = {}
+    for i, vertex in enumerate(clique):
+        label[i] = vertex
+        label[i + n] = non_neighbor[vertex]
+    solution = thinness_of_split_crown_graph(n)
+    return ConsistentSolution.from_parts([label[vertex] for vertex in solution.order], solution.parts)
+
+
+_RECOGNIZERS = [_interval, _tree, _crown, _split_crown]
@@ -0,0 +1,112 @@
+"""Scheduling of many graphs of uneven cost on a process pool, without stragglers.
+
+Graphs are sent to the workers in chunks whose size follows the observed cost per graph, so that a
+chunk takes about `target_seconds`: large enough to keep the IPC overhead low, small enough that no
+chunk holds up the end of the run. The function that processes a chunk gives each graph a budget,
+and returns the graphs that exceed it apart from its result. Those graphs form the hard-instance
+queue, which is processed once every chunk is done, one graph per task so that all the workers
+share it, with a function that has no budget and can use more memory.
+"""
+import itertools
+import queue
+import time
+from collections.abc import Callable, Iterable, Iterator
+
+from .telemetry import PipelineMetrics
+
+
+DEFAULT_TARGET_SECONDS = 0.5
+DEFAULT_INITIAL_CHUNK_SIZE = 16
+DEFAULT_MAX_CHUNK_SIZE = 10_000
+CHUNKS_IN_FLIGHT_PER_PROCESS = 2
+
+
+class AdaptiveChunkSize:
+    """Chunk size for a target time per chunk, from a moving average of the time per graph."""
+
+    def __init__(
+        self,
+        target_seconds: float = DEFAULT_TARGET_SECONDS,
+        initial: int = DEFAULT_INITIAL_CHUNK_SIZE,
+        min_size: int = 1,
+        max_size: int = DEFAULT_MAX_CHUNK_SIZE,
+        smoothing: float = 0.2
+    ):
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.smoothing = smoothing
+        self.size = initial
+        self.seconds_per_item = None
+
+    def observe(self, items: int, seconds: float):
+        if items == 0:
+            return
+        observed = seconds / items
+        if self.seconds_per_item is None:
+            self.seconds_per_item = observed
+        else:
+            self.seconds_per_item += self.smoothing * (observed - self.seconds_per_item)
+        ideal = self.target_seconds / self.seconds_per_item if self.seconds_per_item > 0 else self.max_size
+        self.size = int(min(self.max_size, max(self.min_size, ideal)))
+
+
+def schedule(
+    pool,
+    processes: int,
+    items: Iterable,
+    process_chunk: Callable,
+    process_hard: Callable,
+    chunk_size: AdaptiveChunkSize = None,
+    metrics: PipelineMetrics = None
+) -> Iterator:
+    """Yield the results of processing `items` on `pool`, in the order they finish.
+
+    `process_chunk(chunk)` returns its result and the list of items that exceeded their budget,
+    and `process_hard(item)` returns a result of the same kind for one of those items. Both run in
+    the workers, so they must be picklable. At most a couple of chunks per process are in flight, so
+    `items` is consumed lazily. The chunks and hard items sent, and the time spent waiting for the
+    workers, are added to `metrics`.
+    """
+    chunk_size = chunk_size or AdaptiveChunkSize()
+    finished = queue.SimpleQueue()
+    iterator = iter(items)
+    in_flight = 0
+    exhausted = False
+    hard_items = []
+    while True:
+        while not exhausted and in_flight < processes * CHUNKS_IN_FLIGHT_PER_PROCESS:
+            chunk = list(itertools.islice(iterator, chunk_size.size))
+            if not chunk:
+                exhausted = True
+                break
+            pool.apply_async(_timed, (process_chunk, chunk), callback=finished.put, error_callback=finished.put)
+            in_flight += 1
+            if metrics is not None:
+                metrics.expect(1)
+        if in_flight == 0:
+            break
+        if metrics is None:
+            outcome = finished.get()
+        else:
+            with metrics.time('waiting'):
+                outcome = finished.get()
+        in_flight -= 1
+        if isinstance(outcome, BaseException):
+            raise outcome
+        items_processed, seconds, (result, exceeded) = outcome
+        chunk_size.observe(items_processed, seconds)
+        hard_items.extend(exceeded)
+        yield result
+
+    hard_results = pool.imap_unordered(process_hard, hard_items)
+    if metrics is not None:
+        metrics.expect(len(hard_items))
+        hard_results = metrics.timed(hard_results, 'waiting')
+    yield from hard_results
+
+
+def _timed(process_chunk: Callable, chunk: list) -> tuple[int, float, tuple]:
+    start = time.perf_counter()
+    result = process_chunk(chunk)
+    return len(chunk), time.perf_counter() - start, result
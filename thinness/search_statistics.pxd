@@ -0,0 +1,15 @@
+ctypedef struct search_statistics_t:
+    long nodes
+    long memo_hits
+    int memo_entries
+    long bound_prunes
+    long max_nodes  # the search gives up after this many nodes, 0 for no limit
+
+
+cdef inline record_search_statistics(statistics, search_statistics_t* search_statistics):
+    """Add the counters of one search to `statistics`, a `SearchStatistics` or None."""
+    if statistics is not None:
+        statistics.nodes += search_statistics.nodes
+        statistics.memo_hits += search_statistics.memo_hits
+        statistics.memo_entries += search_statistics.memo_entries
+        statistics.bound_prunes += search_statistics.bound_prunes
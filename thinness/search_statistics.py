@@ -0,0 +1,19 @@
+class SearchBudgetExceeded(Exception):
+    """The search of a component needed more nodes than its budget."""
+    pass
+
+
+class SearchStatistics:
+    """Counters of the branch and bound engines, added up over every component and call it is passed to."""
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self.memo_hits = 0
+        self.memo_entries = 0
+        self.bound_prunes = 0  # nodes cut by the lower bound of the thinness engine
+
+    def as_dict(self) -> dict:
+        return {'nodes': self.nodes, 'memo_hits': self.memo_hits, 'memo_entries': self.memo_entries, 'bound_prunes': self.bound_prunes}
+
+    def __str__(self):
+        return '{' + f'Nodes: {self.nodes}, Memo hits: {self.memo_hits}, Memo entries: {self.memo_entries}, Bound prunes: {self.bound_prunes}' + '}'
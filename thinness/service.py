@@ -0,0 +1,295 @@
+"""Long-running solver service, so other programs do not pay the Sage import for every graph.
+
+The service listens on a Unix socket and speaks JSON lines: each request is an object with an `id`,
+a `method` and its parameters, and gets back an object with the same `id` and either a `result` or
+an `error`. Responses to the requests of a connection may arrive in any order.
+
+    {"id": 1, "method": "thinness", "graph6": "Cl", "certificate": true, "deadline": 5}
+    {"id": 1, "result": {"value": 2, "order": [...], "parts": [...]}}
+    {"id": 2, "method": "stats"}
+
+The methods are `thinness`, `proper_thinness` and `lmimwidth`, which accept `lower_bound`,
+`upper_bound`, `certificate` and `deadline` (seconds from the arrival of the request), and `stats`.
+Requests are solved by a pool of warm worker processes, each of which takes batches of queued
+requests. Requests for isomorphic graphs with the same parameters that are waiting or running at
+the same time are solved once: the graph is solved with its canonical labels, and the certificate
+is translated back to the labels of each request.
+
+    python -m thinness.service --socket /tmp/thinness.sock --workers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from sage.graphs.graph import Graph
+
+from .helpers import CANONICAL_LABEL_ALGORITHM
+
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_BATCH_WINDOW = 0.005  # seconds
+DEFAULT_LATENCY_WINDOW = 1000  # requests
+METHODS = ('thinness', 'proper_thinness', 'lmimwidth')
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+@dataclass
+class _Job:
+    method: str
+    graph6: str
+    options: dict
+    deadline: float | None  # time.time() after which nobody waits for the job
+    future: asyncio.Future = field(repr=False)
+
+
+class SolverService:
+    """Queues requests, coalesces the duplicates and hands them to the workers in batches."""
+
+    def __init__(
+        self,
+        workers: int = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        latency_window: int = DEFAULT_LATENCY_WINDOW
+    ):
+        self.workers = workers or os.cpu_count()
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.requests = 0
+        self.coalesced = 0
+        self.running = 0
+        self._latencies = deque(maxlen=latency_window)
+        self._executor = None
+        self._queue = None
+        self._jobs = {}  # (method, canonical graph6, options) to the job waiting or running for them
+        self._dispatchers = []
+
+    async def start(self):
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_warm_up)
+        self._queue = asyncio.Queue()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the service without waiting for the running searches, whose workers are terminated."""
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        # A running search cannot be interrupted, and could take hours.
+        processes = list(self._executor._processes.values())
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+    async def solve(
+        self,
+        method: str,
+        graph6: str,
+        lower_bound: int = None,
+        upper_bound: int = None,
+        certificate: bool = False,
+        deadline: float = None
+    ) -> int | dict:
+        """Return the value of `method` for the graph, or a dict with the value and the certificate.
+
+        Raises DeadlineExceeded if the result is not ready within `deadline` seconds. The job keeps
+        running for the other requests waiting for it, since a running search cannot be interrupted.
+        """
+        if method not in METHODS:
+            raise ValueError(f'Unknown method: {method!r}')
+        start = time.perf_counter()
+        self.requests += 1
+        graph = Graph(graph6)
+        canonical_graph, relabelling = graph.canonical_label(certificate=True, algorithm=CANONICAL_LABEL_ALGORITHM)
+        options = {'lower_bound': lower_bound, 'upper_bound': upper_bound, 'certificate': bool(certificate)}
+        options = {key: value for key, value in options.items() if value is not None}
+        key = (method, canonical_graph.graph6_string(), tuple(sorted(options.items())))
+        absolute_deadline = None if deadline is None else time.time() + deadline
+
+        job = self._jobs.get(key)
+        if job is None:
+            job = _Job(method, key[1], options, absolute_deadline, asyncio.get_running_loop().create_future())
+            self._jobs[key] = job
+            job.future.add_done_callback(lambda _: self._forget(key, job))
+            self._queue.put_nowait(job)
+        else:
+            self.coalesced += 1
+            if job.deadline is not None:
+                job.deadline = None if absolute_deadline is None else max(job.deadline, absolute_deadline)
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job.future), deadline)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f'No result within {deadline} seconds') from None
+        self._latencies.append(time.perf_counter() - start)
+        if not certificate:
+            return result
+        labels = [None] * len(relabelling)
+        for vertex, canonical_vertex in relabelling.items():
+            labels[canonical_vertex] = vertex
+        return {**result, 'order': [labels[vertex] for vertex in result['order']]}
+
+    def _forget(self, key: tuple, job: _Job):
+        if self._jobs.get(key) is job:
+            del self._jobs[key]
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            'queued': self._queue.qsize(),
+            'running': self.running,
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'latency': {
+                f'p{percentile}': _percentile(latencies, percentile) for percentile in (50, 90, 99)
+            },
+        }
+
+    async def _dispatch(self):
+        """Feed one worker: take a batch of queued jobs, wait for the worker to solve it and repeat."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Give the requests arriving together a chance to join the batch.
+            await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            self.running += len(batch)
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, _solve_batch, [(job.method, job.graph6, job.options, job.deadline) for job in batch]
+                )
+            except Exception as error:
+                results = [(False, f'{type(error).__name__}: {error}')] * len(batch)
+            finally:
+                self.running -= len(batch)
+            for job, (succeeded, result) in zip(batch, results):
+                if job.future.done():
+                    continue
+                if succeeded:
+                    job.future.set_result(result)
+                else:
+                    job.future.set_exception(
+                        DeadlineExceeded('The deadline passed before a worker was free') if result is None else RuntimeError(result)
+                    )
+
+    async def serve(self, socket_path: str):
+        server = await asyncio.start_unix_server(self._handle_connection, path=socket_path)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks)
+        finally:
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, lock: asyncio.Lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.pop('id', None)
+            method = request.pop('method')
+            if method == 'stats':
+                response = {'result': self.stats()}
+            else:
+                response = {'result': await self.solve(method, **request)}
+        except DeadlineExceeded as error:
+            response = {'error': str(error), 'deadline_exceeded': True}
+        except Exception as error:
+            response = {'error': f'{type(error).__name__}: {error}'}
+        async with lock:
+            writer.write(json.dumps({'id': request_id, **response}).encode() + b'\n')
+            await writer.drain()
+
+
+def call(socket_path: str, method: str, **parameters) -> int | dict:
+    """Send a single request to the service listening on `socket_path` and return its result.
+
+    Raises RuntimeError with the message of the service if the request failed.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        connection.sendall(json.dumps({'id': 0, 'method': method, **parameters}).encode() + b'\n')
+        with connection.makefile('rb') as responses:
+            response = json.loads(responses.readline())
+    if 'error' in response:
+        raise RuntimeError(response['error'])
+    return response['result']
+
+
+def _warm_up():
+    """Load the engines when the worker starts, rather than on its first request."""
+    from lmimw.branch_and_bound import lmimwidth
+    from proper_thinness.branch_and_bound import calculate_proper_thinness
+    from .branch_and_bound import calculate_thinness
+
+
+def _solve_batch(batch: list[tuple[str, str, dict, float | None]]) -> list[tuple[bool, int | dict | str | None]]:
+    """Solve each job, and return whether it succeeded with its result or error message, None for a missed deadline."""
+    results = []
+    for method, graph6, options, deadline in batch:
+        if deadline is not None and time.time() > deadline:
+            results.append((False, None))
+            continue
+        try:
+            results.append((True, _solve(method, Graph(graph6), **options)))
+        except Exception as error:
+            results.append((False, f'{type(error).__name__}: {error}'))
+    return results
+
+
+def _solve(method: str, graph: Graph, certificate: bool = False, **bounds) -> int | dict:
+    if method == 'lmimwidth':
+        from lmimw.branch_and_bound import lmimwidth
+        result = lmimwidth(graph, certificate=certificate, **bounds)
+        return {'value': result[0], 'order': result[1]} if certificate else result
+
+    if method == 'thinness':
+        from .branch_and_bound import calculate_thinness as solver
+    else:
+        from proper_thinness.branch_and_bound import calculate_proper_thinness as solver
+    result = solver(graph, certificate=certificate, **bounds)
+    if not certificate:
+        return result
+    return {'value': result.thinness, 'order': list(result.order), 'parts': list(result.parts)}
+
+
+def _percentile(values: list[float], percentile: int) -> float | None:
+    """Nearest-rank percentile of the sorted `values`."""
+    if not values:
+        return None
+    return values[max(0, -(-len(values) * percentile // 100) - 1)]
+
+
+async def _main(socket_path: str, workers: int):
+    service = SolverService(workers)
+    await service.start()
+    try:
+        await service.serve(socket_path)
+    finally:
+        await service.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--socket', required=True, help='path of the Unix socket to listen on')
+    parser.add_argument('--workers', type=int, help='worker processes, one per CPU by default')
+    args = parser.parse_args()
+    asyncio.run(_main(args.socket, args.workers))
@@ -0,0 +1,222 @@
+"""Table of the thinness and proper thinness of every connected graph of order at most 9, with certificates.
+
+The engines look small components up here before anything else. A graph is looked up by the
+adjacency of its canonical form, packed in an integer with its order, and a minimal perfect hash
+over those keys gives the slot of its record in `small_graphs.table`, which is memory-mapped on
+the first lookup. The table is built by
+
+    python -m thinness.small_graphs --processes 8
+
+which runs the exact engines on every graph from geng, so it is reproducible from scratch.
+
+Layout of the file, little-endian:
+
+- Header: `MAGIC`, the number of slots and the number of buckets of the hash.
+- The displacement of each bucket, as a 32-bit integer.
+- A record per slot: the 5-byte key, a byte with the thinness and the proper thinness in its
+  high and low nibbles, and the solutions of both, each as a byte per vertex in order with the
+  vertex in the high nibble and its part in the low one. The vertices are those of the canonical
+  form, and the slots left empty have key 0.
+"""
+import argparse
+import mmap
+import os
+import struct
+
+from .consistent_solution import ConsistentSolution
+from .helpers import CANONICAL_LABEL_ALGORITHM
+
+
+MAX_ORDER = 9
+TABLE_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'small_graphs.table')
+MAGIC = b'THINSG01'
+_HEADER = struct.Struct('<8sII')
+_KEY_LENGTH = 5
+_RECORD_LENGTH = _KEY_LENGTH + 1 + 2 * MAX_ORDER
+_ORDER_SHIFT = MAX_ORDER * (MAX_ORDER - 1) // 2
+_MASK = (1 << 64) - 1
+_BUCKET_SIZE = 4  # keys per bucket of the hash, on average
+_EXTRA_SLOTS = 0.01  # fraction of empty slots, which makes the last buckets quick to place
+
+# The memory-mapped table, None until the first lookup, and False if there is no table.
+_table = None
+
+
+def lookup_thinness(graph, certificate: bool = False, proper: bool = False) -> ConsistentSolution | int | None:
+    """Return the thinness of the connected `graph`, or its proper thinness if `proper`, or None if it is not in the table.
+
+    With `certificate`, return an optimal consistent solution instead, strongly consistent if `proper`.
+    """
+    found = _find(graph, certificate)
+    return None if found is None else _decode(*found, certificate, proper)
+
+
+def lookup_both(graph, certificate: bool = False) -> tuple[int, int] | tuple[ConsistentSolution, ConsistentSolution] | None:
+    """Return the results of `lookup_thinness` for the thinness and the proper thinness, with a single canonical labelling."""
+    found = _find(graph, certificate)
+    if found is None:
+        return None
+    return _decode(*found, certificate, proper=False), _decode(*found, certificate, proper=True)
+
+
+def _decode(table: '_Table', offset: int, labels: list | None, certificate: bool, proper: bool) -> ConsistentSolution | int:
+    values = table.records[offset + _KEY_LENGTH]
+    value = values & 15 if proper else values >> 4
+    if not certificate:
+        return value
+    start = offset + _KEY_LENGTH + 1 + (MAX_ORDER if proper else 0)
+    encoded = table.records[start:start + len(labels)]
+    return ConsistentSolution.from_parts([labels[byte >> 4] for byte in encoded], [byte & 15 for byte in encoded], value)
+
+
+class _Table:
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slots, self.buckets = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f'{filename} is not a table of small graphs')
+        view = memoryview(self._map)
+        displacements_end = _HEADER.size + 4 * self.buckets
+        self.displacements = view[_HEADER.size:displacements_end].cast('I')
+        self.records = view[displacements_end:]
+
+    def offset(self, key: int) -> int | None:
+        slot = _slot(key, self.displacements[_hash(key, 0) % self.buckets], self.slots)
+        offset = slot * _RECORD_LENGTH
+        if int.from_bytes(self.records[offset:offset + _KEY_LENGTH], 'little') != key:
+            return None
+        return offset
+
+
+def _find(graph, certificate: bool) -> tuple[_Table, int, list | None] | None:
+    global _table
+    n = graph.order()
+    if n == 0 or n > MAX_ORDER:
+        return None
+    if _table is None:
+        _table = _Table(TABLE_FILENAME) if os.path.exists(TABLE_FILENAME) else False
+    if _table is False:
+        return None
+    if certificate:
+        canonical, relabelling = graph.canonical_label(certificate=True, algorithm=CANONICAL_LABEL_ALGORITHM)
+        labels = [None] * n
+        for vertex, canonical_vertex in relabelling.items():
+            labels[canonical_vertex] = vertex
+    else:
+        canonical, labels = graph.canonical_label(algorithm=CANONICAL_LABEL_ALGORITHM), None
+    offset = _table.offset(_key(n, canonical.edges(labels=False, sort=False)))
+    return None if offset is None else (_table, offset, labels)
+
+
+def _key(n: int, edges) -> int:
+    """Pack the order and the edges of a graph on the vertices 0 to n - 1, as the upper triangle of its adjacency matrix."""
+    key = n << _ORDER_SHIFT
+    for u, v in edges:
+        if u > v:
+            u, v = v, u
+        key |= 1 << (v * (v - 1) // 2 + u)
+    return key
+
+
+def _hash(key: int, seed: int) -> int:
+    """splitmix64 of the key, mixed with the seed."""
+    z = (key + (seed + 1) * 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _slot(key: int, displacement: int, slots: int) -> int:
+    return _hash(key, displacement + 1) % slots
+
+
+def _perfect_hash(keys: list[int]) -> tuple[int, list[int], list[int | None]]:
+    """Hash and displace: place the buckets largest first, each with the first displacement that sends its keys to free slots.
+
+    Return the number of slots, the displacement of each bucket and the key in each slot.
+    """
+    slots = len(keys) + int(len(keys) * _EXTRA_SLOTS) + 1
+    buckets = max(1, len(keys) // _BUCKET_SIZE)
+    keys_of_bucket = [[] for _ in range(buckets)]
+    for key in keys:
+        keys_of_bucket[_hash(key, 0) % buckets].append(key)
+    displacements = [0] * buckets
+    key_of_slot = [None] * slots
+    for bucket in sorted(range(buckets), key=lambda bucket: (-len(keys_of_bucket[bucket]), bucket)):
+        bucket_keys = keys_of_bucket[bucket]
+        if not bucket_keys:
+            continue
+        displacement = 0
+        while True:
+            candidate_slots = {_slot(key, displacement, slots) for key in bucket_keys}
+            if len(candidate_slots) == len(bucket_keys) and all(key_of_slot[slot] is None for slot in candidate_slots):
+                break
+            displacement += 1
+        displacements[bucket] = displacement
+        for key in bucket_keys:
+            key_of_slot[_slot(key, displacement, slots)] = key
+    return slots, displacements, key_of_slot
+
+
+def _encode_solution(solution: ConsistentSolution) -> bytes:
+    return bytes(vertex << 4 | part for vertex, part in zip(solution.order, solution.parts)).ljust(MAX_ORDER, b'\0')
+
+
+def _solve_shard(shard: tuple[int, int, int]) -> list[tuple[int, bytes]]:
+    """Return the key and the record of every graph of the shard, solved on its canonical form."""
+    from sage.graphs.graph import Graph
+    from proper_thinness.branch_and_bound import calculate_proper_thinness
+    from proper_thinness.verify import verify_solution as verify_proper_solution
+    from .branch_and_bound import calculate_thinness
+    from .helpers import connected_graph6_shard
+    from .verify import verify_solution
+
+    n, res, mod = shard
+    graph6_strings = [b'@'] if n == 1 else connected_graph6_shard(n, res, mod)
+    records = []
+    for graph6 in graph6_strings:
+        canonical = Graph(graph6.decode()).canonical_label(algorithm=CANONICAL_LABEL_ALGORITHM)
+        solution = calculate_thinness(canonical, certificate=True, recognize_classes=False, use_small_graphs_table=False)
+        proper_solution = calculate_proper_thinness(canonical, certificate=True, use_small_graphs_table=False)
+        if not verify_solution(canonical, solution) or not verify_proper_solution(canonical, proper_solution):
+            raise AssertionError(f'Wrong solution for {graph6.decode()}')
+        key = _key(n, canonical.edges(labels=False, sort=False))
+        records.append((key, bytes((solution.thinness << 4 | proper_solution.thinness,))
+                        + _encode_solution(solution) + _encode_solution(proper_solution)))
+    return records
+
+
+def build_table(filename: str = TABLE_FILENAME, processes: int = None, shards_per_order: int = 64, progress=None):
+    """Solve every connected graph of order at most `MAX_ORDER` and write the table to `filename`.
+
+    `progress(n)` is called when the graphs of order `n` are done.
+    """
+    import multiprocessing as mp
+
+    record_of_key = {}
+    with mp.Pool(processes) as pool:
+        for n in range(1, MAX_ORDER + 1):
+            shards = [(n, res, shards_per_order) for res in range(shards_per_order)] if n > 1 else [(1, 0, 1)]
+            for records in pool.imap_unordered(_solve_shard, shards):
+                record_of_key.update(records)
+            if progress is not None:
+                progress(n)
+
+    slots, displacements, key_of_slot = _perfect_hash(sorted(record_of_key))
+    empty_record = bytes(_RECORD_LENGTH)
+    temporary_filename = f'{filename}.tmp'
+    with open(temporary_filename, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, slots, len(displacements)))
+        file.write(struct.pack(f'<{len(displacements)}I', *displacements))
+        for key in key_of_slot:
+            file.write(empty_record if key is None else key.to_bytes(_KEY_LENGTH, 'little') + record_of_key[key])
+    os.replace(temporary_filename, filename)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the table of the thinness of the small graphs.')
+    parser.add_argument('--processes', type=int, help='worker processes, one per CPU by default')
+    parser.add_argument('--output', default=TABLE_FILENAME, help='file to write the table to')
+    args = parser.parse_args()
+    build_table(args.output, args.processes, progress=lambda n: print(f'Order {n} done.', flush=True))
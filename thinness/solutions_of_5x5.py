@@ -1,6 +1,6 @@
 from sage.graphs.graph_generators import graphs
 
-from thinness.branch_and_bound_all_solutions import calculate_thinness_of_connected_graph
+from thinness.branch_and_bound_all_solutions import optimal_solutions, to_consistent_solution
 from thinness.consistent_solution import ConsistentSolution
 from thinness.itertools_utils import batched
 
@@ -8,7 +8,7 @@ from thinness.itertools_utils import batched
 def main():
     graph = graphs.Grid2dGraph(5, 5)
     graph.relabel()
-    solutions = calculate_thinness_of_connected_graph(graph, upper_bound=3)
+    solutions = (to_consistent_solution(order, part_of) for order, part_of in optimal_solutions(graph, thinness=3))
     for index, batch in enumerate(batched(solutions, 1000)):
         latex = to_latex(batch)
         with open(f'/tmp/grids_{index}.tex', 'w') as file:
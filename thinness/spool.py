@@ -0,0 +1,351 @@
+"""Coordinator and workers sharing a directory, to split the shards of a run across several machines.
+
+The coordinator publishes a job, an order `n` split into `mod` shards, and workers claim its shards
+by creating lease files, which they renew while they work. Results are written to the spool with
+an atomic rename and merged by the coordinator, which records every merged shard before removing
+its files, so each shard is merged exactly once even if two workers end up processing it. A lease
+that is not renewed within `lease_timeout` seconds of the coordinator's clock is removed, and the
+shard goes back to the queue, so the machines' clocks need not agree.
+
+The files a job needs, such as the tables of smaller order, are copied into the spool with it, so
+the workers only need to share the spool. A worker whose `process` raises records the failure and
+moves on, and once a shard has failed `max_attempts` times the workers skip it and the coordinator
+raises `ShardFailed`.
+
+Layout of the spool directory:
+
+- `job.json`: the current job, with the shards that are still pending.
+- `files/`: the files published with the jobs, under their own names.
+- `leases/{n}-{res}-{mod}.lease`: the worker processing a shard and the number of its heartbeats.
+- `results/{n}-{res}-{mod}.result`: the pickled result of a shard, waiting to be merged.
+- `merged/{n}-{res}-{mod}`: marks the shards already merged, so workers skip them.
+- `failures/{n}-{res}-{mod}.{attempt}.failure`: the traceback of each failed attempt at a shard.
+- `stop`: asks the workers to exit once the current job is done.
+"""
+import json
+import os
+import pickle
+import shutil
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections.abc import Callable
+
+
+DEFAULT_LEASE_TIMEOUT = 120.0  # seconds
+DEFAULT_POLL_INTERVAL = 1.0  # seconds
+DEFAULT_MAX_ATTEMPTS = 3
+
+JOB_FILENAME = 'job.json'
+STOP_FILENAME = 'stop'
+FILES_DIRECTORY = 'files'
+_DIRECTORIES = ('leases', 'results', 'merged', 'failures', FILES_DIRECTORY)
+
+
+def shard_name(n: int, res: int, mod: int) -> str:
+    return f'{n}-{res}-{mod}'
+
+
+def files_directory(directory: str) -> str:
+    """Return the directory of the spool where the files published with the jobs are."""
+    return os.path.join(directory, FILES_DIRECTORY)
+
+
+class ShardFailed(Exception):
+    pass
+
+
+class Coordinator:
+    """Hands out the shards `pending` of order `n` to the workers of the spool and merges their results.
+
+    The `files` are published in the spool before the job, skipping those already there with the
+    same size and modification time.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        n: int,
+        mod: int,
+        pending: list[int],
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        files: list[str] = (),
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ):
+        self.directory = directory
+        self.n = n
+        self.mod = mod
+        self.pending = sorted(pending)
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        # Lease contents with the time, on our clock, when they were first seen.
+        self._leases_seen = {}
+        for subdirectory in _DIRECTORIES:
+            os.makedirs(os.path.join(directory, subdirectory), exist_ok=True)
+        _remove_if_exists(os.path.join(directory, STOP_FILENAME))
+        # A marker of a previous coordinator may have outlived a merge that was never recorded.
+        for res in self.pending:
+            _remove_if_exists(self._path('merged', res))
+        # The failures of a previous run are not held against the shards.
+        pending_names = {shard_name(n, res, mod) for res in self.pending}
+        for filename in os.listdir(os.path.join(directory, 'failures')):
+            if filename.split('.')[0] in pending_names:
+                _remove_if_exists(os.path.join(directory, 'failures', filename))
+        for filename in files:
+            _publish(filename, files_directory(directory))
+        _write_atomically(os.path.join(directory, JOB_FILENAME), json.dumps({
+            'n': n, 'mod': mod, 'pending': self.pending, 'max_attempts': max_attempts, 'id': uuid.uuid4().hex
+        }).encode())
+
+    def run(self, merge: Callable, progress: Callable = None):
+        """Wait for every pending shard and call `merge(result)` once for each of them, in the order they finish.
+
+        `progress()` is called after every merge. Raises ShardFailed, with the traceback of its last
+        attempt, once a shard has failed `max_attempts` times.
+        """
+        remaining = set(self.pending)
+        while remaining:
+            merged_any = False
+            for res in list(remaining):
+                if self._merge_result(res, merge):
+                    remaining.discard(res)
+                    merged_any = True
+                    if progress is not None:
+                        progress()
+            self._check_failures(remaining)
+            self._reclaim_expired_leases(remaining)
+            if not merged_any:
+                time.sleep(self.poll_interval)
+        self._discard_late_results()
+
+    def _merge_result(self, res: int, merge: Callable) -> bool:
+        filename = self._path('results', res)
+        try:
+            with open(filename, 'rb') as file:
+                result = pickle.load(file)
+        except FileNotFoundError:
+            return False
+        merge(result)
+        open(self._path('merged', res), 'w').close()
+        _remove_if_exists(filename)
+        _remove_if_exists(self._path('leases', res))
+        self._leases_seen.pop(res, None)
+        return True
+
+    def _check_failures(self, remaining: set[int]):
+        failures = _failures(self.directory)
+        for res in remaining:
+            name = shard_name(self.n, res, self.mod)
+            if len(failures.get(name, ())) >= self.max_attempts:
+                last = max(failures[name], key=os.path.getmtime)
+                raise ShardFailed(f'Shard {name} failed {len(failures[name])} times, last with:\n{_read_if_exists(last)}')
+
+    def _reclaim_expired_leases(self, remaining: set[int]):
+        now = time.monotonic()
+        for res in remaining:
+            content = _read_if_exists(self._path('leases', res))
+            if content is None:
+                self._leases_seen.pop(res, None)
+                continue
+            seen_content, seen_at = self._leases_seen.get(res, (None, None))
+            if content != seen_content:
+                self._leases_seen[res] = (content, now)
+            elif now - seen_at > self.lease_timeout:
+                _remove_if_exists(self._path('leases', res))
+                del self._leases_seen[res]
+
+    def _discard_late_results(self):
+        """Remove the results of shards that more than one worker processed."""
+        prefix = f'{self.n}-'
+        suffix = f'-{self.mod}.result'
+        results_directory = os.path.join(self.directory, 'results')
+        for filename in os.listdir(results_directory):
+            if filename.startswith(prefix) and filename.endswith(suffix):
+                _remove_if_exists(os.path.join(results_directory, filename))
+
+    def _path(self, subdirectory: str, res: int) -> str:
+        return _spool_path(self.directory, subdirectory, shard_name(self.n, res, self.mod))
+
+
+def stop_workers(directory: str):
+    """Ask the workers of the spool to exit once they run out of shards."""
+    open(os.path.join(directory, STOP_FILENAME), 'w').close()
+
+
+def run_worker(
+    directory: str,
+    process: Callable,
+    initializer: Callable = None,
+    worker_id: str = None,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> int:
+    """Process shards of the jobs in the spool until it is asked to stop, and return how many were processed.
+
+    `process((n, res, mod))` returns the result of a shard, which must be picklable, and
+    `initializer(n)` is called whenever a new job starts. Heartbeats are sent from a thread every
+    third of `lease_timeout`, so `process` must not hold the GIL for that long. An exception in
+    `process` is recorded in the spool and releases the shard, which is tried again until it has
+    failed as many times as the job allows.
+    """
+    worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+    processed = 0
+    current_job = None
+    while True:
+        job = _read_job(directory)
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        if job['id'] != current_job:
+            current_job = job['id']
+            if initializer is not None:
+                initializer(job['n'])
+
+        res = _claim_shard(directory, job, worker_id)
+        if res is None:
+            if os.path.exists(os.path.join(directory, STOP_FILENAME)) and _job_is_done(directory, job):
+                return processed
+            time.sleep(poll_interval)
+            continue
+
+        name = shard_name(job['n'], res, job['mod'])
+        try:
+            with _Heartbeat(_spool_path(directory, 'leases', name), worker_id, lease_timeout / 3):
+                result = process((job['n'], res, job['mod']))
+        except Exception:
+            _write_atomically(
+                _spool_path(directory, 'failures', f'{name}.{uuid.uuid4().hex}'),
+                f'{worker_id}\n{traceback.format_exc()}'.encode(),
+                f'{worker_id}.tmp'
+            )
+            _remove_if_exists(_spool_path(directory, 'leases', name))
+            continue
+        processed += 1
+        if os.path.exists(_spool_path(directory, 'merged', name)):
+            continue
+        _write_atomically(_spool_path(directory, 'results', name), pickle.dumps(result), f'{worker_id}.tmp')
+
+
+def _claim_shard(directory: str, job: dict, worker_id: str) -> int | None:
+    failures = _failures(directory)
+    for res in job['pending']:
+        name = shard_name(job['n'], res, job['mod'])
+        if os.path.exists(_spool_path(directory, 'merged', name)) or os.path.exists(_spool_path(directory, 'results', name)):
+            continue
+        if _has_failed(job, name, failures):
+            continue
+        try:
+            descriptor = os.open(_spool_path(directory, 'leases', name), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            continue
+        with os.fdopen(descriptor, 'w') as file:
+            file.write(f'{worker_id} 0')
+        return res
+    return None
+
+
+def _job_is_done(directory: str, job: dict) -> bool:
+    """Whether every shard of the job is merged or has failed too many times to be tried again."""
+    failures = _failures(directory)
+    return all(
+        os.path.exists(_spool_path(directory, 'merged', name)) or _has_failed(job, name, failures)
+        for name in (shard_name(job['n'], res, job['mod']) for res in job['pending'])
+    )
+
+
+def _has_failed(job: dict, name: str, failures: dict[str, list[str]]) -> bool:
+    return len(failures.get(name, ())) >= job['max_attempts']
+
+
+def _failures(directory: str) -> dict[str, list[str]]:
+    """Return the files of the failed attempts of each shard, by shard name."""
+    failures_directory = os.path.join(directory, 'failures')
+    failures = {}
+    for filename in os.listdir(failures_directory):
+        if filename.endswith('.failure'):
+            failures.setdefault(filename.split('.')[0], []).append(os.path.join(failures_directory, filename))
+    return failures
+
+
+def _publish(filename: str, directory: str):
+    """Copy `filename` into `directory` unless a copy with the same size and modification time is there."""
+    published = os.path.join(directory, os.path.basename(filename))
+    source = os.stat(filename)
+    if os.path.exists(published):
+        copy = os.stat(published)
+        if (copy.st_size, copy.st_mtime_ns) == (source.st_size, source.st_mtime_ns):
+            return
+    temporary_filename = f'{published}.{uuid.uuid4().hex}.tmp'
+    shutil.copy2(filename, temporary_filename)
+    os.replace(temporary_filename, published)
+
+
+class _Heartbeat:
+    """Renews a lease from a background thread while the shard is being processed.
+
+    The lease is only renewed while it still belongs to this worker: once the coordinator has
+    reclaimed it, the shard may belong to someone else, and the result will be a harmless duplicate.
+    """
+
+    def __init__(self, filename: str, worker_id: str, interval: float):
+        self.filename = filename
+        self.worker_id = worker_id
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def _beat(self):
+        beats = 0
+        while not self._stopped.wait(self.interval):
+            content = _read_if_exists(self.filename)
+            if content is None or content.split()[0] != self.worker_id:
+                return
+            beats += 1
+            _write_atomically(self.filename, f'{self.worker_id} {beats}'.encode(), f'{self.worker_id}.tmp')
+
+
+def _read_job(directory: str) -> dict | None:
+    content = _read_if_exists(os.path.join(directory, JOB_FILENAME))
+    return None if content is None else json.loads(content)
+
+
+def _spool_path(directory: str, subdirectory: str, name: str) -> str:
+    extension = {'leases': '.lease', 'results': '.result', 'merged': '', 'failures': '.failure'}[subdirectory]
+    return os.path.join(directory, subdirectory, name + extension)
+
+
+def _read_if_exists(filename: str) -> str | None:
+    try:
+        with open(filename) as file:
+            return file.read()
+    except FileNotFoundError:
+        return None
+
+
+def _remove_if_exists(filename: str):
+    try:
+        os.remove(filename)
+    except FileNotFoundError:
+        pass
+
+
+def _write_atomically(filename: str, content: bytes, temporary_suffix: str = 'tmp'):
+    """Write to a temporary file of our own and rename it, so readers never see a partial file."""
+    temporary_filename = f'{filename}.{temporary_suffix}'
+    with open(temporary_filename, 'wb') as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_filename, filename)
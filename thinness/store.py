@@ -0,0 +1,131 @@
+import csv
+import os
+import sqlite3
+from collections.abc import Iterable
+
+from .helpers import canonical_graph6
+
+
+STORE_FILENAME = 'data/results.sqlite'
+DEFAULT_SHARDS_PER_COMMIT = 16
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS graphs (
+    width_parameter TEXT NOT NULL,
+    canonical_graph6 TEXT NOT NULL,
+    graph6 TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    exported INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (width_parameter, canonical_graph6)
+);
+CREATE TABLE IF NOT EXISTS shards (
+    width_parameter TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    res INTEGER NOT NULL,
+    mod INTEGER NOT NULL,
+    PRIMARY KEY (width_parameter, n, res, mod)
+);
+'''
+
+
+class ResultStore:
+    """Crash-safe store for the results of the classification pipelines.
+
+    Results are added per shard and committed in batches of shards. Each commit is a single
+    SQLite transaction holding both the graphs found and the completion of their shards, so
+    after a crash a shard is either fully recorded or not recorded at all. Graphs are
+    deduplicated by canonical label, so re-processing a shard is harmless.
+    """
+
+    def __init__(self, filename: str = STORE_FILENAME, shards_per_commit: int = DEFAULT_SHARDS_PER_COMMIT):
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=FULL')
+        self.connection.executescript(_SCHEMA)
+        self.shards_per_commit = shards_per_commit
+        self._pending_graphs = []
+        self._pending_shards = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def add_shard(self, width_parameter: str, n: int, res: int, mod: int, graphs: Iterable[tuple[str, int]]):
+        """Record that shard `res`/`mod` of order `n` is complete, together with the `(graph6, value)` pairs it found."""
+        for graph6, value in graphs:
+            self._pending_graphs.append((width_parameter, canonical_graph6(graph6), graph6, value))
+        self._pending_shards.append((width_parameter, n, res, mod))
+        if len(self._pending_shards) >= self.shards_per_commit:
+            self.flush()
+
+    def flush(self):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO graphs (width_parameter, canonical_graph6, graph6, value) VALUES (?, ?, ?, ?)',
+                self._pending_graphs
+            )
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO shards (width_parameter, n, res, mod) VALUES (?, ?, ?, ?)',
+                self._pending_shards
+            )
+        self._pending_graphs.clear()
+        self._pending_shards.clear()
+
+    def processed_shards(self, width_parameter: str, n: int, mod: int) -> set[int]:
+        self.flush()
+        rows = self.connection.execute(
+            'SELECT res FROM shards WHERE width_parameter = ? AND n = ? AND mod = ?',
+            (width_parameter, n, mod)
+        )
+        return {res for res, in rows}
+
+    def graph6_strings(self, width_parameter: str, value: int, exported: bool | None = None) -> list[str]:
+        self.flush()
+        query = 'SELECT graph6 FROM graphs WHERE width_parameter = ? AND value = ?'
+        params = (width_parameter, value)
+        if exported is not None:
+            query += ' AND exported = ?'
+            params += (int(exported),)
+        return [graph6 for graph6, in self.connection.execute(query, params)]
+
+    def export_to_csvs(self, filename_for_value):
+        """Append the graphs not yet exported to the CSV file given by `filename_for_value(width_parameter, value)`.
+
+        Graphs already present in the CSV file are skipped, so an export interrupted before being
+        marked as done can be safely repeated.
+        """
+        self.flush()
+        rows = self.connection.execute(
+            'SELECT width_parameter, value, graph6 FROM graphs WHERE exported = 0 ORDER BY width_parameter, value'
+        ).fetchall()
+        graphs_by_file = {}
+        for width_parameter, value, graph6 in rows:
+            graphs_by_file.setdefault(filename_for_value(width_parameter, value), []).append(graph6)
+
+        for filename, graph6_strings in graphs_by_file.items():
+            _append_to_csv(filename, graph6_strings)
+
+        with self.connection:
+            self.connection.execute('UPDATE graphs SET exported = 1 WHERE exported = 0')
+
+
+def _append_to_csv(filename: str, graph6_strings: list[str]):
+    existing = set()
+    if os.path.exists(filename):
+        with open(filename, newline='') as csvfile:
+            existing = {row['graph6'] for row in csv.DictReader(csvfile)}
+    else:
+        with open(filename, mode='w', newline='') as csvfile:
+            csv.writer(csvfile).writerow(['graph6', 'name', 'hog'])
+
+    with open(filename, mode='a', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerows([graph6, '', ''] for graph6 in graph6_strings if graph6 not in existing)
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
@@ -0,0 +1,178 @@
+import heapq
+import mmap
+import os
+
+from sage.graphs.graph import Graph
+
+from .helpers import canonical_graph6
+
+
+TABLES_DIR = 'data/tables'
+UNKNOWN = 0
+THINNESS_COLUMN = 0
+PROPER_THINNESS_COLUMN = 1
+_VALUE_COLUMNS = 2
+
+
+def graph6_length(n: int) -> int:
+    """Length of the graph6 string of any graph of order `n`, for `n <= 62`."""
+    return 1 + (n * (n - 1) // 2 + 5) // 6
+
+
+def table_filename(n: int, directory: str = TABLES_DIR) -> str:
+    return f'{directory}/order-{n}.table'
+
+
+def encode_record(canonical: bytes, thinness: int = UNKNOWN, proper_thinness: int = UNKNOWN) -> bytes:
+    return canonical + bytes((thinness, proper_thinness))
+
+
+class ThinnessTable:
+    """Memory-mapped table from the canonical graph6 string of each connected graph of order `n`
+    to its thinness and proper thinness.
+
+    The file is a sorted sequence of fixed-size records: the canonical graph6 string followed by
+    one byte per value, with `UNKNOWN` for values that were not computed.
+    """
+
+    def __init__(self, n: int, directory: str = TABLES_DIR):
+        self.n = n
+        self.key_length = graph6_length(n)
+        self.record_length = self.key_length + _VALUE_COLUMNS
+        with open(table_filename(n, directory), 'rb') as file:
+            # An empty file cannot be memory-mapped.
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else b''
+
+    def __len__(self):
+        return len(self._map) // self.record_length
+
+    def lookup(self, canonical: bytes) -> tuple[int, int] | None:
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            offset = middle * self.record_length
+            key = self._map[offset:offset + self.key_length]
+            if key < canonical:
+                low = middle + 1
+            elif key > canonical:
+                high = middle
+            else:
+                return tuple(self._map[offset + self.key_length:offset + self.record_length])
+        return None
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+
+
+class ThinnessTables:
+    """The thinness tables of every order from 2 to `max_order`, looked up by graph."""
+
+    def __init__(self, max_order: int, directory: str = TABLES_DIR):
+        self._tables = {n: ThinnessTable(n, directory) for n in range(2, max_order + 1)}
+
+    def lookup(self, graph: Graph, column: int) -> int:
+        """Return the value in `column` for `graph`, which may be disconnected."""
+        return max(self._lookup_connected(component, column) for component in graph.connected_components_subgraphs())
+
+    def _lookup_connected(self, graph: Graph, column: int) -> int:
+        if graph.order() == 1:
+            return 1
+        record = self._tables[graph.order()].lookup(canonical_graph6(graph).encode())
+        if record is None or record[column] == UNKNOWN:
+            raise KeyError(f'No value for {graph.graph6_string()} in the table of order {graph.order()}')
+        return record[column]
+
+    def max_after_vertex_deletion(self, graph: Graph, column: int) -> int:
+        """Return the maximum value in `column` over the graphs `graph - v`.
+
+        As thinness and proper thinness are hereditary, this is a lower bound for `graph`, and
+        `graph` is minimal for its value exactly when its value is greater than this one.
+        For thinness, this value plus one is also an upper bound.
+        """
+        maximum = 0
+        for vertex in graph.vertex_iterator():
+            subgraph = graph.copy(immutable=False)
+            subgraph.delete_vertex(vertex)
+            maximum = max(maximum, self.lookup(subgraph, column))
+        return maximum
+
+    def close(self):
+        for table in self._tables.values():
+            table.close()
+
+
+class ThinnessTableWriter:
+    """Builds the table of order `n` from the records produced by each shard of a run.
+
+    Each shard is sorted and written to its own file as soon as it finishes, so a resumed run
+    only needs the shards it did not finish. `finalize` merges every shard with any existing
+    table of the same order, which keeps the values already known for the other column.
+    """
+
+    def __init__(self, n: int, directory: str = TABLES_DIR):
+        self.n = n
+        self.filename = table_filename(n, directory)
+        self.record_length = graph6_length(n) + _VALUE_COLUMNS
+        self.shards_directory = f'{self.filename}.shards'
+        os.makedirs(self.shards_directory, exist_ok=True)
+
+    def add_shard(self, res: int, mod: int, records: bytes):
+        sorted_records = sorted(_split_records(records, self.record_length))
+        _write_atomically(os.path.join(self.shards_directory, f'{res}-{mod}.records'), sorted_records)
+
+    def finalize(self):
+        sources = [
+            os.path.join(self.shards_directory, filename)
+            for filename in os.listdir(self.shards_directory)
+        ]
+        if os.path.exists(self.filename):
+            sources.append(self.filename)
+
+        files = [open(source, 'rb') for source in sources]
+        try:
+            merged = heapq.merge(*(_iterate_records(file, self.record_length) for file in files))
+            _write_atomically(self.filename, _combine_equal_keys(merged, self.record_length - _VALUE_COLUMNS))
+        finally:
+            for file in files:
+                file.close()
+
+        for source in sources:
+            if source != self.filename:
+                os.remove(source)
+        os.rmdir(self.shards_directory)
+
+
+def _split_records(records: bytes, record_length: int):
+    return (records[offset:offset + record_length] for offset in range(0, len(records), record_length))
+
+
+def _iterate_records(file, record_length: int):
+    while record := file.read(record_length):
+        yield record
+
+
+def _combine_equal_keys(records, key_length: int):
+    current = None
+    for record in records:
+        if current is not None and current[:key_length] == record[:key_length]:
+            current = current[:key_length] + bytes(
+                old if old != UNKNOWN else new
+                for old, new in zip(current[key_length:], record[key_length:])
+            )
+        else:
+            if current is not None:
+                yield current
+            current = record
+    if current is not None:
+        yield current
+
+
+def _write_atomically(filename: str, records):
+    temporary_filename = f'{filename}.tmp'
+    with open(temporary_filename, 'wb') as file:
+        for record in records:
+            file.write(record)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_filename, filename)
@@ -0,0 +1,248 @@
+"""Throughput metrics of the enumeration pipelines, exported in the Prometheus text format.
+
+Each worker fills a `WorkerMetrics` for every batch or shard it processes and sends it back with
+the results, where the coordinating process adds it to a `PipelineMetrics`. The time of each graph
+is split in phases:
+
+- `generation`: running geng, or building the graph6 strings in the coordinating process.
+- `lower_bound`: looking up the vertex-deleted subgraphs in the tables of the smaller order.
+- `solving`: the exact engine.
+- `serialization`: parsing the graph6 string, canonical labelling and encoding the table record.
+- `waiting`: the coordinating process waiting for results, which is high when the workers are the bottleneck.
+
+`export_metrics` writes the metrics to a file every few seconds, which the textfile collector of the
+Prometheus node exporter can pick up, and can also serve them over HTTP at `/metrics`.
+"""
+import bisect
+import heapq
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_EXPORT_INTERVAL = 10.0  # seconds
+SLOWEST_GRAPHS = 20
+# Upper bounds of the buckets of the solve time histograms, in seconds.
+SOLVE_TIME_BUCKETS = (1e-4, 3e-4, 1e-3, 3e-3, 1e-2, 3e-2, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0)
+PHASES = ('generation', 'serialization', 'lower_bound', 'solving', 'waiting')
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+class WorkerMetrics:
+    """Metrics of one batch or shard, small enough to send back with its results."""
+
+    def __init__(self, slowest: int = SLOWEST_GRAPHS):
+        self.worker = worker_name()
+        self.graphs = 0
+        self.hard_graphs = 0  # graphs that exceeded their budget, left for the hard-instance queue
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.histograms = {}  # (order, value) to the count of each bucket, plus one for larger times
+        self.sums = {}  # (order, value) to the total solve time
+        self.slowest = []  # min-heap of (seconds, graph6)
+        self._slowest_size = slowest
+
+    @contextmanager
+    def time(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_seconds[phase] += time.perf_counter() - start
+
+    def timed(self, iterable, phase: str = 'generation'):
+        """Yield the items of `iterable`, adding the time spent producing them to `phase`."""
+        iterator = iter(iterable)
+        while True:
+            with self.time(phase):
+                item = next(iterator, _END)
+            if item is _END:
+                return
+            yield item
+
+    def record_graph(self, graph6: bytes, order: int, value: int, solve_seconds: float):
+        """Count a graph whose engine found `value` in `solve_seconds`, which also go to the `solving` phase."""
+        self.graphs += 1
+        key = (order, value)
+        if key not in self.histograms:
+            self.histograms[key] = [0] * (len(SOLVE_TIME_BUCKETS) + 1)
+            self.sums[key] = 0.0
+        self.histograms[key][bisect.bisect_left(SOLVE_TIME_BUCKETS, solve_seconds)] += 1
+        self.sums[key] += solve_seconds
+        self.phase_seconds['solving'] += solve_seconds
+        _push_slowest(self.slowest, self._slowest_size, (solve_seconds, graph6))
+
+
+class PipelineMetrics:
+    """Metrics of a whole run, added up from the `WorkerMetrics` of every batch.
+
+    Methods may be called from the thread of the run while an exporter thread reads the metrics.
+    """
+
+    def __init__(self, slowest: int = SLOWEST_GRAPHS):
+        self.start = time.perf_counter()
+        self.submitted = 0  # batches handed to the workers
+        self.completed = 0  # batches whose metrics were added
+        self.phase_seconds = dict.fromkeys(PHASES, 0.0)
+        self.worker_graphs = {}
+        self.hard_graphs = 0
+        self.histograms = {}
+        self.sums = {}
+        self.slowest = []
+        self._slowest_size = slowest
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        """Batches handed to the workers that are waiting or being processed."""
+        return self.submitted - self.completed
+
+    def add(self, metrics: WorkerMetrics):
+        with self._lock:
+            self.completed += 1
+            self.hard_graphs += metrics.hard_graphs
+            self.worker_graphs[metrics.worker] = self.worker_graphs.get(metrics.worker, 0) + metrics.graphs
+            for phase, seconds in metrics.phase_seconds.items():
+                self.phase_seconds[phase] += seconds
+            for key, counts in metrics.histograms.items():
+                total = self.histograms.setdefault(key, [0] * len(counts))
+                for i, count in enumerate(counts):
+                    total[i] += count
+                self.sums[key] = self.sums.get(key, 0.0) + metrics.sums[key]
+            for entry in metrics.slowest:
+                _push_slowest(self.slowest, self._slowest_size, entry)
+
+    def expect(self, batches: int):
+        """Count `batches` handed to the workers at once."""
+        with self._lock:
+            self.submitted += batches
+
+    def counted(self, batches):
+        """Yield the items of `batches`, counting each one as handed to the workers."""
+        for batch in batches:
+            self.expect(1)
+            yield batch
+
+    @contextmanager
+    def time(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phase_seconds[phase] += time.perf_counter() - start
+
+    def timed(self, iterable, phase: str = 'generation'):
+        """Like `WorkerMetrics.timed`, for the iterables consumed by the coordinating process."""
+        iterator = iter(iterable)
+        while True:
+            with self.time(phase):
+                item = next(iterator, _END)
+            if item is _END:
+                return
+            yield item
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            elapsed = time.perf_counter() - self.start
+            lines = [
+                '# TYPE thinness_graphs_total counter',
+                *(f'thinness_graphs_total{{worker="{worker}"}} {graphs}' for worker, graphs in sorted(self.worker_graphs.items())),
+                '# TYPE thinness_graphs_per_second gauge',
+                *(f'thinness_graphs_per_second{{worker="{worker}"}} {graphs / elapsed:.3f}' for worker, graphs in sorted(self.worker_graphs.items())),
+                '# TYPE thinness_hard_graphs_total counter',
+                f'thinness_hard_graphs_total {self.hard_graphs}',
+                '# TYPE thinness_queue_depth gauge',
+                f'thinness_queue_depth {self.queue_depth}',
+                '# TYPE thinness_phase_seconds_total counter',
+                *(f'thinness_phase_seconds_total{{phase="{phase}"}} {seconds:.6f}' for phase, seconds in self.phase_seconds.items()),
+                '# TYPE thinness_solve_seconds histogram',
+            ]
+            for (order, value), counts in sorted(self.histograms.items()):
+                labels = f'order="{order}",value="{value}"'
+                cumulative = 0
+                for bound, count in zip((*SOLVE_TIME_BUCKETS, '+Inf'), counts):
+                    cumulative += count
+                    lines.append(f'thinness_solve_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'thinness_solve_seconds_sum{{{labels}}} {self.sums[(order, value)]:.6f}')
+                lines.append(f'thinness_solve_seconds_count{{{labels}}} {cumulative}')
+            lines.append('# TYPE thinness_slowest_graph_seconds gauge')
+            for seconds, graph6 in sorted(self.slowest, reverse=True):
+                lines.append(f'thinness_slowest_graph_seconds{{graph6="{_escape(graph6)}"}} {seconds:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+_END = object()
+
+
+def _push_slowest(heap: list, size: int, entry: tuple[float, bytes]):
+    if len(heap) < size:
+        heapq.heappush(heap, entry)
+    elif entry > heap[0]:
+        heapq.heapreplace(heap, entry)
+
+
+def _escape(graph6: bytes) -> str:
+    """graph6 strings are printable ASCII, but may contain the characters that label values escape."""
+    return graph6.decode().replace('\\', '\\\\').replace('"', '\\"')
+
+
+@contextmanager
+def export_metrics(metrics: PipelineMetrics, path: str = None, port: int = None, interval: float = DEFAULT_EXPORT_INTERVAL):
+    """Write `metrics` to `path` every `interval` seconds and serve them on `port` of localhost while the block runs.
+
+    The file is written once more when the block exits. The block gets the port the metrics are
+    served on, which is chosen by the system if `port` is 0, or None if they are not served.
+    """
+    stopped = threading.Event()
+    writer = server = None
+    if path is not None:
+        def write_periodically():
+            while not stopped.wait(interval):
+                _write_metrics(metrics, path)
+        writer = threading.Thread(target=write_periodically, daemon=True)
+        writer.start()
+    if port is not None:
+        server = ThreadingHTTPServer(('127.0.0.1', port), _handler_for(metrics))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield None if server is None else server.server_address[1]
+    finally:
+        stopped.set()
+        if writer is not None:
+            writer.join()
+            _write_metrics(metrics, path)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+def _write_metrics(metrics: PipelineMetrics, path: str):
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w') as file:
+        file.write(metrics.to_prometheus())
+    os.replace(temporary_path, path)
+
+
+def _handler_for(metrics: PipelineMetrics) -> type[BaseHTTPRequestHandler]:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
@@ -0,0 +1,53 @@
+"""Time the non-betweenness solver against the enumeration of permutations on random instances."""
+import random
+import time
+
+from thinness.non_betweenness import non_betweenness_by_enumeration, solve_non_betweenness
+
+
+def random_instance(n: int, m: int, seed: int, planted: bool = False) -> list[tuple[int, int, int]]:
+    """Return `m` random triples over `n` elements; with `planted`, all of them are satisfied by a hidden permutation."""
+    generator = random.Random(seed)
+    hidden = list(range(n))
+    generator.shuffle(hidden)
+    position = {element: i for i, element in enumerate(hidden)}
+    triples = []
+    while len(triples) < m:
+        a, b, c = generator.sample(range(n), 3)
+        if not planted or not min(position[a], position[c]) < position[b] < max(position[a], position[c]):
+            triples.append((a, b, c))
+    return triples
+
+
+def time_solvers(seeds: int = 3, timeout: float = 60.0):
+    print('Solver against enumeration:')
+    for n in range(5, 10):
+        for seed in range(seeds):
+            triples = random_instance(n, 2 * n, seed)
+            solver_time, solution = _time(solve_non_betweenness, range(n), triples)
+            enumeration_time, exists = _time(non_betweenness_by_enumeration, range(n), triples)
+            assert (solution is not None) == exists
+            print(f'  n={n} m={2 * n} seed={seed}: solver {solver_time:.4f}s, enumeration {enumeration_time:.4f}s')
+
+    print('Solver on larger instances:')
+    for n, m in [(50, 200), (50, 400), (100, 1000), (100, 2000), (200, 2000), (200, 5000)]:
+        for planted in [False, True]:
+            for seed in range(seeds):
+                triples = random_instance(n, m, seed, planted)
+                kind = 'planted' if planted else 'uniform'
+                try:
+                    solver_time, solution = _time(solve_non_betweenness, range(n), triples, timeout)
+                except TimeoutError:
+                    print(f'  n={n} m={m} {kind} seed={seed}: timeout after {timeout}s')
+                else:
+                    print(f'  n={n} m={m} {kind} seed={seed}: {"yes" if solution is not None else "no"} in {solver_time:.4f}s')
+
+
+def _time(function, *arguments):
+    start = time.perf_counter()
+    result = function(*arguments)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    time_solvers()
@@ -14,14 +14,17 @@ def _has_same_vertices(G: Graph, solution: ConsistentSolution):
 def verify_solution(G: Graph, solution: ConsistentSolution):
     """Verify that the given solution is a valid thinness ordering and partition for the graph G.
     
-    This implementation uses the O(n^2) algorithm that only checks the thinness condition for each pair (u, v) of consecutive vertices in the ordering, which can be shown to be equivalent to the straightforward O(n^3) implementation that checks all triples (u, v, w).
+    This implementation uses the O(n^2) algorithm that only checks the thinness condition for each pair (u, v) of vertices that are consecutive in the ordering among the vertices of their part, which can be shown to be equivalent to the straightforward O(n^3) implementation that checks all triples (u, v, w).
     """
     if not _has_same_vertices(G, solution):
         return False
-    for i, first_vertex in enumerate(solution.order[:-2]):
-        second_vertex = solution.order[i+1]
-        if solution.part_of(first_vertex) == solution.part_of(second_vertex):
-            for third_vertex in solution.order[i+2:]:
-                if G.has_edge(first_vertex, third_vertex) and not G.has_edge(second_vertex, third_vertex):
-                    return False
+    last_vertex_of_part = {}
+    for i, second_vertex in enumerate(solution.order):
+        first_vertex = last_vertex_of_part.get(solution.part_of(second_vertex))
+        last_vertex_of_part[solution.part_of(second_vertex)] = second_vertex
+        if first_vertex is None:
+            continue
+        for third_vertex in solution.order[i+1:]:
+            if G.has_edge(first_vertex, third_vertex) and not G.has_edge(second_vertex, third_vertex):
+                return False
     return True
@@ -1,40 +1,63 @@
-from collections import deque
+import heapq
 
 from sage.graphs.graph import Graph
 
 from .consistent_solution import ConsistentSolution
 
 
+def vertex_separation(graph: Graph) -> tuple[int, list[int]]:
+    """Sage's exact vertex separation, imported on first use as its module pulls in the MILP backends."""
+    from sage.graphs.graph_decompositions import vertex_separation as sage_vertex_separation
+    return sage_vertex_separation.vertex_separation(graph)
+
+
 def solution_from_vertex_separation(graph: Graph, linear_layout: list[int]) -> ConsistentSolution:
     """The vertices in `graph` must be numbers from 0 to `graph.order() - 1`."""
+    n = graph.order()
     linear_layout = list(reversed(linear_layout))
     last_neighbors = _get_last_neighbors(graph, linear_layout)
-    order = deque()
-    part_of = [None] * graph.order()
-    is_active = [False] * graph.order()
+    # The order is a circular doubly linked list through the sentinel `n`.
+    next_vertex = list(range(n + 1))
+    previous_vertex = list(range(n + 1))
+    part_of = [None] * n
+    is_active = [False] * n
+    # The number of active vertices in each part, and the parts without active vertices, below `len(active_in_part)`.
+    active_in_part = []
+    free_parts = []
     for index, vertex in enumerate(linear_layout):
-        for neighbor in graph.neighbors(vertex):
-            if last_neighbors[neighbor] == index:
+        for neighbor in graph.neighbor_iterator(vertex):
+            if last_neighbors[neighbor] == index and is_active[neighbor]:
                 is_active[neighbor] = False
+                active_in_part[part_of[neighbor]] -= 1
+                if active_in_part[part_of[neighbor]] == 0:
+                    heapq.heappush(free_parts, part_of[neighbor])
         if last_neighbors[vertex] > index:
             # Active vertex
-            order.append(vertex)
-            active_vertices = [active_vertex for active_vertex in graph if is_active[active_vertex]]
-            part_of[vertex] = _mex(part_of[active_vertex] for active_vertex in active_vertices)
+            _insert_before(next_vertex, previous_vertex, vertex, n)
+            if free_parts:
+                part_of[vertex] = heapq.heappop(free_parts)
+            else:
+                part_of[vertex] = len(active_in_part)
+                active_in_part.append(0)
+            active_in_part[part_of[vertex]] += 1
             is_active[vertex] = True
         else:
             # Inactive vertex
             position_of_last_neighbor_in_layout = last_neighbors[vertex]
             if position_of_last_neighbor_in_layout == 0:
-                order.appendleft(vertex)
+                _insert_before(next_vertex, previous_vertex, vertex, next_vertex[n])
                 part_of[vertex] = 0
             else:
                 last_neighbor = linear_layout[position_of_last_neighbor_in_layout]
-                _insert_before(order, vertex, last_neighbor)
+                _insert_before(next_vertex, previous_vertex, vertex, last_neighbor)
                 part_of[vertex] = part_of[last_neighbor]
 
-    partition = _build_partition(part_of)
-    return ConsistentSolution(list(order), partition)
+    order = []
+    vertex = next_vertex[n]
+    while vertex != n:
+        order.append(vertex)
+        vertex = next_vertex[vertex]
+    return ConsistentSolution.from_parts(order, [part_of[vertex] for vertex in order])
 
 
 def _get_last_neighbors(graph: Graph, linear_layout: list[int]) -> list[int]:
@@ -47,24 +70,9 @@ def _get_last_neighbors(graph: Graph, linear_layout: list[int]) -> list[int]:
     return last_neighbors
 
 
-def _mex(iterable) -> int:
-    """Return the minimum excluded integer."""
-    sorted_iterable = sorted(iterable)
-    for i, element in enumerate(sorted_iterable):
-        if i != element:
-            return i
-
-    return len(sorted_iterable)
-
-
-def _insert_before(deck: deque, element, before):
-    position_of_last_neighbor_in_order = deck.index(before)
-    deck.insert(position_of_last_neighbor_in_order, element)
-
-
-def _build_partition(part_of: list[int]) -> list[set[int]]:
-    partition = [set() for _ in set(part_of)]
-    for vertex, part in enumerate(part_of):
-        partition[part].add(vertex)
-
-    return partition
\ No newline at end of file
+def _insert_before(next_vertex: list[int], previous_vertex: list[int], vertex: int, before: int):
+    previous = previous_vertex[before]
+    next_vertex[previous] = vertex
+    previous_vertex[vertex] = previous
+    next_vertex[vertex] = before
+    previous_vertex[before] = vertex
@@ -3,7 +3,6 @@ import itertools
 import z3
 from sage.graphs.graph import Graph
 
-import pyximport; pyximport.install()
 from .z3 import Z3ThinnessSolver
 
 